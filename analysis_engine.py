@@ -1,52 +1,315 @@
 import pandas as pd
 import numpy as np
 import random
-from datetime import datetime, timedelta 
+from datetime import datetime
 import time
 from nba_api.stats.endpoints import scoreboardv2 # Bu import artık kullanılmıyor ama kalsın
 import traceback
 # 'requests' ve 'BeautifulSoup' import'ları kaldırıldı.
 
 # ========================================================================
-# === ANALYZE_STREAKS (Sürüm 3.7 - Ortalamaya Dönüş Mantığı) ===
-# (Bu fonksiyonda değişiklik yok)
+# === PUANLAMA AĞIRLIKLARI (Güven Skoru) ===
 # ========================================================================
+# Oyuncu analizi, barem merdiveni ve hibrit analiz aynı ağırlıkları kullanır.
+# weight_sweep.py bu değerleri başlangıç noktası olarak alıp ızgara taraması yapar.
+BASE_CONFIDENCE = 50.0
+VOLUME_WEIGHT_POSITIVE = 30.0
+VOLUME_WEIGHT_NEGATIVE = -35.0
+EFFICIENCY_WEIGHT = 15.0
+B2B_WEIGHT = 15.0
+USAGE_DELTA_WEIGHT = 25.0
+VOLUME_BAND = 2.0   # |Sezon Ort. - Barem| bu değeri aşarsa hacim POZİTİF / NEGATİF sayılır
+
+# ========================================================================
+# === RUN-LENGTH KODLAMA ÇEKİRDEĞİ (NumPy) ===
+# ========================================================================
+def _run_length_encode(above):
+    """
+    Boolean (ATTI / ATAMADI) diziyi ardışık serilere ayırır.
+    pandas groupby yerine np.diff / np.flatnonzero ile sınırları bulur.
+    Dönüş: (run_is_above, run_lengths) -> her seri için tip (bool) ve uzunluk (int) dizileri.
+    """
+    above = np.asarray(above, dtype=bool)
+    if above.size == 0:
+        return np.empty(0, dtype=bool), np.empty(0, dtype=np.int64)
+
+    boundaries = np.flatnonzero(np.diff(above.view(np.int8))) + 1
+    run_starts = np.concatenate(([0], boundaries))
+    run_lengths = np.diff(np.append(run_starts, above.size))
+    return above[run_starts], run_lengths
+
+def _streak_stats_matrix(above_matrix):
+    """
+    2-D (eşik x maç) boolean matris için seri istatistiklerini TOPLU hesaplar.
+    Her satır için 'analyze_streaks' ile aynı sayısal sonuçları (metin olmadan) üretir:
+    mevcut seri tipi/uzunluğu, tamamlanmış seri ortalamaları ve kırılma olasılığı (%).
+    Satırlar tek boyuta düzleştirilir; satır başları her zaman yeni seri başlatır.
+    """
+    above_matrix = np.asarray(above_matrix, dtype=bool)
+    n_rows, n_cols = above_matrix.shape
+    return _streak_stats_ragged(above_matrix.reshape(-1), np.full(n_rows, n_cols, dtype=np.int64))
+
+def _streak_stats_ragged(above_flat, row_lengths):
+    """
+    '_streak_stats_matrix'in farklı uzunluktaki satırlar için hali: satırlar 'above_flat' içinde
+    art arda durur (satır i'nin uzunluğu row_lengths[i], her satır >= 1 maç).
+    Ek olarak son tamamlanmış seri ('prev_is_above' / 'prev_length', yoksa uzunluk 0) döner.
+    """
+    above_flat = np.asarray(above_flat, dtype=bool)
+    row_lengths = np.asarray(row_lengths, dtype=np.int64)
+    n_rows = row_lengths.size
+    row_starts = np.cumsum(row_lengths) - row_lengths
+
+    start_mask = np.empty(above_flat.size, dtype=bool)
+    start_mask[0] = True
+    start_mask[1:] = above_flat[1:] != above_flat[:-1]
+    start_mask[row_starts] = True
+
+    run_starts = np.flatnonzero(start_mask)
+    run_lengths = np.diff(np.append(run_starts, above_flat.size))
+    run_is_above = above_flat[run_starts]
+    run_row = np.searchsorted(row_starts, run_starts, side='right') - 1
+
+    runs_per_row = np.bincount(run_row, minlength=n_rows)
+    last_run = np.cumsum(runs_per_row) - 1
+    current_length = run_lengths[last_run]
+    current_is_above = run_is_above[last_run]
+
+    is_hist = np.ones(run_starts.size, dtype=bool)
+    is_hist[last_run] = False
+    hist_above = is_hist & run_is_above
+    hist_below = is_hist & ~run_is_above
+
+    def _row_sum(weights):
+        return np.bincount(run_row, weights=weights, minlength=n_rows)
+
+    count_above = _row_sum(hist_above)
+    count_below = _row_sum(hist_below)
+    avg_above = np.divide(_row_sum(run_lengths * hist_above), count_above,
+                          out=np.zeros(n_rows), where=count_above > 0)
+    avg_below = np.divide(_row_sum(run_lengths * hist_below), count_below,
+                          out=np.zeros(n_rows), where=count_below > 0)
+
+    same_type = is_hist & (run_is_above == current_is_above[run_row])
+    n_reached = _row_sum(same_type & (run_lengths >= current_length[run_row]))
+    n_continued = _row_sum(same_type & (run_lengths > current_length[run_row]))
+
+    # N_reached == 0 ise: Ortalamaya Dönüş sinyali (%75) veya rekor seri (%1)
+    has_prev = runs_per_row >= 2
+    prev_run = np.where(has_prev, last_run - 1, last_run)
+    prev_length = np.where(has_prev, run_lengths[prev_run], 0)
+    prev_is_above = run_is_above[prev_run] & has_prev
+    reversion = has_prev & (
+        (~current_is_above & prev_is_above & (avg_above > 0) & (prev_length >= avg_above * 2)) |
+        (current_is_above & ~prev_is_above & (avg_below > 0) & (prev_length >= avg_below * 2))
+    )
+    prob_break_pct = np.where(reversion, 75.0, 1.0)
+    reached = n_reached > 0
+    prob_break_pct[reached] = (n_reached[reached] - n_continued[reached]) / n_reached[reached] * 100
+
+    return {
+        'total_matches': row_lengths,
+        'total_above': np.bincount(np.repeat(np.arange(n_rows), row_lengths), weights=above_flat,
+                                   minlength=n_rows).astype(np.int64),
+        'current_is_above': current_is_above,
+        'current_length': current_length,
+        'avg_above': avg_above,
+        'avg_below': avg_below,
+        'n_reached': n_reached.astype(np.int64),
+        'n_continued': n_continued.astype(np.int64),
+        'prob_break_pct': prob_break_pct,
+        'prev_is_above': prev_is_above,
+        'prev_length': prev_length,
+    }
+
+# ========================================================================
+# === OYUNCU İNDEKSİ (Veri yüklenirken BİR KEZ kurulur) ===
+# ========================================================================
+PLAYER_INDEX_COLUMNS = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'GAME_ID', 'GAME_DATE', 'PTS', 'FG_PCT']
+
+def build_player_index(df_oyuncu_mac):
+    """
+    'df_oyuncu_mac' tablosunun analiz için gereken kolonlarını (PLAYER_NAME, GAME_DATE)
+    sırasına dizer ve her oyuncunun bitişik satır aralığını kaydeder.
+    Böylece oyuncu başına tüm tabloyu taramak + sıralamak yerine O(1) dilim alınır.
+    Dönüş: {'df': sıralı tablo, 'by_name': {isim: (start, stop)}, 'by_id': {PLAYER_ID: isim},
+            'values': {kolon: float dizisi}}  ('values': toplu motorun kullandığı sayısal PTS / FG_PCT)
+    """
+    if df_oyuncu_mac is None or df_oyuncu_mac.empty or 'PLAYER_NAME' not in df_oyuncu_mac.columns:
+        return {'df': pd.DataFrame(columns=PLAYER_INDEX_COLUMNS), 'by_name': {}, 'by_id': {}, 'values': {}}
+
+    cols = [col for col in PLAYER_INDEX_COLUMNS if col in df_oyuncu_mac.columns]
+    sorted_df = (
+        df_oyuncu_mac.loc[df_oyuncu_mac['PLAYER_NAME'].notna(), cols]
+        .sort_values(by=['PLAYER_NAME', 'GAME_DATE'], kind='mergesort')
+        .reset_index(drop=True)
+    )
+
+    names = sorted_df['PLAYER_NAME'].to_numpy()
+    by_name = {}
+    if len(names) > 0:
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+        stops = np.r_[starts[1:], len(names)]
+        by_name = {names[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+    by_id = {}
+    if 'PLAYER_ID' in sorted_df.columns:
+        by_id = dict(zip(sorted_df['PLAYER_ID'], sorted_df['PLAYER_NAME']))
+
+    values = {
+        col: pd.to_numeric(sorted_df[col], errors='coerce').to_numpy(dtype=float)
+        for col in ('PTS', 'FG_PCT') if col in sorted_df.columns
+    }
+    return {'df': sorted_df, 'by_name': by_name, 'by_id': by_id, 'values': values}
+
+def get_player_games(player_index, player_name=None, player_id=None):
+    """ İndeksten oyuncunun tarih sıralı maç kayıtlarını (DataFrame dilimi) döndürür. """
+    if player_name is None and player_id is not None:
+        player_name = player_index['by_id'].get(player_id)
+    bounds = player_index['by_name'].get(player_name)
+    if bounds is None:
+        return player_index['df'].iloc[0:0]
+    return player_index['df'].iloc[bounds[0]:bounds[1]]
+
+def _player_mac_data(player_name, df_oyuncu_mac, player_index):
+    """ İndeks varsa O(1) dilim, yoksa (eski yol) tüm tabloyu tarayıp sıralar. """
+    if player_index is not None:
+        return get_player_games(player_index, player_name=player_name)
+    return df_oyuncu_mac[df_oyuncu_mac['PLAYER_NAME'] == player_name].sort_values(by='GAME_DATE')
+
+# ========================================================================
+# === TAKIM FİKSTÜR İNDEKSİ (B2B / Dinlenme - Veri yüklenirken BİR KEZ kurulur) ===
+# ========================================================================
+REST_WINDOW_DAYS = 7
+
+def build_team_schedule_index(df_takim_mac):
+    """
+    'maclar' tablosundan oynanmış (TEAM_ID, tarih) çiftlerini bir set'e ve her takımın
+    sıralı maç tarihlerini bir NumPy dizisine çıkarır.
+    Dönüş: {'played': {(TEAM_ID, date)}, 'dates': {TEAM_ID: datetime64[D] dizisi}}
+    """
+    if df_takim_mac is None or df_takim_mac.empty:
+        return {'played': set(), 'dates': {}}
+
+    schedule = pd.DataFrame({
+        'TEAM_ID': df_takim_mac['TEAM_ID'].to_numpy(),
+        'DAY': df_takim_mac['GAME_DATE'].to_numpy(dtype='datetime64[D]'),
+    }).drop_duplicates()
+
+    played = set(zip(schedule['TEAM_ID'], schedule['DAY'].dt.date))
+    dates = {
+        team_id: np.sort(group['DAY'].to_numpy(dtype='datetime64[D]'))
+        for team_id, group in schedule.groupby('TEAM_ID', sort=False)
+    }
+    return {'played': played, 'dates': dates}
+
+def team_played_on(schedule_index, team_id, date_obj):
+    """ Takım verilen günde maç oynadı mı? (O(1) set kontrolü) """
+    return (team_id, date_obj) in schedule_index['played']
+
+def team_rest_features(schedule_index, team_id, date_obj, window_days=REST_WINDOW_DAYS):
+    """
+    Takımın verilen günden ÖNCEKİ son maçından bu yana geçen gün sayısı ve
+    son 'window_days' gün içinde oynadığı maç sayısı.
+    Dönüş: (days_since_last, games_in_window) - hiç maç yoksa days_since_last = None
+    """
+    team_dates = schedule_index['dates'].get(team_id)
+    if team_dates is None or team_dates.size == 0:
+        return None, 0
+
+    day = np.datetime64(date_obj, 'D')
+    prior_count = int(np.searchsorted(team_dates, day, side='left'))
+    if prior_count == 0:
+        return None, 0
+
+    days_since_last = int((day - team_dates[prior_count - 1]) / np.timedelta64(1, 'D'))
+    window_start = day - np.timedelta64(window_days, 'D')
+    games_in_window = prior_count - int(np.searchsorted(team_dates, window_start, side='left'))
+    return days_since_last, games_in_window
+
+# ========================================================================
+# === ANALYZE_STREAKS (Sürüm 3.8 - NumPy RLE Çekirdeği) ===
+# (Ortalamaya Dönüş mantığı Sürüm 3.7 ile birebir aynı)
+# ========================================================================
+STREAK_RESULT_NO_DATA = ("Veri yok", 0, 0, 0.0, 0, 0.0, "Veri Yok", "", "", "", "Veri Yok", 0.0, 0.0, 0)
+STREAK_RESULT_NOT_ENOUGH_CLEAN = ("Veri yok", 0, 0, 0.0, 0, 0.0, "Yetersiz Temiz Veri", "", "", "", "Veri Yok", 0.0, 0.0, 0)
+
+def _clean_streak_values(series):
+    """ Seriyi sayıya çevirir ve NaN / sonsuz değerleri atar (float dizisi döner). """
+    values = pd.to_numeric(series, errors='coerce')
+    values = np.asarray(values, dtype=float)
+    return values[np.isfinite(values)]
+
 def analyze_streaks(data, threshold_col, threshold_val):
     if data.empty or threshold_col not in data.columns:
-        return "Veri yok", 0, 0, 0.0, 0, 0.0, "Veri Yok", "", "", "", "Veri Yok", 0.0, 0.0, 0
+        return STREAK_RESULT_NO_DATA
 
-    data_cleaned = data.copy()
-    data_cleaned = data_cleaned[pd.to_numeric(data_cleaned[threshold_col], errors='coerce').notna()]
-    data_cleaned = data_cleaned[np.isfinite(data_cleaned[threshold_col])]
-    
-    if data_cleaned.empty or len(data_cleaned) < 3:
-        return "Veri yok", 0, 0, 0.0, 0, 0.0, "Yetersiz Temiz Veri", "", "", "", "Veri Yok", 0.0, 0.0, 0
+    values = _clean_streak_values(data[threshold_col])
 
-    data_cleaned['above'] = data_cleaned[threshold_col] >= threshold_val
-    raw_pattern_list = ["ATTI" if x else "ATAMADI" for x in data_cleaned['above']]
-    raw_pattern = "-".join(raw_pattern_list)
-    
-    total_matches = len(data_cleaned)
-    total_above = data_cleaned['above'].sum()
+    if len(values) < 3:
+        return STREAK_RESULT_NOT_ENOUGH_CLEAN
+
+    return _streak_result_from_above(values >= threshold_val)
+
+def analyze_streaks_multi(series, thresholds):
+    """
+    Aynı seriyi birden fazla eşik için TEK geçişte analiz eder.
+    Seri bir kez temizlenir, karşılaştırma eşik vektörü boyunca yayınlanır (broadcast)
+    ve her eşik için 'analyze_streaks' ile aynı 14'lü sonuç döndürülür (eşik sırasıyla liste).
+    """
+    thresholds = np.asarray(thresholds, dtype=float).reshape(-1)
+    if series is None or len(series) == 0:
+        return [STREAK_RESULT_NO_DATA] * len(thresholds)
+
+    values = _clean_streak_values(series)
+
+    if len(values) < 3:
+        return [STREAK_RESULT_NOT_ENOUGH_CLEAN] * len(thresholds)
+
+    above_matrix = values[np.newaxis, :] >= thresholds[:, np.newaxis]
+    return [_streak_result_from_above(above_row) for above_row in above_matrix]
+
+def _streak_result_from_above(above):
+    """ Temizlenmiş (>= 3 maç) ATTI/ATAMADI dizisinden 14'lü seri analiz sonucunu üretir. """
+    raw_pattern = "-".join(np.where(above, "ATTI", "ATAMADI"))
+
+    total_matches = len(above)
+    total_above = int(np.count_nonzero(above))
     total_below = total_matches - total_above
 
-    data_cleaned['group'] = (data_cleaned['above'] != data_cleaned['above'].shift()).cumsum()
-    streaks = data_cleaned.groupby('group').agg(
-        is_above=('above', 'first'),
-        count=('above', 'size')
-    )
-    
-    if streaks.empty:
+    run_is_above, run_lengths = _run_length_encode(above)
+
+    if run_lengths.size == 0:
         return raw_pattern, total_matches, total_above, 0.0, total_below, 0.0, "Yetersiz seri", "", "", "", "Veri Yok", 0.0, 0.0, 0
-    
-    current_streak = streaks.iloc[-1]
-    historical_streaks = streaks.iloc[:-1] 
-    
-    above_streaks = historical_streaks[historical_streaks['is_above'] == True]['count']
-    below_streaks = historical_streaks[historical_streaks['is_above'] == False]['count']
-    
-    avg_above_streak = above_streaks.mean() if not above_streaks.empty else 0.0
-    avg_below_streak = below_streaks.mean() if not below_streaks.empty else 0.0
+
+    hist_is_above = run_is_above[:-1]
+    hist_lengths = run_lengths[:-1]
+
+    above_streaks = hist_lengths[hist_is_above]
+    below_streaks = hist_lengths[~hist_is_above]
+
+    avg_above_streak = above_streaks.mean() if above_streaks.size > 0 else 0.0
+    avg_below_streak = below_streaks.mean() if below_streaks.size > 0 else 0.0
+
+    current_length = int(run_lengths[-1])
+    current_type = bool(run_is_above[-1])
+    all_streaks_of_type = above_streaks if current_type else below_streaks
+
+    N_reached = int(np.count_nonzero(all_streaks_of_type >= current_length))
+    N_continued = int(np.count_nonzero(all_streaks_of_type > current_length))
+
+    prev_run = (bool(hist_is_above[-1]), int(hist_lengths[-1])) if hist_lengths.size > 0 else None
+
+    return _streak_result_text(raw_pattern, total_matches, total_above, avg_above_streak, avg_below_streak,
+                               current_type, current_length, N_reached, N_continued, prev_run)
+
+def _streak_result_text(raw_pattern, total_matches, total_above, avg_above_streak, avg_below_streak,
+                        current_type, current_length, N_reached, N_continued, prev_run):
+    """
+    Seri sayılarından 14'lü sonucu (yorum metinleri + kırılma olasılığı) kurar.
+    'prev_run': son tamamlanmış seri (tip, uzunluk) ya da None. Ham dizi ve seri tabloları ortak kullanır.
+    """
+    total_below = total_matches - total_above
 
     comment_header = "MEVCUT YORUM VE OLASILIK:\n"
     comment_body = ""
@@ -56,18 +319,13 @@ def analyze_streaks(data, threshold_col, threshold_val):
     current_type_str = "Veri Yok"
     avg_streak = 0.0
     
-    current_length = int(current_streak['count'])
-    current_type = current_streak['is_above']
-    
     if current_type == True:
         current_type_str = "eşik üstü ('ATTI')" 
         next_type_str = "eşik altına düşme ('ATAMADI')"
-        all_streaks_of_type = above_streaks 
         avg_streak = avg_above_streak
     else:
         current_type_str = "eşik altı ('ATAMADI')" 
         next_type_str = "eşiği geçme ('ATTI')"
-        all_streaks_of_type = below_streaks 
         avg_streak = avg_below_streak
 
     comment_body += f"  Mevcut Durum: {current_length} maçlık bir {current_type_str} serisi devam ediyor.\n"
@@ -80,18 +338,13 @@ def analyze_streaks(data, threshold_col, threshold_val):
             comment_body += f"  Yorum: Mevcut seri, henüz tarihsel ortalama uzunluğuna ulaşmamış.\n"
     else:
         comment_body += "  Yorum: Karşılaştırma için yeterli tarihsel seri verisi yok.\n"
-        
-    N_reached = (all_streaks_of_type >= current_length).sum()
-    N_continued = (all_streaks_of_type > current_length).sum()
-    
+
     prob_header = "  OLASILIK TAHMİNİ:\n"
-    
+
     if N_reached == 0:
         reversion_signal_found = False
-        if not historical_streaks.empty:
-            previous_streak = historical_streaks.iloc[-1]
-            prev_type = previous_streak['is_above']
-            prev_length = int(previous_streak['count'])
+        if prev_run is not None:
+            prev_type, prev_length = prev_run
 
             if current_type == False and prev_type == True: 
                 if avg_above_streak > 0 and prev_length >= (avg_above_streak * 2):
@@ -129,7 +382,248 @@ def analyze_streaks(data, threshold_col, threshold_val):
             current_type_str, prob_break_pct_float, avg_streak, int(current_length)) 
 
 # ========================================================================
-# (analyze_wl_streaks, analyze_team_logic - Değişiklik Yok)
+# === PTS SERİ TABLOLARI (Oyuncu x Yarım Puan Baremi, artımlı) ===
+# ========================================================================
+# PTS tamsayı olduğundan (k, k+1] aralığındaki her barem aynı ATTI/ATAMADI dizisini verir; bu yüzden
+# oyuncu başına yalnızca k + 0.5 baremleri ('kova') tutulur. Her kova için:
+#   - mevcut seri (tip, uzunluk), son tamamlanmış seri (ortalamaya dönüş sinyali için)
+#   - tamamlanmış serilerin tip başına sayısı / toplam uzunluğu (ortalama)
+#   - 'reached[tip, kova, L]' = tamamlanmış ve uzunluğu >= L olan seri sayısı (kümülatif histogram)
+# Böylece N_reached / N_continued ham diziyi taramadan O(1) okunur. Yeni maçlar tabloya tek tek
+# eklenir (append_streak_value); tablo yalnızca oyuncunun geçmişi değiştiyse baştan kurulur.
+# Tamsayı olmayan PTS içeren oyuncuların tablosu 'exact=False' işaretlenir ve eski yola düşülür.
+
+def _streak_bucket_thresholds(n_buckets):
+    return np.arange(n_buckets) + 0.5
+
+def build_streak_table(values, n_rows=None):
+    """
+    Temizlenmiş PTS dizisinden (bkz. _clean_streak_values) oyuncunun seri tablosunu kurar.
+    Tüm kovalar TEK bir (kova x maç) matris üzerinde run-length ile hesaplanır.
+    'n_rows': temizlenmemiş satır sayısı (veri yok / yetersiz veri ayrımı için).
+    """
+    values = np.asarray(values, dtype=float)
+    n_buckets = int(values.max()) + 2 if values.size > 0 else 1
+    n_buckets = max(n_buckets, 1)
+    table = {
+        'values': values,
+        'n_rows': len(values) if n_rows is None else n_rows,
+        'exact': bool(np.all(values == np.floor(values))),
+        'total_matches': len(values),
+        'total_above': np.zeros(n_buckets, dtype=np.int64),
+        'cur_above': np.zeros(n_buckets, dtype=bool),
+        'cur_len': np.zeros(n_buckets, dtype=np.int64),
+        'prev_above': np.zeros(n_buckets, dtype=bool),
+        'prev_len': np.zeros(n_buckets, dtype=np.int64),
+        'run_count': np.zeros((2, n_buckets), dtype=np.int64),
+        'run_sum': np.zeros((2, n_buckets), dtype=np.int64),
+        'reached': np.zeros((2, n_buckets, 2), dtype=np.int32),
+    }
+    if values.size == 0:
+        return table
+
+    above_matrix = values[np.newaxis, :] >= _streak_bucket_thresholds(n_buckets)[:, np.newaxis]
+    n_cols = values.size
+    above_flat = above_matrix.reshape(-1)
+    start_mask = np.empty(above_flat.size, dtype=bool)
+    start_mask[0] = True
+    start_mask[1:] = above_flat[1:] != above_flat[:-1]
+    start_mask[::n_cols] = True
+    run_starts = np.flatnonzero(start_mask)
+    run_lengths = np.diff(np.append(run_starts, above_flat.size))
+    run_is_above = above_flat[run_starts]
+    run_row = run_starts // n_cols
+    last_run = np.cumsum(np.bincount(run_row, minlength=n_buckets)) - 1
+    has_prev = np.r_[last_run[0] > 0, np.diff(last_run) > 1]
+
+    table['total_above'] = np.count_nonzero(above_matrix, axis=1).astype(np.int64)
+    table['cur_above'] = run_is_above[last_run]
+    table['cur_len'] = run_lengths[last_run].astype(np.int64)
+    table['prev_above'] = np.where(has_prev, run_is_above[last_run - 1], False)
+    table['prev_len'] = np.where(has_prev, run_lengths[last_run - 1], 0).astype(np.int64)
+
+    completed = np.ones(run_starts.size, dtype=bool)
+    completed[last_run] = False
+    c_type = run_is_above[completed].astype(np.int64)
+    c_row = run_row[completed]
+    c_len = run_lengths[completed]
+    length_cap = int(c_len.max()) + 2 if c_len.size > 0 else 2
+    flat_key = (c_type * n_buckets + c_row) * length_cap + c_len
+    histogram = np.bincount(flat_key, minlength=2 * n_buckets * length_cap).reshape(2, n_buckets, length_cap)
+    table['reached'] = np.cumsum(histogram[:, :, ::-1], axis=2)[:, :, ::-1].astype(np.int32)
+    table['run_count'] = np.bincount(c_type * n_buckets + c_row, minlength=2 * n_buckets).reshape(2, n_buckets)
+    table['run_sum'] = np.bincount(c_type * n_buckets + c_row, weights=c_len,
+                                   minlength=2 * n_buckets).reshape(2, n_buckets).astype(np.int64)
+    return table
+
+def _extend_streak_buckets(table, n_buckets):
+    """ Yeni en yüksek skor: üst kovalar eklenir. Bu kovaların geçmişi, eski en üst kovanınkiyle aynıdır (hep ATAMADI). """
+    extra = n_buckets - table['cur_len'].size
+    for key in ('total_above', 'cur_above', 'cur_len', 'prev_above', 'prev_len'):
+        table[key] = np.concatenate([table[key], np.repeat(table[key][-1:], extra)])
+    for key in ('run_count', 'run_sum', 'reached'):
+        table[key] = np.concatenate([table[key], np.repeat(table[key][:, -1:], extra, axis=1)], axis=1)
+
+def append_streak_value(table, value, n_new_rows=1):
+    """
+    Tabloya tek bir yeni maç (temizlenmiş PTS) ekler (yerinde). Yalnızca serisi kırılan kovalar
+    güncellenir: biten seri histogramlara ve 'reached' kümülatif sayaçlarına eklenir.
+    """
+    table['n_rows'] += n_new_rows
+    table['values'] = np.append(table['values'], value)
+    if value != np.floor(value):
+        table['exact'] = False
+    if value + 2 > table['cur_len'].size:
+        _extend_streak_buckets(table, int(value) + 2)
+
+    above = value >= _streak_bucket_thresholds(table['cur_len'].size)
+    if table['total_matches'] == 0:
+        table['cur_above'] = above
+        table['cur_len'][:] = 1
+    else:
+        broken = np.flatnonzero(above != table['cur_above'])
+        if broken.size > 0:
+            b_type = table['cur_above'][broken].astype(np.int64)
+            b_len = table['cur_len'][broken]
+            if int(b_len.max()) + 2 > table['reached'].shape[2]:
+                pad = int(b_len.max()) + 2 - table['reached'].shape[2]
+                table['reached'] = np.pad(table['reached'], ((0, 0), (0, 0), (0, pad)))
+            table['reached'][b_type, broken] += np.arange(table['reached'].shape[2])[np.newaxis, :] <= b_len[:, np.newaxis]
+            table['run_count'][b_type, broken] += 1
+            table['run_sum'][b_type, broken] += b_len
+            table['prev_above'][broken] = table['cur_above'][broken]
+            table['prev_len'][broken] = b_len
+        continued = above == table['cur_above']
+        table['cur_len'] = np.where(continued, table['cur_len'] + 1, 1)
+        table['cur_above'] = above
+    table['total_above'] = table['total_above'] + above
+    table['total_matches'] += 1
+
+def copy_streak_table(table):
+    """ Snapshot'lar değişmez olduğu için artımlı güncelleme kopya üzerinde yapılır. """
+    return {key: (value.copy() if isinstance(value, np.ndarray) else value) for key, value in table.items()}
+
+def build_streak_tables(player_index, previous=None):
+    """
+    Oyuncu indeksindeki herkes için PTS seri tabloları: {isim: tablo}.
+    'previous' (eski snapshot'ın tabloları) verilirse oyuncunun eski maç dizisi yenisinin ön ekiyse
+    tablo kopyalanıp yalnızca yeni maçlar eklenir; hiç değişmediyse aynı tablo paylaşılır.
+    """
+    df = player_index['df']
+    if 'PTS' not in df.columns:
+        return {}
+    all_values = pd.to_numeric(df['PTS'], errors='coerce').to_numpy(dtype=float)
+    previous = previous or {}
+    tables = {}
+    for name, (start, stop) in player_index['by_name'].items():
+        raw_values = all_values[start:stop]
+        values = raw_values[np.isfinite(raw_values)]
+        old = previous.get(name)
+        if old is not None and old['n_rows'] <= stop - start and old['total_matches'] <= values.size \
+                and np.array_equal(old['values'], values[:old['total_matches']]):
+            if old['n_rows'] == stop - start and old['total_matches'] == values.size:
+                tables[name] = old
+                continue
+            table = copy_streak_table(old)
+            for value in values[old['total_matches']:]:
+                append_streak_value(table, value, n_new_rows=0)
+            table['n_rows'] = stop - start
+            tables[name] = table
+        else:
+            tables[name] = build_streak_table(values, n_rows=stop - start)
+    return tables
+
+def _streak_table_fields(table, thresholds):
+    """ Baremlerin kovalarındaki tablo sayaçları (bkz. _streak_stats_from_table_fields). """
+    n_buckets = table['cur_len'].size
+    bucket = np.clip(np.ceil(thresholds).astype(np.int64) - 1, 0, n_buckets - 1)
+    cur_above = table['cur_above'][bucket]
+    cur_len = table['cur_len'][bucket]
+    c_type = cur_above.astype(np.int64)
+    reached = table['reached']
+    length_cap = reached.shape[2]
+    n_reached = np.where(cur_len < length_cap, reached[c_type, bucket, np.minimum(cur_len, length_cap - 1)], 0)
+    n_continued = np.where(cur_len + 1 < length_cap, reached[c_type, bucket, np.minimum(cur_len + 1, length_cap - 1)], 0)
+    return (np.full(bucket.size, table['total_matches']), table['total_above'][bucket], cur_above, cur_len,
+            n_reached, n_continued, table['run_count'][:, bucket], table['run_sum'][:, bucket],
+            table['prev_above'][bucket], table['prev_len'][bucket])
+
+def _streak_stats_from_table_fields(total_matches, total_above, cur_above, cur_len, n_reached, n_continued,
+                                    run_count, run_sum, prev_above, prev_len):
+    """ Tablo sayaçlarından seri istatistikleri (ortalamalar, ortalamaya dönüş, kırılma olasılığı); satır başına. """
+    avg_above = np.divide(run_sum[1], run_count[1], out=np.zeros(cur_len.size), where=run_count[1] > 0)
+    avg_below = np.divide(run_sum[0], run_count[0], out=np.zeros(cur_len.size), where=run_count[0] > 0)
+
+    has_prev = prev_len > 0
+    reversion = has_prev & (
+        (~cur_above & prev_above & (avg_above > 0) & (prev_len >= avg_above * 2)) |
+        (cur_above & ~prev_above & (avg_below > 0) & (prev_len >= avg_below * 2))
+    )
+    prob_break_pct = np.where(reversion, 75.0, 1.0)
+    reached_mask = n_reached > 0
+    prob_break_pct[reached_mask] = (n_reached[reached_mask] - n_continued[reached_mask]) / n_reached[reached_mask] * 100
+    return {
+        'total_matches': total_matches,
+        'total_above': total_above,
+        'current_is_above': cur_above,
+        'current_length': cur_len,
+        'avg_above': avg_above,
+        'avg_below': avg_below,
+        'n_reached': n_reached,
+        'n_continued': n_continued,
+        'prob_break_pct': prob_break_pct,
+        'prev_is_above': prev_above,
+        'prev_length': prev_len,
+    }
+
+def streak_table_stats(table, thresholds):
+    """
+    Tablodan barem dizisi için seri istatistikleri ('_streak_stats_matrix' ile aynı anahtarlar + son seri).
+    Tablo kesin değilse (tamsayı olmayan PTS) ya da barem <= 0 ise (0.5 kovasına kırpılırdı) None döner;
+    çağıran ham diziye düşer.
+    """
+    thresholds = np.asarray(thresholds, dtype=float).reshape(-1)
+    if not table['exact'] or np.any(thresholds <= 0):
+        return None
+    return _streak_stats_from_table_fields(*_streak_table_fields(table, thresholds))
+
+def streak_tables_stats(tables, thresholds_per_table):
+    """
+    Birden çok (kesin) tablo ve pozitif barem için 'streak_table_stats'; satırlar tablo sırasıyla art arda durur.
+    Kova okumaları tablo başına, türetilen istatistikler tüm satırlar için TEK dizi hesabıyla yapılır.
+    """
+    fields = [_streak_table_fields(table, np.asarray(thresholds, dtype=float).reshape(-1))
+              for table, thresholds in zip(tables, thresholds_per_table)]
+    merged = [np.concatenate(parts, axis=-1) for parts in zip(*fields)]
+    return _streak_stats_from_table_fields(*merged)
+
+def streak_results_from_table(table, thresholds):
+    """
+    'analyze_streaks_multi' ile aynı 14'lü sonuçlar, ham dizi taranmadan tablodan.
+    Ham ATTI/ATAMADI metni (raw_pattern) üretilmez (boş metin): yalnızca takım analizi kullanır.
+    Tablo kesin değilse None döner.
+    """
+    thresholds = np.asarray(thresholds, dtype=float).reshape(-1)
+    if table['n_rows'] == 0:
+        return [STREAK_RESULT_NO_DATA] * len(thresholds)
+    if table['total_matches'] < 3:
+        return [STREAK_RESULT_NOT_ENOUGH_CLEAN] * len(thresholds)
+    stats = streak_table_stats(table, thresholds)
+    if stats is None:
+        return None
+    results = []
+    for i in range(len(thresholds)):
+        prev_run = (bool(stats['prev_is_above'][i]), int(stats['prev_length'][i])) if stats['prev_length'][i] > 0 else None
+        results.append(_streak_result_text(
+            "", table['total_matches'], int(stats['total_above'][i]),
+            float(stats['avg_above'][i]), float(stats['avg_below'][i]),
+            bool(stats['current_is_above'][i]), int(stats['current_length'][i]),
+            int(stats['n_reached'][i]), int(stats['n_continued'][i]), prev_run
+        ))
+    return results
+
+# ========================================================================
+# === TAKIM ANALİZİ (analyze_wl_streaks, analyze_team_logic) ===
 # ========================================================================
 def analyze_wl_streaks(data):
     if data.empty:
@@ -214,13 +708,9 @@ def analyze_team_logic(team_name, threshold, df_takim_mac):
 # ========================================================================
 # --- GÜNCELLEME 2: 'analyze_player_logic' (Oyuncu Analizi Sekmesi) ---
 # ========================================================================
-def analyze_player_logic(player_name, middle_barem, df_oyuncu_mac, df_oyuncu_sezon, ANALYSIS_RANGE):
-    BASE_CONFIDENCE = 50.0
-    VOLUME_WEIGHT_POSITIVE = 30.0  
-    VOLUME_WEIGHT_NEGATIVE = -35.0 
-    EFFICIENCY_WEIGHT = 15.0       
-
-    player_mac_data = df_oyuncu_mac[df_oyuncu_mac['PLAYER_NAME'] == player_name].sort_values(by='GAME_DATE')
+def analyze_player_logic(player_name, middle_barem, df_oyuncu_mac, df_oyuncu_sezon, ANALYSIS_RANGE, player_index=None,
+                         streak_tables=None):
+    player_mac_data = _player_mac_data(player_name, df_oyuncu_mac, player_index)
     # <--- GÜNCELLEME: Rapor için toplam maç sayısını al
     total_match_count = len(player_mac_data) 
     # --- BİTTİ ---
@@ -266,17 +756,19 @@ def analyze_player_logic(player_name, middle_barem, df_oyuncu_mac, df_oyuncu_sez
     report_string_list.append("-"*50 + "\n")
     report_string_list.append(f"Analiz ediliyor: {barems_to_analyze[0]:.1f}, {barems_to_analyze[1]:.1f}, {barems_to_analyze[2]:.1f} baremleri...")
     
-    for threshold_pts in barems_to_analyze:
-        if threshold_pts <= 0: continue
+    # PTS serisi tüm baremler için TEK geçişte, FG% serisi (barem bağımsız) BİR KEZ analiz edilir
+    valid_barems = [threshold_pts for threshold_pts in barems_to_analyze if threshold_pts > 0]
+    pts_results = _pts_streak_results(player_name, player_mac_data, valid_barems, streak_tables)
+
+    (fg_pattern, _, _, _, _, _, _, _, _, _, 
+     fg_current_type_str, fg_prob_break_pct, _, _
+     ) = analyze_streaks(player_mac_data, 'FG_PCT', s_avg_fg_pct)
 
+    for threshold_pts, pts_result in zip(valid_barems, pts_results):
         (pts_pattern, _, _, _, _, _, 
          pts_comment_h, pts_comment_b, pts_prob_h, pts_prob_b, 
          pts_current_type_str, pts_prob_break_pct, _, pts_current_length
-         ) = analyze_streaks(player_mac_data, 'PTS', threshold_pts)
-        
-        (fg_pattern, _, _, _, _, _, _, _, _, _, 
-         fg_current_type_str, fg_prob_break_pct, _, _
-         ) = analyze_streaks(player_mac_data, 'FG_PCT', s_avg_fg_pct)
+         ) = pts_result
 
         aday_yonu = "ÜST" if pts_current_type_str == "eşik altı ('ATAMADI')" else "ALT"
         
@@ -287,8 +779,8 @@ def analyze_player_logic(player_name, middle_barem, df_oyuncu_mac, df_oyuncu_sez
 
         hacim_skoru = s_avg_pts 
         hacim_fark = hacim_skoru - threshold_pts
-        hacim_pozitif_esik = 2.0 
-        hacim_negatif_esik = -2.0 
+        hacim_pozitif_esik = VOLUME_BAND
+        hacim_negatif_esik = -VOLUME_BAND
 
         if aday_yonu == "ÜST":
             if hacim_fark > hacim_pozitif_esik: 
@@ -365,6 +857,167 @@ def analyze_player_logic(player_name, middle_barem, df_oyuncu_mac, df_oyuncu_sez
     
     return "\n".join(report_string_list), all_adaylar
 
+# ========================================================================
+# === YENİ: 'analyze_player_ladder_logic' (Barem Merdiveni Taraması) ===
+# ========================================================================
+def analyze_player_ladder_logic(player_name, df_oyuncu_mac, df_oyuncu_sezon,
+                                ladder_start=5.0, ladder_stop=45.0, ladder_step=0.5,
+                                player_index=None, streak_tables=None):
+    """
+    Oyuncuyu yoğun bir barem merdiveninde (örn. 5.0 - 45.0, 0.5 adım) tarar ve
+    her basamak için Sinerji Skoru eğrisini döndürür.
+    Tüm basamaklar TEK bir 2-D (barem x maç) matris üzerinde toplu hesaplanır
+    ('analyze_player_logic' ile aynı puanlama: Desen + Hacim + Verimlilik).
+    """
+    player_mac_data = _player_mac_data(player_name, df_oyuncu_mac, player_index)
+    total_match_count = len(player_mac_data)
+
+    player_all_seasons_sorted = df_oyuncu_sezon[
+        (df_oyuncu_sezon['PLAYER_NAME'] == player_name) &
+        (df_oyuncu_sezon['GP'] > 0)
+    ].sort_values(by='GP', ascending=True)
+
+    if len(player_mac_data) < 3 or player_all_seasons_sorted.empty:
+        return "HATA: Bu oyuncu için yetersiz veri (maç < 3 veya sezon verisi yok).", []
+
+    bu_sezon = player_all_seasons_sorted.iloc[0]
+    gp_bs = bu_sezon['GP']
+    s_avg_pts = bu_sezon['PTS'] / gp_bs
+    s_fga = bu_sezon['FGA']
+    s_fgm = bu_sezon['FGM']
+    s_avg_fg_pct = s_fgm / s_fga if s_fga > 0 else 0.0
+    team_abbr = bu_sezon.get('TEAM_ABBREVIATION', '???')
+
+    pts_values = _clean_streak_values(player_mac_data['PTS'])
+    if len(pts_values) < 3:
+        return "HATA: Bu oyuncu için yetersiz temiz PTS verisi (maç < 3).", []
+
+    thresholds = np.arange(ladder_start, ladder_stop + ladder_step / 2, ladder_step)
+    thresholds = thresholds[thresholds > 0]
+    if thresholds.size == 0:
+        return "HATA: Geçerli barem aralığı bulunamadı.", []
+
+    # --- 1. DESEN: Tüm basamaklar tek matriste ---
+    pts_table = streak_tables.get(player_name) if streak_tables else None
+    pts_stats = streak_table_stats(pts_table, thresholds) if pts_table is not None else None
+    if pts_stats is None:
+        pts_stats = _streak_stats_matrix(pts_values[np.newaxis, :] >= thresholds[:, np.newaxis])
+    pts_prob = pts_stats['prob_break_pct']
+    aday_ust = ~pts_stats['current_is_above']
+
+    # --- 2. HACİM ---
+    hacim_fark = s_avg_pts - thresholds
+    hacim_band = (hacim_fark > VOLUME_BAND).astype(int) - (hacim_fark < -VOLUME_BAND).astype(int)
+    hacim_result = np.where(aday_ust, hacim_band, -hacim_band)
+
+    confidence = np.full(thresholds.size, BASE_CONFIDENCE)
+    confidence += np.where(hacim_result == 1, VOLUME_WEIGHT_POSITIVE, 0.0)
+    confidence += np.where(hacim_result == -1, VOLUME_WEIGHT_NEGATIVE, 0.0)
+
+    # --- 3. VERİMLİLİK (barem bağımsız, tek sefer) ---
+    (_, _, _, _, _, _, _, _, _, _,
+     fg_current_type_str, fg_prob_break_pct, _, _
+     ) = analyze_streaks(player_mac_data, 'FG_PCT', s_avg_fg_pct)
+    if fg_prob_break_pct > 1:
+        verimlilik_ust = fg_current_type_str == "eşik altı ('ATAMADI')"
+        confidence += np.where(aday_ust == verimlilik_ust, EFFICIENCY_WEIGHT, -EFFICIENCY_WEIGHT)
+
+    confidence = np.clip(np.trunc(confidence), 5, 99).astype(int)
+    sinerji = (pts_prob / 100.0) * (confidence / 100.0)
+
+    curve = [
+        {
+            'threshold': float(thresholds[i]),
+            'direction': "ÜST" if aday_ust[i] else "ALT",
+            'pts_prob': float(pts_prob[i]),
+            'pts_streak_len': int(pts_stats['current_length'][i]),
+            'confidence': int(confidence[i]),
+            'sinerji_skoru': float(sinerji[i]),
+        }
+        for i in range(thresholds.size)
+    ]
+
+    report_string_list = []
+    report_string_list.append(f"BAREM MERDİVENİ: {player_name.upper()} ({team_abbr})")
+    report_string_list.append(f"Aralık: {thresholds[0]:.1f} - {thresholds[-1]:.1f} PTS (Adım: {ladder_step:.1f}) | {thresholds.size} basamak")
+    report_string_list.append(f"(Veri: {total_match_count} Maç | Sezon Ort.: {s_avg_pts:.1f} PTS)")
+    report_string_list.append("="*50 + "\n")
+
+    best = max(curve, key=lambda x: (x['sinerji_skoru'], x['pts_prob'], x['confidence']))
+    report_string_list.append(f"EN YÜKSEK SİNERJİ: {best['threshold']:.1f} PTS {best['direction']} -> {best['sinerji_skoru']:.3f}")
+    report_string_list.append(f"     (Desen: %{best['pts_prob']:.1f} | Güven: %{best['confidence']})\n")
+
+    report_string_list.append(f"{'Barem':>7} | {'Yön':<3} | {'Seri':>4} | {'Desen':>6} | {'Güven':>5} | Sinerji")
+    report_string_list.append("-"*50)
+    for point in curve:
+        prob_str = f"%{point['pts_prob']:.1f}"
+        conf_str = f"%{point['confidence']}"
+        report_string_list.append(
+            f"{point['threshold']:>7.1f} | {point['direction']:<3} | {point['pts_streak_len']:>4} | "
+            f"{prob_str:>6} | {conf_str:>5} | {point['sinerji_skoru']:.3f}"
+        )
+
+    return "\n".join(report_string_list), curve
+
+
+# ========================================================================
+# === TAKIM BAĞLAMI (Kadro Deltası - slate başına takım başına BİR KEZ) ===
+# ========================================================================
+KEY_PLAYERS_PER_TEAM = 3
+
+def build_team_contexts(current_season_players_df, csv_inactive_player_names, team_ids):
+    """
+    Her takım için kadro deltası girdilerini bir kez hazırlar; o takımın tüm oyuncuları paylaşır.
+    Dönüş: {TEAM_ID: {'top_players': [(isim, GP), ...] (FGA'ya göre ilk 3),
+                      'top_names': set, 'injured_today': set (bugün CSV'de olan kilit oyuncular)}}
+    Oyuncuya bağlı kısım (kendisi hariç tutma ve GP < oyuncu_GP / 2 baseline kontrolü)
+    'get_player_delta' içinde bu küçük listeler üzerinden yapılır.
+    """
+    team_contexts = {}
+    if current_season_players_df is None or current_season_players_df.empty:
+        return team_contexts
+
+    csv_inactive_player_names = csv_inactive_player_names or set()
+    teams_df = current_season_players_df[current_season_players_df['TEAM_ID'].isin(list(team_ids))]
+
+    for team_id, team_df in teams_df.groupby('TEAM_ID', sort=False):
+        team_top_players = team_df.sort_values(by='FGA', ascending=False).head(KEY_PLAYERS_PER_TEAM)
+        top_players = list(zip(team_top_players['PLAYER_NAME'], team_top_players['GP']))
+        top_names = set(team_top_players['PLAYER_NAME'])
+        team_contexts[team_id] = {
+            'top_players': top_players,
+            'top_names': top_names,
+            'injured_today': top_names.intersection(csv_inactive_player_names),
+        }
+    return team_contexts
+
+def get_player_delta(team_context, player_name, gp, csv_inactive_player_names):
+    """
+    Takım bağlamından oyuncunun kadro deltasını çıkarır.
+    Dönüş: (delta_etkisi, delta_oyuncu_ismi) -> +1 yeni sakat kilit oyuncu, -1 dönen oyuncu, 0 yok
+    """
+    if not team_context:
+        return 0, ""
+
+    kilit_oyuncu_isimleri = set(team_context['top_names'])
+    kilit_oyuncu_isimleri.discard(player_name)
+
+    bugun_sakat_kilit_oyuncular_isimleri = kilit_oyuncu_isimleri.intersection(csv_inactive_player_names)
+
+    baseline_sakat_kilit_oyuncular_isimleri = set()
+    for kilit_isim, kilit_gp in team_context['top_players']:
+        if kilit_isim in kilit_oyuncu_isimleri and kilit_gp < (gp / 2):
+            baseline_sakat_kilit_oyuncular_isimleri.add(kilit_isim)
+
+    yeni_sakatlar_isimleri = bugun_sakat_kilit_oyuncular_isimleri.difference(baseline_sakat_kilit_oyuncular_isimleri)
+    donen_oyuncular_isimleri = baseline_sakat_kilit_oyuncular_isimleri.difference(bugun_sakat_kilit_oyuncular_isimleri)
+
+    # Birden fazla isim varsa FGA sırasındaki ilki (set sırası süreçten sürece değişir: hash tohumu)
+    if len(yeni_sakatlar_isimleri) > 0:
+        return 1, next(isim for isim, _ in team_context['top_players'] if isim in yeni_sakatlar_isimleri)
+    elif len(donen_oyuncular_isimleri) > 0:
+        return -1, next(isim for isim, _ in team_context['top_players'] if isim in donen_oyuncular_isimleri)
+    return 0, ""
 
 # ========================================================================
 # === GÜNCELLEME 1: 'get_players_for_hybrid_analysis' (Rookie Filtresi) ===
@@ -405,7 +1058,7 @@ def get_players_for_hybrid_analysis(
     csv_inactive_player_names = set() 
     
     try:
-        report_lines.append(f"Analiz başladı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        # ("Analiz başladı" zaman damgasını çağıran ekler: bu sonuç app.py'de önbelleğe alınır)
         today_str = datetime.now().strftime('%Y-%m-%d')
         
         # --- 2. FİSTÜRÜ HAFIZADAN (df_games_today) ÇEK ---
@@ -415,7 +1068,7 @@ def get_players_for_hybrid_analysis(
             report_lines.append(f"Hafızadaki 'df_games_today' (games_today.json) boş.")
             report_lines.append(f"   -> Lütfen lokalden 'python3 fikstur_cek.py' ve 'python3 db_gonder.py' çalıştırın.")
             report_lines.append(f"   -> Ardından 'Veri Güncelle' sayfasından 'Yenile' butonuna basın.")
-            return report_lines, None, today_str, None, None 
+            return report_lines, None, today_str, None, None, None 
 
         if 'GAME_DATE_EST' in df_games_today.columns:
             try:
@@ -453,7 +1106,7 @@ def get_players_for_hybrid_analysis(
 
         if not team_ids_playing:
             report_lines.append("HATA: Fikstür bulundu ancak takım ID'leri işlenemedi.")
-            return report_lines, None, today_str, None, None
+            return report_lines, None, today_str, None, None, None
             
         # --- 4. SAKATLIKLARI HAFIZADAN (df_injury_report) OKU ---
         if df_injury_report.empty:
@@ -476,13 +1129,13 @@ def get_players_for_hybrid_analysis(
  
         if df_oyuncu_sezon.empty:
             report_lines.append(f"HATA: 'oyuncu_sezon_istatistikleri' (nba_analiz.db) tablosu boş.")
-            return report_lines, None, today_str, None, None 
+            return report_lines, None, today_str, None, None, None 
 
         active_player_ids = set(df_oyuncu_sezon[df_oyuncu_sezon['GP'] >= 3]['PLAYER_ID'])
         
         if not active_player_ids:
             report_lines.append(f"HATA: 3'ten fazla maç (GP >= 3) oynamış kimse bulunamadı.")
-            return report_lines, None, today_str, None, None 
+            return report_lines, None, today_str, None, None, None 
 
         report_lines.append(f"Filtre: {len(active_player_ids)} aktif oyuncu (GP >= 3) bulundu.")
         
@@ -512,7 +1165,7 @@ def get_players_for_hybrid_analysis(
         
         if key_players_df.empty:
             report_lines.append("Hata: Fikstürdeki takımlar (games_today.json), 'oyuncu_sezon_istatistikleri' (nba_analiz.db) dosyanızdaki hiçbir oyuncuyla eşleşmedi.")
-            return report_lines, None, today_str, None, None 
+            return report_lines, None, today_str, None, None, None 
 
         # <--- YENİ EKLENEN FİLTRE (Kullanıcı İsteği) ---
         # 50 Maç "Rookie Filtresi"
@@ -546,29 +1199,26 @@ def get_players_for_hybrid_analysis(
             
             if key_players_df.empty:
                 report_lines.append("Hata: Rookie Filtresi sonrası analiz edilecek oyuncu kalmadı.")
-                return report_lines, None, today_str, None, None
+                return report_lines, None, today_str, None, None, None
         # <--- FİLTRE SONU ---
 
         
-        key_players_df['MIN_PER_GAME'] = key_players_df.apply(
-            lambda row: row['MIN'] / row['GP'] if row['GP'] > 0 else 0,
-            axis=1
+        key_players_df['MIN_PER_GAME'] = (
+            key_players_df['MIN'].div(key_players_df['GP']).where(key_players_df['GP'] > 0, 0)
         )
         
         top_players = key_players_df.sort_values(by=['TEAM_ABBREVIATION', 'MIN_PER_GAME'], ascending=[True, False])
-        top_players_grouped = top_players.groupby('TEAM_ABBREVIATION').head(TOP_N_PLAYERS_PER_TEAM).reset_index()
+        top_players_grouped = top_players.groupby('TEAM_ABBREVIATION', observed=True).head(TOP_N_PLAYERS_PER_TEAM).reset_index()
         
         top_players_grouped['GAME_ID'] = top_players_grouped['TEAM_ID'].map(team_to_game_map)
         top_players_grouped['MATCHUP'] = top_players_grouped['GAME_ID'].map(game_id_to_matchup_str)
         top_players_grouped['OPPONENT_TEAM_ID'] = top_players_grouped['TEAM_ID'].map(team_to_opponent_map) # B2B için
         
         game_id_to_teams = df_games_today.set_index('GAME_ID')[['HOME_TEAM', 'AWAY_TEAM']].to_dict('index')
-        
-        def get_team_names(row):
-            game_info = game_id_to_teams.get(row['GAME_ID'], {})
-            return game_info.get('HOME_TEAM', 'Bilinmeyen'), game_info.get('AWAY_TEAM', 'Bilinmeyen')
-        
-        top_players_grouped[['HOME_TEAM', 'AWAY_TEAM']] = top_players_grouped.apply(get_team_names, axis=1, result_type='expand')
+        known_game = top_players_grouped['GAME_ID'].isin(game_id_to_teams.keys())
+        for team_col in ('HOME_TEAM', 'AWAY_TEAM'):
+            team_by_game = {gid: info[team_col] for gid, info in game_id_to_teams.items()}
+            top_players_grouped[team_col] = top_players_grouped['GAME_ID'].map(team_by_game).where(known_game, 'Bilinmeyen')
 
         
         top_players_final = top_players_grouped.sort_values(
@@ -578,241 +1228,39 @@ def get_players_for_hybrid_analysis(
         
         report_lines.append(f"Toplam {len(top_players_final)} kilit ve aktif oyuncu (GP >= 3 VE Kariyer >= 50) bulundu.")
         
-        return report_lines, top_players_final, today_str, current_season_players_df, csv_inactive_player_names
+        # Kadro deltası (sakatlık etkisi) için takım bağlamlarını slate başına BİR KEZ hazırla
+        team_contexts = build_team_contexts(
+            current_season_players_df, 
+            csv_inactive_player_names, 
+            top_players_final['TEAM_ID'].unique()
+        )
+        
+        return report_lines, top_players_final, today_str, current_season_players_df, csv_inactive_player_names, team_contexts
 
     except Exception as e:
         report_lines.append(f"KRİTİK HATA: {e}")
         report_lines.append(f"Hata Detayı: {traceback.format_exc()}")
-        return report_lines, None, None, None, None
+        return report_lines, None, None, None, None, None
 
 # ========================================================================
-# === GÜNCELLEME 2: 'run_full_analysis_logic' (Ana Sayfa Analizi) ===
+# === GÜNCELLEME 2: Ana Sayfa Analizi (sıralama / rapor; puanlama: slate_engine) ===
 # ========================================================================
-def run_full_analysis_logic(
-    baremler, 
-    top_players_final, 
-    current_season_players_df, 
-    csv_inactive_player_names, 
-    df_oyuncu_mac,
-    df_takim_mac, 
-    ANALYSIS_RANGE,
-    MINIMUM_PATTERN_PROBABILITY,
-    today_str
-    ):
-    
-    KEY_PLAYERS_PER_TEAM = 3 
-    BASE_CONFIDENCE = 50.0
-    VOLUME_WEIGHT_POSITIVE = 30.0  
-    VOLUME_WEIGHT_NEGATIVE = -35.0 
-    EFFICIENCY_WEIGHT = 15.0       
-    B2B_WEIGHT = 15.0              
-    USAGE_DELTA_WEIGHT = 25.0      
-    
-    report_lines = []
-    analysis_results = []
-    
-    today_date_obj = datetime.strptime(today_str, '%Y-%m-%d').date()
-    yesterday_date_obj = today_date_obj - timedelta(days=1)
-            
-    for (player_name, middle_barem) in baremler:
-        
-        barems_to_analyze = [
-            middle_barem - ANALYSIS_RANGE,
-            middle_barem,
-            middle_barem + ANALYSIS_RANGE
-        ]
-        
-        try:
-            player_mac_data = df_oyuncu_mac[df_oyuncu_mac['PLAYER_NAME'] == player_name].sort_values(by='GAME_DATE')
-            # <--- GÜNCELLEME: Rapor için toplam maç sayısını al
-            total_match_count = len(player_mac_data)
-            # --- BİTTİ ---
-            
-            player_sezon_row = top_players_final[top_players_final['PLAYER_NAME'] == player_name].iloc[0]
-        except IndexError:
-             report_lines.append(f"\n! {player_name} için veri bulunamadı (Indext Hatası). Atlanıyor...")
-             continue
-
-        if len(player_mac_data) < 3:
-            report_lines.append(f"\n! {player_name} için yetersiz maç verisi (maç < 3). Atlanıyor...")
-            continue 
-        
-        player_id = player_sezon_row['PLAYER_ID']
-        team_id = player_sezon_row['TEAM_ID']
-        opponent_team_id = player_sezon_row['OPPONENT_TEAM_ID']
-        game_id = player_sezon_row['GAME_ID'] 
-        gp = player_sezon_row['GP']
-
-        if gp == 0:
-            report_lines.append(f"\n! {player_name} için GP=0, analiz atlanıyor (ZeroDivisionError önlendi).")
-            continue
-        
-        s_avg_pts = player_sezon_row['PTS'] / gp
-        s_fga = player_sezon_row['FGA']
-        s_fgm = player_sezon_row['FGM']
-        s_avg_fg_pct = s_fgm / s_fga if s_fga > 0 else 0.0
-        
-        # <--- GÜNCELLEME: Rapor için Takım ve Süre bilgilerini al
-        team_abbr = player_sezon_row.get('TEAM_ABBREVIATION', '???')
-        avg_min_this_season = player_sezon_row.get('MIN_PER_GAME', 0.0) # Bu, get_players'da hesaplanmıştı
-        # --- BİTTİ ---
-
-        # B2B verisini BİR KEZ hesapla
-        player_played_yesterday = not df_takim_mac[
-            (df_takim_mac['TEAM_ID'] == team_id) & 
-            (df_takim_mac['GAME_DATE'].dt.date == yesterday_date_obj)
-        ].empty
-        opponent_played_yesterday = not df_takim_mac[
-            (df_takim_mac['TEAM_ID'] == opponent_team_id) & 
-            (df_takim_mac['GAME_DATE'].dt.date == yesterday_date_obj)
-        ].empty
-        
-        # Delta verisini BİR KEZ hesapla
-        team_top_players = current_season_players_df[
-            current_season_players_df['TEAM_ID'] == team_id
-        ].sort_values(by='FGA', ascending=False).head(KEY_PLAYERS_PER_TEAM)
-        kilit_oyuncu_isimleri = set(team_top_players['PLAYER_NAME'])
-        kilit_oyuncu_isimleri.discard(player_name) 
-        
-        bugun_sakat_kilit_oyuncular_isimleri = kilit_oyuncu_isimleri.intersection(csv_inactive_player_names)
-        
-        baseline_sakat_kilit_oyuncular_isimleri = set()
-        
-        for index, kilit_oyuncu in team_top_players.iterrows():
-            if kilit_oyuncu['PLAYER_NAME'] in kilit_oyuncu_isimleri:
-                if kilit_oyuncu['GP'] < (gp / 2):
-                    baseline_sakat_kilit_oyuncular_isimleri.add(kilit_oyuncu['PLAYER_NAME'])
-
-        yeni_sakatlar_isimleri = bugun_sakat_kilit_oyuncular_isimleri.difference(baseline_sakat_kilit_oyuncular_isimleri)
-        donen_oyuncular_isimleri = baseline_sakat_kilit_oyuncular_isimleri.difference(bugun_sakat_kilit_oyuncular_isimleri)
-        
-        delta_etkisi = 0 
-        delta_oyuncu_ismi = ""
-        
-        if len(yeni_sakatlar_isimleri) > 0:
-            delta_etkisi = 1
-            delta_oyuncu_ismi = list(yeni_sakatlar_isimleri)[0] 
-        elif len(donen_oyuncular_isimleri) > 0:
-            delta_etkisi = -1
-            delta_oyuncu_ismi = list(donen_oyuncular_isimleri)[0] 
-
-        # Şimdi 3 barem için iç döngü
-        for threshold_pts in barems_to_analyze:
-            if threshold_pts <= 0: continue 
-            
-            (pts_pattern, _, _, _, _, _, 
-             pts_comment_h, pts_comment_b, pts_prob_h, pts_prob_b, 
-             pts_current_type_str, pts_prob_break_pct, _, pts_current_length
-             ) = analyze_streaks(player_mac_data, 'PTS', threshold_pts)
-            
-            aday_yonu = "ÜST" if pts_current_type_str == "eşik altı ('ATAMADI')" else "ALT"
-            aday_tag = 'buyuk_yesil' if aday_yonu == "ÜST" else 'buyuk_kirmizi'
-            
-            (fg_pattern, _, _, _, _, _, _, _, _, _, 
-             fg_current_type_str, fg_prob_break_pct, _, _
-             ) = analyze_streaks(player_mac_data, 'FG_PCT', s_avg_fg_pct)
-            verimlilik_yonu = "ÜST" if fg_current_type_str == "eşik altı ('ATAMADI')" else "ALT"
-
-            final_confidence = BASE_CONFIDENCE
-            comment_hacim = "NÖTR (Hacim bareme yakın)"
-            comment_verimlilik = "NÖTR (Verimlilik serisi yok/etkisiz)"
-            comment_b2b = "NÖTR (B2B durumu eşit)"
-            comment_delta = "NÖTR (Kadroda Delta Yok)"
-            hacim_result = 0 
-
-            if fg_prob_break_pct > 1: 
-                if aday_yonu == verimlilik_yonu:
-                    final_confidence += EFFICIENCY_WEIGHT
-                    comment_verimlilik = f"POZİTİF (FG% serisi de {verimlilik_yonu} yönünde)"
-                elif aday_yonu != verimlilik_yonu:
-                    final_confidence -= EFFICIENCY_WEIGHT
-                    comment_verimlilik = f"NEGATİF (FG% serisi zıt yönde ({verimlilik_yonu}))"
-            
-            hacim_skoru = s_avg_pts 
-            hacim_fark = hacim_skoru - threshold_pts
-            hacim_pozitif_esik = 2.0 
-            hacim_negatif_esik = -2.0 
-
-            if aday_yonu == "ÜST":
-                if hacim_fark > hacim_pozitif_esik: 
-                    hacim_result = 1
-                    comment_hacim = f"POZİTİF (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f})"
-                elif hacim_fark < hacim_negatif_esik: 
-                    hacim_result = -1
-                    comment_hacim = f"NEGATİF! (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f}) HACİM YETERSİZ!"
-            elif aday_yonu == "ALT":
-                if hacim_fark > hacim_pozitif_esik: 
-                    hacim_result = -1 
-                    comment_hacim = f"NEGATİF! (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f}) HACİM ÇOK YÜKSEK!"
-                elif hacim_fark < hacim_negatif_esik: 
-                    hacim_result = 1 
-                    comment_hacim = f"POZİTİF (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f}) HACİM ZATEN DÜŞÜK!"
-            
-            if hacim_result == 1:
-                final_confidence += VOLUME_WEIGHT_POSITIVE
-            elif hacim_result == -1:
-                final_confidence += VOLUME_WEIGHT_NEGATIVE 
-
-            if player_played_yesterday and not opponent_played_yesterday:
-                final_confidence -= B2B_WEIGHT
-                comment_b2b = f"NEGATİF (Oyuncu Yorgun, Rakip Dinlenmiş)"
-            elif not player_played_yesterday and opponent_played_yesterday:
-                final_confidence += B2B_WEIGHT
-                comment_b2b = f"POZİTİF (Oyuncu Dinlenmiş, Rakip Yorgun)"
-
-            if aday_yonu == "ÜST":
-                if delta_etkisi == 1: 
-                    if hacim_result == -1: final_confidence -= VOLUME_WEIGHT_NEGATIVE 
-                    final_confidence += USAGE_DELTA_WEIGHT
-                    comment_delta = f"POZİTİF (Hacim Artışı! {delta_oyuncu_ismi} oynamıyor)"
-                elif delta_etkisi == -1: 
-                    if hacim_result == 1: final_confidence -= VOLUME_WEIGHT_POSITIVE 
-                    final_confidence -= USAGE_DELTA_WEIGHT
-                    comment_delta = f"NEGATİF (Hacim Düşüşü! {delta_oyuncu_ismi} dönüyor)"
-            elif aday_yonu == "ALT":
-                if delta_etkisi == 1: 
-                    final_confidence -= USAGE_DELTA_WEIGHT
-                    comment_delta = f"NEGATİF (Hacim Artışı! {delta_oyuncu_ismi} oynamıyor)"
-                elif delta_etkisi == -1: 
-                    final_confidence += USAGE_DELTA_WEIGHT
-                    comment_delta = f"POZİTİF (Hacim Düşüşü! {delta_oyuncu_ismi} dönüyor)"
-            
-            final_confidence = max(5, min(99, int(final_confidence)))
-            full_pts_comment = (pts_prob_h + pts_prob_b).replace("\n", " ").replace("    >> ", "")
-            sinerji_skoru = (pts_prob_break_pct / 100.0) * (final_confidence / 100.0)
-
-            # <--- GÜNCELLEME: Rapor için ekstra verileri sözlüğe ekle
-            analysis_results.append({
-                'sinerji_skoru': sinerji_skoru,
-                'game_id': game_id, 
-                'player_id': player_id, 
-                'name': player_name,
-                'threshold': threshold_pts,
-                'direction': aday_yonu,
-                'tag': aday_tag,
-                'confidence': final_confidence,
-                'pts_prob': pts_prob_break_pct,
-                'pts_streak_len': pts_current_length,
-                'pts_comment': full_pts_comment, 
-                'comment_hacim': comment_hacim,
-                'comment_verimlilik': comment_verimlilik,
-                'raw_s_avg_pts': s_avg_pts,
-                'raw_s_avg_fg_pct': s_avg_fg_pct,
-                'raw_b2b_comment': comment_b2b,
-                'raw_delta_comment': comment_delta,
-                'delta_tag': 'delta_plus' if delta_etkisi == 1 else ('delta_minus' if delta_etkisi == -1 else 'kucuk_desen'),
-                'team_abbr': team_abbr,                 # <--- EKLENDİ
-                'total_match_count': total_match_count, # <--- EKLENDİ
-                'avg_min': avg_min_this_season          # <--- EKLENDİ
-            })
-            # --- BİTTİ ---
-            
-    report_lines.append(f"Analiz tamamlandı. Toplam {len(analysis_results)} adet barem/aday bulundu.")
-    
-    if not analysis_results:
-         report_lines.append("Analiz edilecek sonuç bulunamadı.")
-         return "\n".join(report_lines), [], []
-    
+def _pts_streak_results(player_name, player_mac_data, thresholds, streak_tables):
+    """ PTS seri sonuçları: oyuncunun seri tablosu varsa O(1) okuma, yoksa ham dizi (analyze_streaks_multi). """
+    table = streak_tables.get(player_name) if streak_tables else None
+    if table is not None:
+        results = streak_results_from_table(table, thresholds)
+        if results is not None:
+            return results
+    return analyze_streaks_multi(player_mac_data['PTS'], thresholds)
+
+def _rank_candidates(report_lines, analysis_results, MINIMUM_PATTERN_PROBABILITY, shuffle_seed=None):
+    """
+    Adayları (Sinerji, Desen, Güven) ile sıralar, en üstteki eşit grubu karıştırır ve
+    farklı maçlardan en iyi 2 öneriyi seçer. Dönüş: (all_adaylar, top_2_diverse_picks)
+    Karıştırma 'shuffle_seed' (analiz günü) ile tohumlanır: aynı gün aynı girdiler hep aynı sırayı verir
+    (seri / paralel çalıştırma ve tekrar eden analizler birebir aynı sonucu üretir).
+    """
     report_lines.append("Sıralama: 1. (Desen * Güven), 2. Desen, 3. Güven")
     
     all_adaylar = sorted(
@@ -842,8 +1290,8 @@ def run_full_analysis_logic(
         
         if len(tie_group) > 1:
             report_lines.append(f"UYARI: En üst sırada {len(tie_group)} barem BİREBİR AYNI skora sahip.")
-            report_lines.append("   -> Bu eşit grup rastgele karıştırılıyor (PRNG)...")
-            random.shuffle(tie_group)
+            report_lines.append(f"   -> Bu eşit grup rastgele karıştırılıyor (PRNG, tohum: {shuffle_seed})...")
+            random.Random(shuffle_seed).shuffle(tie_group)
         
         all_adaylar = tie_group + other_adaylar
             
@@ -865,7 +1313,11 @@ def run_full_analysis_logic(
     
     if not top_2_diverse_picks:
          report_lines.append(f"Desen Olasılığı >= %{MINIMUM_PATTERN_PROBABILITY} olan farklı maçlardan aday bulunamadı.")
-    
+
+    return all_adaylar, top_2_diverse_picks
+
+def _append_top_picks_report(report_lines, top_2_diverse_picks):
+    """ 'EN GÜVENİLİR 2 ÖNERİ' bölümünü rapora ekler (adayların yorum metinleri dolu olmalıdır). """
     report_lines.append("\n" + "="*60)
     report_lines.append("EN GÜVENİLİR 2 ÖNERİ (Farklı Maçlardan)")
     report_lines.append("="*60)
@@ -881,19 +1333,85 @@ def run_full_analysis_logic(
         report_lines.append(f"  2. HACİM (Sezon Ort.): {aday['comment_hacim']}")
         report_lines.append(f"  3. VERİMLİLİK (FG%): {aday['comment_verimlilik']}")
         report_lines.append(f"  4. YORGUNLUK (B2B): {aday['raw_b2b_comment']}")
+        report_lines.append(f"     (Dinlenme: Takım {_format_rest(aday.get('rest_days'), aday.get('games_in_window'))}"
+                            f" | Rakip {_format_rest(aday.get('opp_rest_days'), aday.get('opp_games_in_window'))})")
         report_lines.append(f"  5. KADRO DELTASI: {aday['raw_delta_comment']}")
     # --- BİTTİ ---
 
     report_lines.append("\n" + "="*60)
     report_lines.append("Analiz tamamlandı.")
-    
-    return "\n".join(report_lines), top_2_diverse_picks, all_adaylar
+
+def _format_rest(rest_days, games_in_window):
+    rest_str = "?" if rest_days is None else str(rest_days)
+    return f"{rest_str} gün, son {REST_WINDOW_DAYS} günde {games_in_window} maç"
 
 # ========================================================================
 # === BACKTEST LOGIC (Sürüm 5.0) ===
-# (Bu fonksiyonda değişiklik yok)
 # ========================================================================
-def run_backtest_logic(log_data, df_mac_results, min_prob):
+RESULT_INDEX_KEYS = ['PLAYER_ID', 'GAME_ID']
+
+def build_result_index(df_oyuncu_mac):
+    """
+    Backtest sonuç indeksi: (PLAYER_ID, GAME_ID) MultiIndex'li PTS serisi. Snapshot başına BİR KEZ kurulur.
+    Anahtar tekrar ediyorsa ilk satır kullanılır (eski '.loc[...].values[0]' davranışı).
+    GAME_ID logdaki (JSON) değerlerle eşleşsin diye kategorik yerine düz değerlere çevrilir.
+    İndeksin hash tablosu burada kurulur; sonrasında salt okunur olarak (thread'ler arasında) paylaşılır.
+    """
+    if df_oyuncu_mac is None or df_oyuncu_mac.empty or not set(RESULT_INDEX_KEYS + ['PTS']) <= set(df_oyuncu_mac.columns):
+        empty_index = pd.MultiIndex.from_arrays(
+            [np.array([], dtype='int64'), np.array([], dtype=object)], names=RESULT_INDEX_KEYS
+        )
+        return pd.Series(np.array([], dtype=float), index=empty_index, name='PTS')
+    keys = pd.DataFrame({
+        'PLAYER_ID': df_oyuncu_mac['PLAYER_ID'].to_numpy(dtype='int64'),
+        'GAME_ID': df_oyuncu_mac['GAME_ID'].astype(object).to_numpy(),
+    })
+    first_rows = ~keys.duplicated(keep='first').to_numpy()
+    result_index = pd.Series(
+        df_oyuncu_mac['PTS'].to_numpy(dtype=float)[first_rows],
+        index=pd.MultiIndex.from_frame(keys[first_rows]),
+        name='PTS'
+    )
+    result_index.index.get_indexer(result_index.index[:1])  # Hash tablosunu şimdi kur
+    return result_index
+
+def grade_predictions(log_data, result_index):
+    """
+    Logdaki tüm tahminleri sonuç indeksinde TEK bir vektörel arama (get_indexer) ile eşleştirir.
+    Dönüş: tahmin sırasıyla [(bulundu_mu, gerçek_PTS)] listesi.
+    """
+    if not log_data:
+        return []
+    if result_index.empty:
+        return [(False, float('nan'))] * len(log_data)
+    keys = pd.MultiIndex.from_arrays([
+        pd.to_numeric(pd.Series([aday.get('player_id') for aday in log_data]), errors='coerce'),
+        pd.Series([aday.get('game_id') for aday in log_data], dtype=object),
+    ])
+    positions = result_index.index.get_indexer(keys)
+    found = positions >= 0
+    actual_pts = np.where(found, result_index.to_numpy()[positions], np.nan)
+    return list(zip(found.tolist(), actual_pts.tolist()))
+
+def _grade_prediction(direction, barem, actual_pts):
+    """ Tek bir tahmin sonucu: (başarılı_mı, durum, sonuç metni). """
+    is_success = False
+    if direction == "ÜST" and actual_pts >= barem:
+        is_success = True
+    elif direction == "ALT" and actual_pts < barem:
+        is_success = True
+    if is_success:
+        return True, 'basarili', f"BAŞARILI (Sonuç: {actual_pts:.0f} PTS)"
+    return False, 'basarisiz', f"BAŞARISIZ (Sonuç: {actual_pts:.0f} PTS)"
+
+def run_backtest_logic(log_data, df_mac_results, min_prob, result_index=None):
+    """
+    'result_index' (bkz. build_result_index) verilmezse 'df_mac_results'tan kurulur;
+    app.py snapshot'ta hazır tutulan indeksi geçirir.
+    """
+    if result_index is None:
+        result_index = build_result_index(df_mac_results)
+
     total_predictions = 0
     total_success = 0
     top_4_predictions = 0
@@ -903,60 +1421,42 @@ def run_backtest_logic(log_data, df_mac_results, min_prob):
     seen_games_top4 = set()
     other_results = []
     
-    for aday in log_data:
+    # Tüm tahminler tek bir vektörel aramayla notlanır; listeler (aday, (bulundu_mu, gerçek_PTS)) taşır
+    for aday, grade in zip(log_data, grade_predictions(log_data, result_index)):
         game_id = aday.get('game_id', None)
         
         if aday['pts_prob'] >= min_prob:
             if len(top_4_diverse) < 4: 
                 if game_id not in seen_games_top4:
-                    top_4_diverse.append(aday)
+                    top_4_diverse.append((aday, grade))
                     seen_games_top4.add(game_id)
                 else:
-                    other_results.append(aday) 
+                    other_results.append((aday, grade)) 
             else:
-                other_results.append(aday) 
+                other_results.append((aday, grade)) 
         else:
-            other_results.append(aday)
+            other_results.append((aday, grade))
     
     report_lines_top4 = []
     if not top_4_diverse:
         report_lines_top4.append("Bu tarih için Top 4 öneri bulunamamış.\n")
     
-    for i, aday in enumerate(top_4_diverse, 1):
-        player_id = aday['player_id']
-        game_id = aday['game_id']
+    for i, (aday, (found, actual_pts)) in enumerate(top_4_diverse, 1):
         barem = aday['threshold']
         direction = aday['direction'] 
         pts_prob = aday['pts_prob']
         confidence = aday['confidence']
         
-        actual_row = df_mac_results.loc[
-            (df_mac_results['PLAYER_ID'] == player_id) & 
-            (df_mac_results['GAME_ID'] == game_id)
-        ]
-        
         result_str = "SONUÇ BİLİNMİYOR (Maç CSV'de bulunamadı)"
         status = 'bilinmiyor'
         
-        if not actual_row.empty:
-            actual_pts = actual_row['PTS'].values[0]
+        if found:
             total_predictions += 1
             top_4_predictions += 1
-            
-            is_success = False
-            if direction == "ÜST" and actual_pts >= barem:
-                is_success = True
-            elif direction == "ALT" and actual_pts < barem:
-                is_success = True
-            
+            is_success, status, result_str = _grade_prediction(direction, barem, actual_pts)
             if is_success:
                 total_success += 1
                 top_4_success += 1
-                status = 'basarili'
-                result_str = f"BAŞARILI (Sonuç: {actual_pts:.0f} PTS)"
-            else:
-                status = 'basarisiz'
-                result_str = f"BAŞARISIZ (Sonuç: {actual_pts:.0f} PTS)"
         
         # <--- GÜNCELLEME: Backtest raporuna da takım adını ekleyelim (eğer logda varsa)
         team_abbr_str = f"({aday.get('team_abbr', '???')})" # .get() kullanarak eski logların hata vermesini engelle
@@ -966,39 +1466,20 @@ def run_backtest_logic(log_data, df_mac_results, min_prob):
     if not other_results:
         report_lines_other.append( ("Listede başka analiz bulunmuyor.\n", 'kucuk_desen') )
         
-    for i, aday in enumerate(other_results, len(top_4_diverse) + 1):
-        player_id = aday['player_id']
-        game_id = aday['game_id']
+    for i, (aday, (found, actual_pts)) in enumerate(other_results, len(top_4_diverse) + 1):
         barem = aday['threshold']
         direction = aday['direction'] 
         pts_prob = aday['pts_prob']
         confidence = aday['confidence']
         
-        actual_row = df_mac_results.loc[
-            (df_mac_results['PLAYER_ID'] == player_id) & 
-            (df_mac_results['GAME_ID'] == game_id)
-        ]
-        
         result_str = "SONUÇ BİLİNMİYOR"
         status = 'bilinmiyor'
         
-        if not actual_row.empty:
-            actual_pts = actual_row['PTS'].values[0]
+        if found:
             total_predictions += 1 
-            
-            is_success = False
-            if direction == "ÜST" and actual_pts >= barem:
-                is_success = True
-            elif direction == "ALT" and actual_pts < barem:
-                is_success = True
-            
+            is_success, status, result_str = _grade_prediction(direction, barem, actual_pts)
             if is_success:
                 total_success += 1 
-                status = 'basarili'
-                result_str = f"BAŞARILI (Sonuç: {actual_pts:.0f} PTS)"
-            else:
-                status = 'basarisiz'
-                result_str = f"BAŞARISIZ (Sonuç: {actual_pts:.0f} PTS)"
         
         filter_str = "(FİLTREYE TAKILDI)" if aday['pts_prob'] < min_prob else ""
         
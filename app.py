@@ -2,7 +2,7 @@
 # GÖREV: S3'ten 3 dosyayı indirir (DB, Fikstür, Sakatlık)
 # GÜNCELLEME: Ana Sayfa (route_index) artık session'da kayıtlı son analizi yüklüyor.
 
-from flask import Flask, render_template, request, redirect, url_for, session, abort, jsonify 
+from flask import Flask, render_template, request, redirect, url_for, session, abort, jsonify, Response 
 import pandas as pd
 import numpy as np 
 from datetime import datetime, timedelta
@@ -14,9 +14,26 @@ from sqlalchemy import create_engine, text
 from functools import wraps
 import time
 import urllib.request 
+import urllib.error
+import shutil
 import threading 
+import io
+import hashlib
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import analysis_engine 
+import table_cache
+import log_store
+import replay_engine
+import slate_engine
+import weight_sweep
+try:
+    import pyarrow as pa  # İsteğe bağlı: yalnızca '/api/export?format=arrow' için
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = None
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 print(f"Uygulama Ana Dizini (BASE_DIR): {BASE_DIR}")
@@ -51,9 +68,33 @@ ANALYSIS_RANGE = 3.0
 MINIMUM_PATTERN_PROBABILITY = 75.0 
 TOP_N_PLAYERS_PER_TEAM = 5 
 CURRENT_SEASON_START_DATE = '2025-09-01'
+LADDER_START = 5.0   # Barem merdiveni taraması (Oyuncu Analizi)
+LADDER_STOP = 45.0
+LADDER_STEP = 0.5
+
+# --- Paylaşımlı Veri Modu (gunicorn worker'ları) ---
+# Açıkken: tek bir worker indirir / önbelleği yazar (süreçler arası kilit), tüm worker'lar
+# sayısal kolonları aynı '.npy' dosyalarından mmap ile (kopyasız) kullanır ve işaretçi dosyası
+# değiştiğinde (başka bir worker /refresh yaptığında) yeni veriye geçer.
+SHARED_DATA_MODE = os.getenv("SHARED_DATA_MODE", "0") == "1"
+SHARED_DATA_POLL_SECONDS = 5.0
+
+# Analiz sonuç önbelleği (LRU): oyuncu / takım analizleri ve tam analizin oyuncu başına seri bölümleri.
+# Anahtar veri snapshot sürümünü içerir; yeni veri yüklendiğinde önbellek ayrıca temizlenir.
+ANALYSIS_CACHE_MAX_ENTRIES = 512
+HYBRID_PLAYERS_CACHE_MAX_ENTRIES = 4  # /get-players -> /run-analysis arası aday listesi
+# Replay indeksi büyük ve snapshot başına tek: ayrı, küçük bir önbellekte tutulur (analiz sonuçlarını itmesin)
+REPLAY_INDEX_CACHE_MAX_ENTRIES = 2
+
+# Toplam backtest: notlanacak günler bu kadar thread'e dağıtılır (hepsi aynı salt okunur snapshot'ı kullanır)
+BACKTEST_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# Tam analiz: büyük slate'lerde oyuncular bu kadar sürece bölünür (0 / 1 = kapalı, tek süreç).
+# Çalışanlar snapshot'ın fikstür indeksini bir kez alır; seri bölümleri ana süreçte hazırlanır (bkz. slate_engine).
+SLATE_WORKERS = int(os.getenv("SLATE_WORKERS", "0"))
 
 # --- Dosya Yolları (Kalıcı Disk için Güncellendi) ---
-DATA_DIR = "/var/data/projem"
+DATA_DIR = os.getenv("DATA_DIR", "/var/data/projem")  # Testler geçici bir dizin verir
 try:
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
@@ -62,136 +103,534 @@ except Exception as e:
     print(f"UYARI: Kalıcı disk dizini '{DATA_DIR}' oluşturulamadı: {e}")
     DATA_DIR = "." 
 CACHE_FILE = os.path.join(DATA_DIR, "barem_cache.json")
-LOG_FILE = os.path.join(DATA_DIR, "analysis_log.json")
+LOG_FILE = os.path.join(DATA_DIR, "analysis_log.json")  # Eski JSON log (ilk açılışta depoya aktarılır)
+LOG_DB_FILE = os.path.join(DATA_DIR, "analysis_log.db")  # Analiz log deposu (bkz. log_store.py)
+TABLE_CACHE_DIR = os.path.join(DATA_DIR, "table_cache")  # Temizlenmiş tabloların kolonsal önbelleği
+HTTP_VALIDATORS_FILE = os.path.join(DATA_DIR, "http_validators.json")  # ETag / Last-Modified
 
 
 # --- Global Değişkenler ---
-DATA_CACHE = {"data_last_loaded": None}
-df_oyuncu_mac = None
-df_oyuncu_sezon = None
-df_takim_mac = None
-df_games_today = pd.DataFrame() 
-df_injury_report = pd.DataFrame() 
-ALL_TEAMS_LIST = []
-ALL_PLAYERS_LIST = []
-nba_team_id_to_abbr = {}
-nba_abbr_to_id = {}
+# NOT: Yüklenen tüm veriler (DataFrame'ler, indeksler, listeler) artık tek bir
+# değişmez 'DataSnapshot' içinde tutulur, bkz. get_snapshot().
+DATA_CACHE = {"data_last_loaded": None, "refresh_running": False, "last_refresh_error": None, "last_pointer_check": 0.0}
 cached_barems = {}
 cached_player_list_key = ""
-analysis_log = {}
-DATA_LOCK = threading.Lock() 
+
+
+class LRUCache:
+    """
+    Boyut sınırlı, thread-safe LRU önbellek. Sınır aşılınca en uzun süredir kullanılmayan kayıt atılır.
+    İsabet / ıskalama sayaçları /veri-guncelle sayfasında gösterilir.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # Hesaplama kilit dışında: uzun bir analiz diğer isteklerin önbellek erişimini bekletmesin.
+        # Hata fırlatan hesaplama önbelleğe yazılmaz.
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+ANALYSIS_CACHE = LRUCache(ANALYSIS_CACHE_MAX_ENTRIES)
+HYBRID_PLAYERS_CACHE = LRUCache(HYBRID_PLAYERS_CACHE_MAX_ENTRIES)
+REPLAY_INDEX_CACHE = LRUCache(REPLAY_INDEX_CACHE_MAX_ENTRIES)
+
+# Barem hafızası (cached_barems) için: erişimler kısa (güncelleme ya da kopya alma), bu yüzden
+# okuyucu/yazıcı ayrımı yerine düz bir kilit yeterli. Analiz logu SQLite deposundadır (kendi işlemleri var).
+# Veri tabloları bu kilide dahil değildir; onlar değişmez snapshot'lardan okunur.
+STATE_LOCK = threading.Lock()
+REFRESH_LOCK = threading.Lock()  # Aynı anda tek bir veri yüklemesi çalışsın diye
+
+# Tam analiz süreç havuzu: çalışanlar kurulduğu andaki snapshot'ın fikstür indeksini taşır,
+# bu yüzden havuz snapshot sürümüne bağlıdır ve yalnızca snapshot değişiminde yenisi kurulur.
+SLATE_POOL_LOCK = threading.Lock()
+_slate_pool = {"version": None, "pool": None}
+
+def _swap_slate_pool(snap):
+    """
+    Snapshot değişiminde (REFRESH_LOCK altında, istek thread'lerinden değil) çağrılır: yeni snapshot'ın
+    havuzunu kurar ve eskisini bırakır. Çalışanlar fork edilmez (forkserver / spawn, bkz. slate_engine),
+    bu yüzden istek thread'leri çalışırken kurulmaları güvenlidir. Eski havuzda kuyruktaki işler
+    (eski snapshot'la başlamış istekler) bitince çalışanları kapanır; kapandıktan sonra gelen işler
+    tek süreçte puanlanır.
+    """
+    pool = None
+    if SLATE_WORKERS > 1 and snap.is_loaded:
+        try:
+            pool = slate_engine.create_slate_pool(snap.team_schedule_index, SLATE_WORKERS)
+        except OSError as e:
+            print(f"UYARI: Süreç havuzu kurulamadı, tam analiz tek süreçte çalışacak: {e}")
+    with SLATE_POOL_LOCK:
+        old_pool = _slate_pool["pool"]
+        _slate_pool.update(version=snap.version, pool=pool)
+    if old_pool is not None:
+        old_pool.shutdown(wait=False)
+
+def _get_slate_pool(snap):
+    """ Snapshot'a ait süreç havuzu; havuz başka bir sürüme aitse (ya da yoksa) None -> tek süreç. """
+    with SLATE_POOL_LOCK:
+        if _slate_pool["version"] == snap.version:
+            return _slate_pool["pool"]
+    return None
 
 
 # ======================================================
 # === VERİ YÜKLEME (S3'TEN İNDİRME) ===
 # ======================================================
 
-def load_data_from_s3():
+# Artımlı (incremental) yüklemede yalnızca yeni satırların okunacağı tablolar
+# ve aynı satırın tekrar gelmesini engelleyen anahtar kolonlar
+INCREMENTAL_TABLES = {
+    'oyuncu_mac_performanslari': ['PLAYER_ID', 'GAME_ID'],
+    'maclar': ['TEAM_ID', 'GAME_ID'],
+}
+
+def download_if_changed(url, local_path, force=False):
     """
-    S3'ten 'nba_analiz.db', 'games_today.json' VE 'nba-injury-report.csv'
-    dosyalarını indirir ve global DataFrame'leri doldurur.
+    Koşullu HTTP (ETag / Last-Modified) ile indirir.
+    Dosya sunucuda değişmemişse (304) indirme atlanır ve False döner; indirildiyse True.
+    'force=True' koşullu başlıkları göndermez, dosyayı her durumda indirir.
     """
-    global df_oyuncu_mac, df_oyuncu_sezon, df_takim_mac, ALL_TEAMS_LIST, ALL_PLAYERS_LIST
-    global nba_team_id_to_abbr, nba_abbr_to_id, engine, DATA_CACHE, df_games_today
-    global df_injury_report 
-    
-    print("Veri kilidi alınıyor (load_data_from_s3)...") 
-    with DATA_LOCK: 
-        print("Veri yükleme fonksiyonu (load_data_from_s3) başladı...")
-        start_time = time.time()
-        
-        if not DB_FILE_URL or not GAMES_TODAY_URL or not INJURY_FILE_URL:
-            print("HATA: DB_FILE_URL, GAMES_TODAY_URL veya INJURY_FILE_URL ayarlanmamış, veri çekilemiyor.")
+    validators = DATA_CACHE.setdefault("http_validators", {}).get(url, {})
+    req = urllib.request.Request(url)
+    if not force and os.path.exists(local_path):
+        if validators.get("etag"):
+            req.add_header("If-None-Match", validators["etag"])
+        if validators.get("last_modified"):
+            req.add_header("If-Modified-Since", validators["last_modified"])
+
+    tmp_path = local_path + ".part"
+    try:
+        with urllib.request.urlopen(req) as response, open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(response, f)
+            new_validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            print(f"  Değişiklik yok (304), indirme atlandı: {url}")
             return False
-            
-        try:
-            # === BÖLÜM 1: Veritabanını İndir (nba_analiz.db) ===
-            print(f"S3'ten veritabanı indiriliyor: {DB_FILE_URL}")
-            urllib.request.urlretrieve(DB_FILE_URL, RENDER_DB_PATH)
-            print(f"Dosya başarıyla '{RENDER_DB_PATH}' konumuna indirildi.")
+        raise
+    os.replace(tmp_path, local_path)
+    DATA_CACHE["http_validators"][url] = new_validators
+    _save_http_validators()
+    return True
+
+def _load_http_validators():
+    """ Önceki süreçlerin kaydettiği ETag / Last-Modified değerlerini yükler (sıcak başlangıçta 304 için). """
+    if not os.path.exists(HTTP_VALIDATORS_FILE):
+        return
+    try:
+        with open(HTTP_VALIDATORS_FILE, 'r') as f:
+            DATA_CACHE["http_validators"] = json.load(f)
+    except Exception as e:
+        print(f"UYARI: '{HTTP_VALIDATORS_FILE}' okunamadı: {e}")
+
+def _save_http_validators():
+    try:
+        with open(HTTP_VALIDATORS_FILE, 'w') as f:
+            json.dump(DATA_CACHE.get("http_validators", {}), f, indent=4)
+    except Exception as e:
+        print(f"UYARI: '{HTTP_VALIDATORS_FILE}' yazılamadı: {e}")
+
+def _load_table_cache(db_sha):
+    """ Kolonsal önbellekten tabloları okur (paylaşımlı modda mmap ile); yoksa veya bozuksa None. """
+    try:
+        return table_cache.load_tables(TABLE_CACHE_DIR, db_sha, mmap_mode='r' if SHARED_DATA_MODE else None)
+    except Exception as e:
+        print(f"UYARI: Kolonsal önbellek okunamadı, veritabanından okunacak: {e}")
+        return None
+
+def _save_table_cache(db_sha, tables, watermarks):
+    try:
+        table_cache.save_tables(TABLE_CACHE_DIR, db_sha, tables, meta={"watermarks": watermarks})
+        print(f"Kolonsal önbellek yazıldı: {TABLE_CACHE_DIR}/{db_sha[:12]}...")
+    except Exception as e:
+        print(f"UYARI: Kolonsal önbellek yazılamadı: {e}")
+
+def _read_table(engine, table_name, since=None):
+    """ Tabloyu okur; 'since' verilirse yalnızca GAME_DATE >= since olan satırları getirir. """
+    if since is None:
+        return pd.read_sql_query(f"SELECT * FROM {table_name}", con=engine)
+    return pd.read_sql_query(
+        text(f"SELECT * FROM {table_name} WHERE GAME_DATE >= :since"), con=engine, params={"since": since}
+    )
 
+def _table_watermark(engine, table_name):
+    """ Tablodaki son (ham) GAME_DATE ve GAME_ID değerleri. """
+    with engine.connect() as conn:
+        row = conn.execute(text(f"SELECT MAX(GAME_DATE), MAX(GAME_ID) FROM {table_name}")).fetchone()
+    return {"GAME_DATE": row[0], "GAME_ID": row[1]}
+
+def _coerce_oyuncu_mac(df):
+    cols_mac = ['PTS', 'FGA', 'FGM', 'FG_PCT', 'FTA', 'FTM', 'FT_PCT', 'REB', 'AST']
+    for col in cols_mac:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'], errors='coerce')
+    return df.dropna(subset=['GAME_DATE', 'PLAYER_ID', 'GAME_ID'])
+
+def _coerce_oyuncu_sezon(df):
+    cols_sezon = ['GP', 'MIN', 'PTS', 'FGA', 'FGM', 'FTA', 'FTM', 'REB', 'AST']
+    for col in cols_sezon:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    return df
+
+def _coerce_takim_mac(df):
+    df['PTS'] = pd.to_numeric(df['PTS'], errors='coerce').fillna(0)
+    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'], errors='coerce')
+    return df.dropna(subset=['GAME_DATE'])
+
+# Bellekteki tabloların kompakt şeması:
+#   'category' -> tekrar eden metinler (isim, takım, maç), eşitlik filtreleri tamsayı kod karşılaştırmasına döner
+#   'int32' / 'int16' -> ID'ler ve kutu skoru sayıları (yalnızca kaynak zaten tamsayıysa ve değerler sığıyorsa)
+# Ondalıklı kolonlar (FG_PCT, MIN...) float64 kalır: float32 değerleri ve ortalamaları değiştirir (kayıplı).
+# Şemada olmayan metin kolonları, tekrar oranı yüksekse (benzersiz < %50) otomatik kategorik yapılır.
+TABLE_SCHEMAS = {
+    'oyuncu_mac_performanslari': {
+        'category': ['SEASON_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'TEAM_NAME', 'GAME_ID', 'MATCHUP', 'WL'],
+        'int32': ['PLAYER_ID', 'TEAM_ID'],
+        'int16': ['PTS', 'FGA', 'FGM', 'FTA', 'FTM', 'REB', 'AST', 'OREB', 'DREB', 'STL', 'BLK', 'TOV', 'PF',
+                  'FG3M', 'FG3A', 'PLUS_MINUS', 'MIN'],
+    },
+    'oyuncu_sezon_istatistikleri': {
+        'category': ['SEASON_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION'],
+        'int32': ['PLAYER_ID', 'TEAM_ID', 'PTS', 'FGA', 'FGM', 'FTA', 'FTM', 'REB', 'AST', 'MIN'],
+        'int16': ['GP'],
+    },
+    'maclar': {
+        'category': ['SEASON_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME', 'GAME_ID', 'MATCHUP', 'WL'],
+        'int32': ['TEAM_ID'],
+        'int16': ['PTS', 'FGA', 'FGM', 'FTA', 'FTM', 'REB', 'AST', 'PLUS_MINUS'],
+    },
+}
+AUTO_CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+def _can_downcast_int(series, dtype):
+    """ Kayıpsız tamsayı daraltma: kaynak tamsayı olmalı ve tüm değerler hedef aralığa sığmalı. """
+    if not pd.api.types.is_integer_dtype(series.dtype) or series.empty:
+        return False
+    info = np.iinfo(dtype)
+    return info.min <= series.min() and series.max() <= info.max
+
+def _compact_frame(df, table_name):
+    """ TABLE_SCHEMAS'a göre kategorik / dar tamsayı tiplerine çevirir ve tablo başına bellek raporu yazar. """
+    schema = TABLE_SCHEMAS.get(table_name, {})
+    mem_before = df.memory_usage(deep=True).sum()
+    df = df.copy()
+
+    for col in schema.get('category', []):
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    for dtype_name in ('int32', 'int16'):
+        for col in schema.get(dtype_name, []):
+            if col in df.columns and _can_downcast_int(df[col], dtype_name):
+                df[col] = df[col].astype(dtype_name)
+    for col in df.columns:
+        if df[col].dtype == object and len(df) and df[col].nunique() <= len(df) * AUTO_CATEGORY_MAX_UNIQUE_RATIO:
+            df[col] = df[col].astype('category')
+
+    mem_after = df.memory_usage(deep=True).sum()
+    print(f"  Bellek ({table_name}): {mem_before / 1e6:.1f} MB -> {mem_after / 1e6:.1f} MB "
+          f"({len(df)} satır, %{100 * (1 - mem_after / max(mem_before, 1)):.0f} tasarruf)")
+    return df
+
+def _merge_new_rows(existing_df, new_df, key_cols):
+    """ Yeni satırları mevcut tabloya ekler; aynı anahtarlı eski satırların yerine yenisi geçer. """
+    if new_df.empty:
+        return existing_df
+    existing_keys = pd.MultiIndex.from_frame(existing_df[key_cols])
+    new_keys = pd.MultiIndex.from_frame(new_df[key_cols])
+    kept_df = existing_df[~existing_keys.isin(new_keys)]
+    return pd.concat([kept_df, new_df], ignore_index=True)
+
+# ======================================================
+# === VERİ SNAPSHOT'I (ÇİFT TAMPON) ===
+# ======================================================
+
+class DataSnapshot:
+    """
+    Bir veri yüklemesinin değişmez (immutable) görüntüsü.
+    Yenileme, yeni snapshot'ı kilitsiz olarak arka planda kurar ve tek bir atama ile
+    yerine koyar; istekler başta get_snapshot() ile aldıkları referansla çalışır,
+    böylece yenileme sırasında analizler eski (tutarlı) veriyle devam eder.
+    DataFrame'ler yerinde değiştirilmemelidir (gerekirse .copy()).
+    """
+    __slots__ = (
+        'df_oyuncu_mac', 'df_oyuncu_sezon', 'df_takim_mac', 'df_games_today', 'df_injury_report',
+        'all_players_list', 'all_teams_list', 'nba_team_id_to_abbr', 'nba_abbr_to_id',
+        'player_index', 'streak_tables', 'team_schedule_index', 'result_index', 'watermarks', 'db_sha256', 'version', 'loaded_at',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DataSnapshot değiştirilemez; replace() ile yeni bir snapshot oluşturun.")
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return DataSnapshot(**fields)
+
+    @property
+    def is_loaded(self):
+        return self.df_oyuncu_mac is not None and self.df_oyuncu_sezon is not None and self.df_takim_mac is not None
+
+
+_current_snapshot = DataSnapshot(
+    df_games_today=pd.DataFrame(), df_injury_report=pd.DataFrame(),
+    all_players_list=[], all_teams_list=[], nba_team_id_to_abbr={}, nba_abbr_to_id={},
+    watermarks={}, version=0,
+)
+
+def get_snapshot():
+    """ Şu anki veri snapshot'ını döndürür (istek boyunca bu referans kullanılmalıdır). """
+    return _current_snapshot
+
+def _build_team_maps(df_oyuncu_sezon):
+    """ TEAM_ID <-> kısaltma haritaları (nba_api, başarısız olursa bellekteki veriden yedek). """
+    try:
+        from nba_api.stats.static import teams as nba_static_teams
+        nba_teams_all = nba_static_teams.get_teams()
+        nba_team_id_to_abbr = {team['id']: team['abbreviation'] for team in nba_teams_all}
+        nba_abbr_to_id = {team['abbreviation']: team['id'] for team in nba_teams_all}
+    except Exception:
+         print("UYARI: nba-api 'get_teams' çağrısı başarısız. Bellekten yedek harita oluşturuluyor.")
+         try:
+             team_data = df_oyuncu_sezon[['TEAM_ID', 'TEAM_ABBREVIATION']].drop_duplicates()
+             nba_team_id_to_abbr = pd.Series(
+                 team_data['TEAM_ABBREVIATION'].values, 
+                 index=team_data['TEAM_ID']
+             ).to_dict()
+             nba_abbr_to_id = pd.Series(
+                 team_data['TEAM_ID'].values, 
+                 index=team_data['TEAM_ABBREVIATION']
+             ).to_dict()
+         except Exception as e_map:
+             print(f"HATA: Yedek harita oluşturulamadı: {e_map}")
+             nba_team_id_to_abbr = {}
+             nba_abbr_to_id = {}
+    return nba_team_id_to_abbr, nba_abbr_to_id
+
+def _build_snapshot(previous, incremental):
+    """
+    S3'ten 'nba_analiz.db', 'games_today.json' VE 'nba-injury-report.csv'
+    dosyalarını indirir ve 'previous' üzerine yeni bir DataSnapshot kurar.
+    Artımlı mod: dosyalar koşullu HTTP ile indirilir (değişmediyse atlanır),
+    veritabanı değiştiyse maç tablolarından yalnızca son GAME_DATE'ten itibaren gelen satırlar okunur.
+    """
+    global engine
+
+    fields = {name: getattr(previous, name) for name in DataSnapshot.__slots__}
+    watermarks = dict(previous.watermarks or {})
+
+    # === BÖLÜM 1: Veritabanını İndir (nba_analiz.db) ===
+    print(f"S3'ten veritabanı indiriliyor: {DB_FILE_URL}")
+    db_changed = download_if_changed(DB_FILE_URL, RENDER_DB_PATH, force=not incremental)
+
+    if db_changed:
+        print(f"Dosya başarıyla '{RENDER_DB_PATH}' konumuna indirildi.")
+    # (Paylaşımlı modda dosyayı başka bir worker indirmiş olabilir; bu yüzden 304'te de özet kontrol edilir.)
+    db_sha = table_cache.db_file_sha256(TABLE_CACHE_DIR, RENDER_DB_PATH)
+
+    if incremental and previous.is_loaded and db_sha == previous.db_sha256:
+        print("Veritabanı değişmemiş, bellekteki tablolar korunuyor.")
+    else:
+        cached = _load_table_cache(db_sha) if incremental else None
+        if cached is not None:
+            tables, cache_meta = cached
+            df_oyuncu_mac = tables['oyuncu_mac_performanslari']
+            df_oyuncu_sezon = tables['oyuncu_sezon_istatistikleri']
+            df_takim_mac = tables['maclar']
+            watermarks = cache_meta.get('watermarks', {})
+            print(f"Tablolar kolonsal önbellekten yüklendi (SHA-256 {db_sha[:12]}...), SQLite ve tip dönüşümü atlandı.")
+        else:
             engine = create_engine(f'sqlite:///{RENDER_DB_PATH}')
             print("Geçici SQLite veritabanına bağlanıldı.")
 
-            print("  Okunuyor: oyuncu_mac_performanslari")
-            df_oyuncu_mac = pd.read_sql_query("SELECT * FROM oyuncu_mac_performanslari", con=engine)
+            if incremental and previous.is_loaded and all(t in watermarks for t in INCREMENTAL_TABLES):
+                since_mac = watermarks['oyuncu_mac_performanslari']['GAME_DATE']
+                since_takim = watermarks['maclar']['GAME_DATE']
+                print(f"  Artımlı okuma: oyuncu_mac_performanslari (GAME_DATE >= {since_mac})")
+                new_mac = _coerce_oyuncu_mac(_read_table(engine, 'oyuncu_mac_performanslari', since=since_mac))
+                print(f"  Artımlı okuma: maclar (GAME_DATE >= {since_takim})")
+                new_takim = _coerce_takim_mac(_read_table(engine, 'maclar', since=since_takim))
+                df_oyuncu_mac = _merge_new_rows(previous.df_oyuncu_mac, new_mac, INCREMENTAL_TABLES['oyuncu_mac_performanslari'])
+                df_takim_mac = _merge_new_rows(previous.df_takim_mac, new_takim, INCREMENTAL_TABLES['maclar'])
+                print(f"  Yeni/güncellenen satırlar: {len(new_mac)} oyuncu maçı, {len(new_takim)} takım maçı.")
+            else:
+                print("  Okunuyor: oyuncu_mac_performanslari")
+                df_oyuncu_mac = _coerce_oyuncu_mac(_read_table(engine, 'oyuncu_mac_performanslari'))
+                print("  Okunuyor: maclar (Geçmiş Maçlar)")
+                df_takim_mac = _coerce_takim_mac(_read_table(engine, 'maclar'))
+
+            # Sezon istatistikleri kümülatif bir özet tablodur, her zaman baştan okunur (küçük tablo)
             print("  Okunuyor: oyuncu_sezon_istatistikleri")
-            df_oyuncu_sezon = pd.read_sql_query("SELECT * FROM oyuncu_sezon_istatistikleri", con=engine)
-            print("  Okunuyor: maclar (Geçmiş Maçlar)")
-            df_takim_mac = pd.read_sql_query("SELECT * FROM maclar", con=engine)
-            print("Veritabanından okuma tamamlandı. Veri tipleri dönüştürülüyor...")
-            
-            cols_mac = ['PTS', 'FGA', 'FGM', 'FG_PCT', 'FTA', 'FTM', 'FT_PCT', 'REB', 'AST']
-            for col in cols_mac:
-                if col in df_oyuncu_mac.columns:
-                    df_oyuncu_mac[col] = pd.to_numeric(df_oyuncu_mac[col], errors='coerce').fillna(0)
-            cols_sezon = ['GP', 'MIN', 'PTS', 'FGA', 'FGM', 'FTA', 'FTM', 'REB', 'AST']
-            for col in cols_sezon:
-                 if col in df_oyuncu_sezon.columns:
-                    df_oyuncu_sezon[col] = pd.to_numeric(df_oyuncu_sezon[col], errors='coerce').fillna(0)
-            df_takim_mac['PTS'] = pd.to_numeric(df_takim_mac['PTS'], errors='coerce').fillna(0)
-            df_oyuncu_mac['GAME_DATE'] = pd.to_datetime(df_oyuncu_mac['GAME_DATE'], errors='coerce')
-            df_takim_mac['GAME_DATE'] = pd.to_datetime(df_takim_mac['GAME_DATE'], errors='coerce')
-            df_oyuncu_mac = df_oyuncu_mac.dropna(subset=['GAME_DATE', 'PLAYER_ID', 'GAME_ID'])
-            df_takim_mac = df_takim_mac.dropna(subset=['GAME_DATE']) 
-
-            ALL_PLAYERS_LIST = sorted(df_oyuncu_mac['PLAYER_NAME'].unique())
-            ALL_TEAMS_LIST = sorted(df_takim_mac['TEAM_NAME'].unique())
-            print(f"Başarılı: {len(ALL_PLAYERS_LIST)} oyuncu, {len(ALL_TEAMS_LIST)} takım belleğe yüklendi.")
-            
-            # === BÖLÜM 2: Fikstürü İndir (games_today.json) ===
-            print(f"S3'ten fikstür indiriliyor: {GAMES_TODAY_URL}")
-            urllib.request.urlretrieve(GAMES_TODAY_URL, RENDER_GAMES_TODAY_PATH)
-            print(f"Fikstür başarıyla '{RENDER_GAMES_TODAY_PATH}' konumuna indirildi.")
-            df_games_today = pd.read_json(RENDER_GAMES_TODAY_PATH)
-            if df_games_today.empty: print("UYARI: Fikstür dosyası bulundu ancak içi boş.")
-            else: print(f"Fikstür başarıyla belleğe yüklendi ({len(df_games_today)} maç).")
-
-            # === BÖLÜM 3: Sakatlık Raporunu İndir (nba-injury-report.csv) ===
-            try:
-                print(f"S3'ten sakatlık raporu indiriliyor: {INJURY_FILE_URL}")
-                urllib.request.urlretrieve(INJURY_FILE_URL, RENDER_INJURY_PATH)
-                df_injury_report = pd.read_csv(RENDER_INJURY_PATH)
-                print(f"Sakatlık raporu başarıyla belleğe yüklendi ({len(df_injury_report)} oyuncu).")
-            except Exception as e_inj:
-                print(f"UYARI: Sakatlık raporu indirilirken/okunurken hata: {e_inj}")
-                df_injury_report = pd.DataFrame(columns=['Player']) # Boş bir DF oluştur
-            
-            DATA_CACHE["data_last_loaded"] = time.ctime()
-            
+            df_oyuncu_sezon = _coerce_oyuncu_sezon(_read_table(engine, 'oyuncu_sezon_istatistikleri'))
+
+            for table_name in INCREMENTAL_TABLES:
+                watermarks[table_name] = _table_watermark(engine, table_name)
+                print(f"  Son kayıt ({table_name}): {watermarks[table_name]}")
+            print("Veritabanından okuma tamamlandı.")
+
+            df_oyuncu_mac = _compact_frame(df_oyuncu_mac, 'oyuncu_mac_performanslari')
+            df_oyuncu_sezon = _compact_frame(df_oyuncu_sezon, 'oyuncu_sezon_istatistikleri')
+            df_takim_mac = _compact_frame(df_takim_mac, 'maclar')
+
+            _save_table_cache(db_sha, {
+                'oyuncu_mac_performanslari': df_oyuncu_mac,
+                'oyuncu_sezon_istatistikleri': df_oyuncu_sezon,
+                'maclar': df_takim_mac,
+            }, watermarks)
+            if SHARED_DATA_MODE:
+                # Bu worker da diğerleri gibi mmap'li kolonları kullansın (bellekteki kopya bırakılır)
+                cached = _load_table_cache(db_sha)
+                if cached is not None:
+                    df_oyuncu_mac = cached[0]['oyuncu_mac_performanslari']
+                    df_oyuncu_sezon = cached[0]['oyuncu_sezon_istatistikleri']
+                    df_takim_mac = cached[0]['maclar']
+
+        print("Oyuncu indeksi (PLAYER_NAME -> tarih sıralı maç dilimi) kuruluyor...")
+        player_index = analysis_engine.build_player_index(df_oyuncu_mac)
+        # Seri tabloları: önceki snapshot'ınkiler varsa yalnızca yeni maçlar eklenir (baştan kurulmaz)
+        print("PTS seri tabloları (oyuncu x yarım puan baremi) güncelleniyor...")
+        streak_tables = analysis_engine.build_streak_tables(player_index, previous=previous.streak_tables)
+        print("Takım fikstür indeksi (TEAM_ID, tarih) -> B2B / dinlenme kuruluyor...")
+        team_schedule_index = analysis_engine.build_team_schedule_index(df_takim_mac)
+        print("Backtest sonuç indeksi (PLAYER_ID, GAME_ID) -> PTS kuruluyor...")
+        result_index = analysis_engine.build_result_index(df_oyuncu_mac)
+
+        all_players_list = sorted(df_oyuncu_mac['PLAYER_NAME'].unique())
+        all_teams_list = sorted(df_takim_mac['TEAM_NAME'].unique())
+        print(f"Başarılı: {len(all_players_list)} oyuncu, {len(all_teams_list)} takım belleğe yüklendi.")
+
+        nba_team_id_to_abbr, nba_abbr_to_id = _build_team_maps(df_oyuncu_sezon)
+        fields.update(
+            df_oyuncu_mac=df_oyuncu_mac, df_oyuncu_sezon=df_oyuncu_sezon, df_takim_mac=df_takim_mac,
+            player_index=player_index, streak_tables=streak_tables,
+            team_schedule_index=team_schedule_index, result_index=result_index,
+            all_players_list=all_players_list, all_teams_list=all_teams_list,
+            nba_team_id_to_abbr=nba_team_id_to_abbr, nba_abbr_to_id=nba_abbr_to_id,
+        )
+
+    # === BÖLÜM 2: Fikstürü İndir (games_today.json) ===
+    print(f"S3'ten fikstür indiriliyor: {GAMES_TODAY_URL}")
+    # (Küçük dosyalar: paylaşımlı modda başka worker'ın indirdiği sürüm her seferinde yeniden okunur)
+    if download_if_changed(GAMES_TODAY_URL, RENDER_GAMES_TODAY_PATH, force=not incremental) or previous.df_games_today.empty or SHARED_DATA_MODE:
+        print(f"Fikstür '{RENDER_GAMES_TODAY_PATH}' konumundan okunuyor.")
+        fields['df_games_today'] = pd.read_json(RENDER_GAMES_TODAY_PATH)
+    if fields['df_games_today'].empty: print("UYARI: Fikstür dosyası bulundu ancak içi boş.")
+    else: print(f"Fikstür başarıyla belleğe yüklendi ({len(fields['df_games_today'])} maç).")
+
+    # === BÖLÜM 3: Sakatlık Raporunu İndir (nba-injury-report.csv) ===
+    try:
+        print(f"S3'ten sakatlık raporu indiriliyor: {INJURY_FILE_URL}")
+        if download_if_changed(INJURY_FILE_URL, RENDER_INJURY_PATH, force=not incremental) or previous.df_injury_report.empty or SHARED_DATA_MODE:
+            fields['df_injury_report'] = pd.read_csv(RENDER_INJURY_PATH)
+        print(f"Sakatlık raporu başarıyla belleğe yüklendi ({len(fields['df_injury_report'])} oyuncu).")
+    except Exception as e_inj:
+        print(f"UYARI: Sakatlık raporu indirilirken/okunurken hata: {e_inj}")
+        fields['df_injury_report'] = pd.DataFrame(columns=['Player']) # Boş bir DF oluştur
+
+    table_cache.write_pointer(TABLE_CACHE_DIR, db_sha, RENDER_DB_PATH)
+    fields.update(watermarks=watermarks, db_sha256=db_sha, version=previous.version + 1, loaded_at=time.ctime())
+    return DataSnapshot(**fields)
+
+def load_data_from_s3(incremental=True):
+    """
+    Yeni bir veri snapshot'ı kurar ve atomik olarak yerine koyar.
+    Kurulum hiçbir istek kilidi tutulmadan yapılır; istekler bu sürede mevcut snapshot ile çalışmaya devam eder.
+    'incremental=False' tüm dosyaları koşulsuz indirir ve tabloları baştan okur.
+    """
+    global _current_snapshot
+
+    if not DB_FILE_URL or not GAMES_TODAY_URL or not INJURY_FILE_URL:
+        print("HATA: DB_FILE_URL, GAMES_TODAY_URL veya INJURY_FILE_URL ayarlanmamış, veri çekilemiyor.")
+        return False
+
+    with REFRESH_LOCK:
+        print(f"Veri yükleme fonksiyonu (load_data_from_s3) başladı... (Artımlı: {incremental})")
+        start_time = time.time()
+        try:
+            if SHARED_DATA_MODE:
+                with table_cache.process_lock(TABLE_CACHE_DIR):
+                    _load_http_validators()  # Kilidi bekleyen sürede başka bir worker indirmiş olabilir
+                    new_snapshot = _build_snapshot(get_snapshot(), incremental)
+            else:
+                new_snapshot = _build_snapshot(get_snapshot(), incremental)
         except Exception as e:
             print(f"KRİTİK HATA: S3'ten veri yüklenirken hata oluştu: {e}")
             print(traceback.format_exc())
-            print("Veri kilidi serbest bırakıldı (load_data_from_s3 - HATA).")
-            return False 
-        
-        # NBA API Haritasını Yükle
-        try:
-            from nba_api.stats.static import teams as nba_static_teams
-            nba_teams_all = nba_static_teams.get_teams()
-            nba_team_id_to_abbr = {team['id']: team['abbreviation'] for team in nba_teams_all}
-            nba_abbr_to_id = {team['abbreviation']: team['id'] for team in nba_teams_all}
-        except Exception:
-             print("UYARI: nba-api 'get_teams' çağrısı başarısız. Bellekten yedek harita oluşturuluyor.")
-             try:
-                 team_data = df_oyuncu_sezon[['TEAM_ID', 'TEAM_ABBREVIATION']].drop_duplicates()
-                 nba_team_id_to_abbr = pd.Series(
-                     team_data['TEAM_ABBREVIATION'].values, 
-                     index=team_data['TEAM_ID']
-                 ).to_dict()
-                 nba_abbr_to_id = pd.Series(
-                     team_data['TEAM_ID'].values, 
-                     index=team_data['TEAM_ABBREVIATION']
-                 ).to_dict()
-             except Exception as e_map:
-                 print(f"HATA: Yedek harita oluşturulamadı: {e_map}")
-                 nba_team_id_to_abbr = {}
-                 nba_abbr_to_id = {}
-             
+            DATA_CACHE["last_refresh_error"] = str(e)
+            return False
+
+        # Tek bir referans ataması: okuyucular ya eski ya yeni snapshot'ı görür, yarım kalmış veriyi asla görmez.
+        _current_snapshot = new_snapshot
+        ANALYSIS_CACHE.clear()  # Eski sürüme ait sonuçlar artık istenmeyecek (anahtar sürüm içerir)
+        HYBRID_PLAYERS_CACHE.clear()
+        REPLAY_INDEX_CACHE.clear()
+        _swap_slate_pool(new_snapshot)  # Çalışanlar yeni snapshot'ın fikstür indeksiyle burada başlatılır
+        DATA_CACHE["data_last_loaded"] = new_snapshot.loaded_at
+        DATA_CACHE["last_refresh_error"] = None
+
         end_time = time.time()
-        print(f"--- VERİ BAŞARIYLA YÜKLENDİ ({end_time - start_time:.2f} saniye) ---")
-        print("Veri kilidi serbest bırakıldı (load_data_from_s3 - Başarılı).")
-        return True 
+        print(f"--- VERİ BAŞARIYLA YÜKLENDİ (Snapshot v{new_snapshot.version}, {end_time - start_time:.2f} saniye) ---")
+        return True
+
+def _background_refresh(incremental):
+    try:
+        load_data_from_s3(incremental=incremental)
+    finally:
+        DATA_CACHE["refresh_running"] = False
+
+def sync_shared_snapshot():
+    """
+    Paylaşımlı modda işaretçi dosyasını (en fazla SHARED_DATA_POLL_SECONDS'ta bir) kontrol eder;
+    başka bir worker yeni veritabanını yüklediyse bu worker da arka planda ona geçer.
+    """
+    now = time.time()
+    if now - DATA_CACHE["last_pointer_check"] < SHARED_DATA_POLL_SECONDS:
+        return
+    DATA_CACHE["last_pointer_check"] = now
+    pointer = table_cache.read_pointer(TABLE_CACHE_DIR)
+    if pointer and pointer.get("db_sha256") != get_snapshot().db_sha256:
+        print(f"Paylaşımlı veri değişmiş (SHA-256 {pointer['db_sha256'][:12]}...), bu worker yeni veriye geçiyor...")
+        start_background_refresh(incremental=True)
+
+def start_background_refresh(incremental=True):
+    """ Veri yenilemeyi arka plan thread'inde başlatır. Zaten çalışan bir yenileme varsa False döner. """
+    if DATA_CACHE["refresh_running"]:
+        return False
+    DATA_CACHE["refresh_running"] = True
+    threading.Thread(target=_background_refresh, args=(incremental,), daemon=True).start()
+    return True
 
 # ======================================================
 # === HAFIZA (CACHE & LOG) YÖNETİMİ ===
@@ -225,52 +664,122 @@ def save_cache():
         print(f"HATA: Barem hafızası '{CACHE_FILE}' dosyasına kaydedilemedi: {e}")
 
 def load_log():
-    global analysis_log
-    if not os.path.exists(LOG_FILE):
-        return 
+    """ Log deposunu hazırlar; eski 'analysis_log.json' varsa bir kez depoya aktarır. """
     try:
-        with open(LOG_FILE, 'r') as f:
-            analysis_log = json.load(f)
-            print(f"BAŞARILI: '{LOG_FILE}' dosyasından analiz logları yüklendi.")
+        log_store.init_store(LOG_DB_FILE)
+        migrated_days = log_store.migrate_json_log(LOG_DB_FILE, LOG_FILE)
+        if migrated_days:
+            print(f"BAŞARILI: '{LOG_FILE}' dosyasındaki {migrated_days} günlük log '{LOG_DB_FILE}' deposuna aktarıldı.")
+        print(f"BAŞARILI: Analiz log deposu hazır: '{LOG_DB_FILE}'")
     except Exception as e:
-        print(f"HATA: '{LOG_FILE}' okunurken hata (dosya bozuk olabilir): {e}")
-        analysis_log = {}
+        print(f"HATA: Analiz log deposu '{LOG_DB_FILE}' hazırlanamadı: {e}")
 
-def save_log():
+def save_log(log_date, records):
+    """ Yalnızca verilen günün loglarını yazar (diğer günlere dokunulmaz). """
     try:
-        with open(LOG_FILE, 'w') as f:
-            json.dump(analysis_log, f, indent=4)
-            print(f"BAŞARILI: Analiz logları '{LOG_FILE}' dosyasına kaydedildi.")
+        log_store.write_day(LOG_DB_FILE, log_date, records)
+        print(f"BAŞARILI: '{log_date}' tarihli analiz logları '{LOG_DB_FILE}' deposuna kaydedildi.")
     except Exception as e:
-        print(f"HATA: Analiz logları '{LOG_FILE}' dosyasına kaydedilemedi: {e}")
+        print(f"HATA: Analiz logları '{LOG_DB_FILE}' deposuna kaydedilemedi: {e}")
+
+def _grade_log_day(snap, date_str):
+    """ Tek bir günü notlar. Dönüş: (counts, tahmin_sayısı, written_at) veya gün boşsa None. """
+    predictions, written_at = log_store.read_day_for_grading(LOG_DB_FILE, date_str)
+    if not predictions:
+        return None
+    (_, _, _, counts) = analysis_engine.run_backtest_logic(
+        predictions, snap.df_oyuncu_mac, MINIMUM_PATTERN_PROBABILITY,
+        result_index=snap.result_index
+    )
+    return counts, len(predictions), written_at
+
+def update_day_grades(snap):
+    """
+    Notu eksik / eskimiş günleri (bkz. log_store.stale_grade_dates) notlayıp depoya yazar.
+    Tam sonuçlu günler tekrar notlanmaz; eksik sonuçlu günler yalnızca veritabanı değiştiyse notlanır.
+    Günler BACKTEST_WORKERS thread'ine dağıtılır; sonuçlar tarih sırasıyla toplanıp tek işlemde yazılır.
+    Dönüş: notlanan gün sayısı.
+    """
+    stale_dates = log_store.stale_grade_dates(LOG_DB_FILE, snap.db_sha256, MINIMUM_PATTERN_PROBABILITY)
+    if BACKTEST_WORKERS > 1 and len(stale_dates) > 1:
+        with ThreadPoolExecutor(max_workers=BACKTEST_WORKERS, thread_name_prefix="backtest") as executor:
+            graded = list(executor.map(lambda date_str: _grade_log_day(snap, date_str), stale_dates))
+    else:
+        graded = [_grade_log_day(snap, date_str) for date_str in stale_dates]
+
+    day_grades = []
+    for date_str, result in zip(stale_dates, graded):
+        if result is not None:
+            day_grades.append((date_str, *result))
+    log_store.save_grades(LOG_DB_FILE, day_grades, snap.db_sha256, MINIMUM_PATTERN_PROBABILITY)
+    return len(stale_dates)
+
+def _clean_json_value(value):
+    """ Tek bir değeri JSON'a uygun hale getirir (NaN/NaT -> None, NumPy -> Python tipi). """
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is bool:
+        return value
+    if value_type is float:
+        return None if value != value else value
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, np.integer): 
+        return int(value)
+    if isinstance(value, np.floating): 
+        return float(value)
+    if isinstance(value, np.bool_): 
+        return bool(value)
+    return value
 
 def clean_data_for_json(data_list): 
-    cleaned_list = []
+    """ Sözlük listesindeki değerleri JSON'a uygun hale getirir (küçük listeler için: analiz sonuçları). """
     if not isinstance(data_list, list):
         return []
+    cleaned_list = []
     for item_dict in data_list:
         if not isinstance(item_dict, dict):
             cleaned_list.append(item_dict)
             continue
-        cleaned_item = {}
-        for key, value in item_dict.items():
-            if pd.isna(value):
-                cleaned_item[key] = None
-            elif isinstance(value, np.integer): 
-                cleaned_item[key] = int(value)
-            elif isinstance(value, np.floating): 
-                cleaned_item[key] = float(value)
-            elif isinstance(value, np.bool_): 
-                cleaned_item[key] = bool(value)
-            else:
-                cleaned_item[key] = value 
-        cleaned_list.append(cleaned_item)
+        cleaned_list.append({key: _clean_json_value(value) for key, value in item_dict.items()})
     return cleaned_list
 
+def frame_to_json_records(df, overrides=None):
+    """
+    DataFrame -> JSON'a uygun kayıt listesi; clean_data_for_json(df.to_dict('records')) ile aynı çıktı.
+    Dönüşüm hücre hücre değil kolon bazında yapılır: sayısal kolonlar tek bir tolist() ile Python
+    tiplerine çevrilir, NaN maskesi kolon başına bir kez hesaplanır.
+    'overrides' = {kolon: Series} ile bazı kolonlar (örn. metne çevrilmiş tarihler) değiştirilebilir.
+    """
+    overrides = overrides or {}
+    column_values = []
+    for col in df.columns:
+        series = overrides.get(col, df[col])
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+            values = series.tolist()
+        elif pd.api.types.is_float_dtype(dtype):
+            values = series.tolist()
+            nan_positions = np.flatnonzero(series.isna().to_numpy())
+            for i in nan_positions:
+                values[i] = None
+        elif isinstance(dtype, pd.CategoricalDtype):
+            values = [_clean_json_value(v) for v in series.astype(object).tolist()]
+        else:
+            values = [_clean_json_value(v) for v in series.tolist()]
+        column_values.append(values)
+    keys = list(df.columns)
+    return [dict(zip(keys, row)) for row in zip(*column_values)]
+
 # --- Flask Uygulaması ---
 app = Flask(__name__)
 app.secret_key = 'sizin-cok-gizli-anahtariniz-12345' 
 
+@app.before_request
+def _before_request_sync_data():
+    """ Paylaşımlı veri modunda diğer worker'ların yaptığı yenilemeyi takip eder. """
+    if SHARED_DATA_MODE:
+        sync_shared_snapshot()
+
 # ======================================================
 # === KULLANICI GİRİŞ (LOGIN) SİSTEMİ (GÜNCELLENDİ) ===
 # ======================================================
@@ -434,19 +943,19 @@ def route_index():
 @login_required
 def route_oyuncu():
     """ Oyuncu Analizi sekmesi (GET) """
-    return render_template("oyuncu.html", players=ALL_PLAYERS_LIST, report_string=None)
+    return render_template("oyuncu.html", players=get_snapshot().all_players_list, report_string=None)
 
 @app.route('/takim')
 @login_required
 def route_takim():
     """ Takım Analizi sekmesi (GET) """
-    return render_template("takim.html", teams=ALL_TEAMS_LIST, report_string=None)
+    return render_template("takim.html", teams=get_snapshot().all_teams_list, report_string=None)
 
 @app.route('/backtest')
 @login_required
 def route_backtest():
     """ Analiz Başarısı sekmesi (GET) """
-    sorted_dates = sorted(analysis_log.keys(), reverse=True)
+    sorted_dates = log_store.list_dates(LOG_DB_FILE)[::-1]
     # (backtest.html'in bu rotayı çağıran yeni butonları içermesi gerekir)
     return render_template("backtest.html", log_dates=sorted_dates)
 
@@ -454,21 +963,31 @@ def route_backtest():
 @login_required
 def route_veri_guncelle():
     """Veri güncelleme sayfasını gösterir."""
-    last_load = DATA_CACHE.get("data_last_loaded", "Veri henüz yüklenmedi")
+    last_load = DATA_CACHE.get("data_last_loaded") or "Veri henüz yüklenmedi"
+    message = f"Son Veri Yükleme Zamanı: {last_load} (Snapshot v{get_snapshot().version})"
+    cache_stats = ANALYSIS_CACHE.stats()
+    message += (f" | Analiz önbelleği: {cache_stats['size']}/{cache_stats['maxsize']} kayıt, "
+                f"{cache_stats['hits']} isabet, {cache_stats['misses']} ıskalama")
+    if DATA_CACHE.get("last_refresh_error"):
+        message += f" | Son yenileme HATASI: {DATA_CACHE['last_refresh_error']}"
     return render_template("veri_guncelle.html", 
-                           message=f"Son Veri Yükleme Zamanı: {last_load}",
-                           is_running=False) 
+                           message=message,
+                           is_running=DATA_CACHE["refresh_running"]) 
 
 @app.route('/refresh')
 @login_required
 def route_refresh_data():
-    """Verileri S3'ten zorla yeniden yükler."""
-    print("Manuel veri yenileme (S3'ten indirme) tetiklendi...")
-    success = load_data_from_s3()
-    if success:
-        print("Veri başarıyla S3'ten yeniden indirildi.")
+    """
+    Verileri S3'ten arka planda yeniden yükler (istekler bu sırada eski snapshot ile çalışır).
+    Varsayılan: artımlı (değişmeyen dosyalar indirilmez, yalnızca yeni maç satırları okunur).
+    '?full=1' ile tüm tablolar baştan okunur.
+    """
+    full_reload = request.args.get('full') == '1'
+    print(f"Manuel veri yenileme (S3'ten indirme) tetiklendi... (Tam yükleme: {full_reload})")
+    if start_background_refresh(incremental=not full_reload):
+        print("Veri yenileme arka planda başlatıldı.")
     else:
-        print("Veri yüklenirken HATA oluştu.")
+        print("UYARI: Zaten çalışan bir veri yenileme var, yeni talep yok sayıldı.")
     return redirect(url_for('route_veri_guncelle'))
 
 
@@ -482,30 +1001,19 @@ def route_browse_data(file=None):
     file_name = ""
     data_shape = (0, 0)
     
-    print("Veri kilidi alınıyor (Veri Gözat - Kabuk)...")
-    with DATA_LOCK:
-        print("Veri kilidi alındı (Veri Gözat - Kabuk).")
-        target_df = None
-        if file_key == 'oyuncu_mac' and df_oyuncu_mac is not None:
-            file_name = "oyuncu_mac_performanslari.csv"
-            target_df = df_oyuncu_mac
-        elif file_key == 'oyuncu_sezon' and df_oyuncu_sezon is not None:
-            file_name = "oyuncu_sezon_istatistikleri.csv"
-            target_df = df_oyuncu_sezon
-        elif file_key == 'takim_mac' and df_takim_mac is not None:
-            file_name = "maclar.csv (Geçmiş)"
-            target_df = df_takim_mac
-        elif file_key == 'fikstur' and not df_games_today.empty:
-            file_name = "games_today.json (Fikstür)"
-            target_df = df_games_today
-        elif file_key == 'sakatlik' and not df_injury_report.empty: 
-            file_name = "nba-injury-report.csv (Sakatlık)"
-            target_df = df_injury_report
-            
-        if target_df is not None:
-            data_shape = target_df.shape
-            column_names = list(target_df.columns)
-    print("Veri kilidi serbest bırakıldı (Veri Gözat - Kabuk).")
+    snap = get_snapshot()
+    file_names = {
+        'oyuncu_mac': "oyuncu_mac_performanslari.csv",
+        'oyuncu_sezon': "oyuncu_sezon_istatistikleri.csv",
+        'takim_mac': "maclar.csv (Geçmiş)",
+        'fikstur': "games_today.json (Fikstür)",
+        'sakatlik': "nba-injury-report.csv (Sakatlık)",
+    }
+    target_df = _get_table(snap, file_key)
+    if target_df is not None:
+        file_name = file_names[file_key]
+        data_shape = target_df.shape
+        column_names = list(target_df.columns)
             
     column_names_json = json.dumps(column_names)
     datatable_lang_url = "https://cdn.datatables.net/plug-ins/2.0.8/i18n/tr.json"
@@ -521,44 +1029,265 @@ def route_browse_data(file=None):
     )
 
 
+def _get_table(snap, file_key):
+    """ 'file_key' -> snapshot'taki DataFrame (yoksa / boşsa None). """
+    if file_key == 'oyuncu_mac':
+        return snap.df_oyuncu_mac
+    if file_key == 'oyuncu_sezon':
+        return snap.df_oyuncu_sezon
+    if file_key == 'takim_mac':
+        return snap.df_takim_mac
+    if file_key == 'fikstur' and not snap.df_games_today.empty:
+        return snap.df_games_today
+    if file_key == 'sakatlik' and not snap.df_injury_report.empty:
+        return snap.df_injury_report
+    return None
+
+def _table_to_records(df):
+    """ Tarih kolonlarını 'YYYY-MM-DD' metnine çevirip JSON'a uygun kayıt listesi döndürür. """
+    overrides = {}
+    if 'GAME_DATE' in df.columns:
+        overrides['GAME_DATE'] = df['GAME_DATE'].dt.strftime('%Y-%m-%d')
+    if 'GAME_DATE_EST' in df.columns:
+        overrides['GAME_DATE_EST'] = pd.to_datetime(df['GAME_DATE_EST']).dt.strftime('%Y-%m-%d')
+    return frame_to_json_records(df, overrides)
+
+# --- DataTables sunucu taraflı işleme (server-side processing) ---
+# Snapshot sürümü + tablo başına: kolon sıralama permütasyonları (argsort) ve arama için
+# kolonların kodlanmış hali (satır başına dar tamsayı kod + ekranda görünen küçük harfli benzersiz metinler).
+# Anahtar snapshot sürümünü içerir; eski sürümlerin durumları LRU ile düşer.
+DATATABLE_CACHE_MAX_ENTRIES = 8      # (snapshot sürümü, tablo) durumları
+DATATABLE_SEARCH_MAX_COLUMNS = 64    # Tablo başına önbellekte tutulan arama kolonu (en geniş tablonun tamamı)
+DATATABLE_DEFAULT_LENGTH = 25
+_DATATABLE_CACHE = LRUCache(DATATABLE_CACHE_MAX_ENTRIES)
+
+def _datatable_state(snap, file_key):
+    return _DATATABLE_CACHE.get_or_compute(
+        (snap.version, file_key),
+        lambda: {'order': {}, 'search': LRUCache(DATATABLE_SEARCH_MAX_COLUMNS)}
+    )
+
+def _datatable_sort_positions(state, df, col, ascending):
+    """ Kolonun (önbellekli) sıralama permütasyonu. Boş değerler her iki yönde de sonda kalır. """
+    cache_key = (col, ascending)
+    positions = state['order'].get(cache_key)
+    if positions is None:
+        series = df[col].reset_index(drop=True)
+        positions = series.sort_values(ascending=ascending, kind='mergesort', na_position='last').index.to_numpy()
+        state['order'][cache_key] = positions
+    return positions
+
+def _datatable_display_text(uniques):
+    """
+    Benzersiz değerlerin tabloda görünen metni (JSON -> JavaScript): 12.0 -> '12', 0.45 -> '0.45', True -> 'true'.
+    Sayısal kolonlar bu metinle aranır; ekranda görünmeyen biçimler ('12.0', 'nan') eşleşmez.
+    """
+    if pd.api.types.is_bool_dtype(uniques.dtype):
+        return pd.Index(['true' if value else 'false' for value in uniques])
+    if pd.api.types.is_float_dtype(uniques.dtype):
+        return pd.Index([str(int(value)) if value.is_integer() else repr(value) for value in uniques.tolist()])
+    return uniques.astype(str).str.lower()
+
+def _datatable_search_column(state, df, col):
+    """ Arama için kolonun (kodlar, ekranda görünen küçük harfli benzersiz metinler) hali (önbellekli). """
+    series = df[col]
+
+    def encode():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy(), series.cat.categories.astype(str).str.lower()
+        values = pd.to_datetime(series).dt.strftime('%Y-%m-%d') if col in ('GAME_DATE', 'GAME_DATE_EST') else series
+        codes, uniques = pd.factorize(values)
+        # Boş değerlerin kodu -1'dir (hiçbir metinle eşleşmez); kodlar bellekte dar tamsayı olarak tutulur
+        codes = codes.astype(np.int16 if len(uniques) < np.iinfo(np.int16).max else np.int32)
+        return codes, _datatable_display_text(pd.Index(uniques))
+    return state['search'].get_or_compute(col, encode)
+
+def _datatable_filter_mask(state, df, search_value):
+    """ DataTables 'akıllı arama': boşlukla ayrılmış her kelime satırın herhangi bir kolonunda (görünen metin) geçmeli. """
+    mask = np.ones(len(df), dtype=bool)
+    for word in search_value.lower().split():
+        word_mask = np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            codes, categories = _datatable_search_column(state, df, col)
+            matching_codes = np.flatnonzero(categories.str.contains(word, regex=False))
+            word_mask |= np.isin(codes, matching_codes)
+        mask &= word_mask
+    return mask
+
+def _int_arg(args, name, default):
+    """ Tamsayı istek parametresi; yoksa / boşsa 'default', sayı değilse ValueError. """
+    value = args.get(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' bir tamsayı olmalı: {value!r}") from None
+
+def _datatable_params(args, n_columns):
+    """ DataTables parametrelerini (draw, start, length, order, search) doğrular. Geçersizse ValueError (-> 400). """
+    order_col = _int_arg(args, 'order[0][column]', None)
+    return {
+        'draw': _int_arg(args, 'draw', 0),
+        'start': max(_int_arg(args, 'start', 0), 0),
+        'length': _int_arg(args, 'length', DATATABLE_DEFAULT_LENGTH),
+        'order_col': order_col if order_col is not None and 0 <= order_col < n_columns else None,
+        'ascending': args.get('order[0][dir]', 'asc') != 'desc',
+        'search': (args.get('search[value]') or '').strip(),
+    }
+
+def _datatable_page(snap, file_key, df, params):
+    """ Doğrulanmış DataTables parametrelerine (bkz. _datatable_params) göre tek bir sayfa üretir. """
+    state = _datatable_state(snap, file_key)
+    total = len(df)
+    start, length = params['start'], params['length']
+
+    positions = np.arange(total)
+    if params['order_col'] is not None:
+        positions = _datatable_sort_positions(state, df, df.columns[params['order_col']], params['ascending'])
+
+    if params['search']:
+        mask = _datatable_filter_mask(state, df, params['search'])
+        positions = positions[mask[positions]]
+
+    page_positions = positions[start:] if length < 0 else positions[start:start + length]
+    return {
+        "draw": params['draw'],
+        "recordsTotal": total,
+        "recordsFiltered": len(positions),
+        "data": _table_to_records(df.iloc[page_positions]),
+    }
+
 @app.route('/api/get_data/<string:file_key>')
 @api_login_required 
 def route_get_data(file_key):
-    """DataTables için JSON verisi sağlar."""
+    """
+    DataTables için JSON verisi sağlar.
+    'draw' parametresi varsa sunucu taraflı işleme: yalnızca istenen sayfa sıralanır / filtrelenir / serileştirilir.
+    Yoksa (eski davranış) tüm tablo tek seferde döner.
+    """
     print(f"API verisi talep edildi: {file_key}")
-    print("Veri kilidi alınıyor (API)...")
-    with DATA_LOCK:
-        print("Veri kilidi alındı (API).")
-        target_df = None
-        if file_key == 'oyuncu_mac' and df_oyuncu_mac is not None:
-            target_df = df_oyuncu_mac
-        elif file_key == 'oyuncu_sezon' and df_oyuncu_sezon is not None:
-            target_df = df_oyuncu_sezon
-        elif file_key == 'takim_mac' and df_takim_mac is not None:
-            target_df = df_takim_mac
-        elif file_key == 'fikstur' and not df_games_today.empty:
-            target_df = df_games_today
-        elif file_key == 'sakatlik' and not df_injury_report.empty:
-            target_df = df_injury_report
+    snap = get_snapshot()
+    target_df = _get_table(snap, file_key)
+    if target_df is None:
+        return jsonify({"error": "Geçersiz dosya anahtarı veya veri yüklenmemiş", "data": []}), 404
+    params = None
+    if 'draw' in request.args:
+        try:
+            params = _datatable_params(request.args, len(target_df.columns))
+        except ValueError as e:
+            return jsonify({"error": f"Geçersiz DataTables parametresi: {e}", "data": []}), 400
+    try:
+        if params is not None:
+            return jsonify(_datatable_page(snap, file_key, target_df, params))
+        return jsonify(data=_table_to_records(target_df))
+    except Exception as e:
+        print(f"KRİTİK HATA (route_get_data): JSON dönüşümü başarısız! {e}")
+        print(traceback.format_exc())
+        return jsonify({"error": str(e), "data": []}), 500
+
+
+# --- Akışlı (streaming) dışa aktarma ---
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+def _export_chunks(df, export_format, date_col):
+    """ Tabloyu EXPORT_CHUNK_ROWS satırlık parçalar halinde seçilen formatta (bytes) üretir. """
+    if export_format == 'arrow':
+        sink = io.BytesIO()
+        writer = None
+        for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+            batch = pa.RecordBatch.from_pandas(df.iloc[start:start + EXPORT_CHUNK_ROWS], preserve_index=False)
+            if writer is None:
+                writer = pa_ipc.new_stream(sink, batch.schema)
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+        if writer is None:
+            writer = pa_ipc.new_stream(sink, pa.Schema.from_pandas(df, preserve_index=False))
+        writer.close()
+        yield sink.getvalue()
+        return
+
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        if export_format == 'csv':
+            yield chunk.to_csv(index=False, header=(start == 0), date_format='%Y-%m-%d').encode('utf-8')
         else:
-            print("Veri kilidi serbest bırakıldı (API - Hata).")
-            return jsonify({"error": "Geçersiz dosya anahtarı veya veri yüklenmemiş", "data": []}), 404
+            overrides = {date_col: pd.to_datetime(chunk[date_col]).dt.strftime('%Y-%m-%d')} if date_col else None
+            lines = [json.dumps(record, ensure_ascii=False) for record in frame_to_json_records(chunk, overrides)]
+            yield ("\n".join(lines) + "\n").encode('utf-8')
+    if export_format == 'csv' and len(df) == 0:
+        yield df.to_csv(index=False).encode('utf-8')
+
+def _gzip_stream(chunks):
+    """ Parçaları tek bir gzip akışı olarak sıkıştırır (tüm çıktı bellekte biriktirilmez). """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@app.route('/api/export/<string:file_key>')
+@api_login_required
+def route_export_data(file_key):
+    """
+    Bellekteki tabloyu parça parça (streaming) dışa aktarır.
+    Parametreler: format=csv|ndjson|arrow (varsayılan csv), columns=KOL1,KOL2 (kolon seçimi),
+    date_from / date_to=YYYY-MM-DD (GAME_DATE / GAME_DATE_EST aralığı, uçlar dahil),
+    gzip=1 (veya istemci 'Accept-Encoding: gzip' gönderirse) sıkıştırılmış akış.
+    """
+    snap = get_snapshot()
+    target_df = _get_table(snap, file_key)
+    if target_df is None:
+        return jsonify({"error": "Geçersiz dosya anahtarı veya veri yüklenmemiş"}), 404
+
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Desteklenmeyen format: {export_format} (csv, ndjson, arrow)"}), 400
+    if export_format == 'arrow' and pa is None:
+        return jsonify({"error": "Arrow formatı için sunucuda 'pyarrow' kurulu değil (csv veya ndjson kullanın)."}), 400
+
+    date_col = next((c for c in ('GAME_DATE', 'GAME_DATE_EST') if c in target_df.columns), None)
+    date_from, date_to = request.args.get('date_from'), request.args.get('date_to')
+    if date_from or date_to:
+        if date_col is None:
+            return jsonify({"error": f"'{file_key}' tablosunda tarih kolonu yok, tarih filtresi uygulanamaz."}), 400
         try:
-            temp_df = target_df.copy()
-            if 'GAME_DATE' in temp_df.columns:
-                temp_df['GAME_DATE'] = temp_df['GAME_DATE'].dt.date.astype(str).replace('NaT', None)
-            if 'GAME_DATE_EST' in temp_df.columns:
-                temp_df['GAME_DATE_EST'] = pd.to_datetime(temp_df['GAME_DATE_EST']).dt.date.astype(str).replace('NaT', None)
-                
-            data_records = temp_df.to_dict('records')
-            data_records_clean = clean_data_for_json(data_records)
-            print("Veri kilidi serbest bırakıldı (API - Başarılı).")
-            return jsonify(data=data_records_clean)
-        except Exception as e:
-            print(f"KRİTİK HATA (route_get_data): JSON dönüşümü başarısız! {e}")
-            print(traceback.format_exc())
-            print("Veri kilidi serbest bırakıldı (API - Hata).")
-            return jsonify({"error": str(e), "data": []}), 500
+            dates = pd.to_datetime(target_df[date_col]).dt.normalize()
+            mask = np.ones(len(target_df), dtype=bool)
+            if date_from:
+                mask &= (dates >= pd.Timestamp(date_from)).to_numpy()
+            if date_to:
+                mask &= (dates <= pd.Timestamp(date_to)).to_numpy()
+        except ValueError as e:
+            return jsonify({"error": f"Geçersiz tarih: {e}"}), 400
+        target_df = target_df[mask]
+
+    columns_arg = request.args.get('columns')
+    if columns_arg:
+        columns = [c.strip() for c in columns_arg.split(',') if c.strip()]
+        unknown = [c for c in columns if c not in target_df.columns]
+        if unknown:
+            return jsonify({"error": f"Bilinmeyen kolon(lar): {', '.join(unknown)}"}), 400
+        target_df = target_df[columns]
+        if date_col not in columns:
+            date_col = None
+
+    print(f"Dışa aktarma: {file_key} ({export_format}, {len(target_df)} satır, {target_df.shape[1]} kolon)")
+    chunks = _export_chunks(target_df, export_format, date_col)
+    headers = {"Content-Disposition": f"attachment; filename={file_key}.{export_format}"}
+    use_gzip = request.args.get('gzip') == '1' or 'gzip' in request.headers.get('Accept-Encoding', '')
+    if use_gzip:
+        chunks = _gzip_stream(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return Response(chunks, mimetype=EXPORT_FORMATS[export_format], headers=headers)
 
 
 @app.route('/all-results')
@@ -652,211 +1381,270 @@ def route_gunun_analizi():
 @app.route('/takim-analizi', methods=['POST'])
 @login_required
 def handle_team_analysis():
-    with DATA_LOCK: 
-        try:
-            team_name = request.form.get('team_name')
-            threshold_str = request.form.get('threshold', '105.5')
-            threshold = float(threshold_str)
-            print(f"Takım analizi talebi alındı: {team_name} @ {threshold}")
-
-            report_string = analysis_engine.analyze_team_logic(
+    snap = get_snapshot()
+    try:
+        team_name = request.form.get('team_name')
+        threshold_str = request.form.get('threshold', '105.5')
+        threshold = float(threshold_str)
+        print(f"Takım analizi talebi alındı: {team_name} @ {threshold}")
+
+        report_string = ANALYSIS_CACHE.get_or_compute(
+            (snap.version, 'team', team_name, threshold),
+            lambda: analysis_engine.analyze_team_logic(
                 team_name=team_name,
                 threshold=threshold,
-                df_takim_mac=df_takim_mac 
-            )
-            return render_template(
-                "takim.html", 
-                teams=ALL_TEAMS_LIST,      
-                selected_team=team_name,   
-                selected_threshold=threshold_str, 
-                report_string=report_string 
-            )
-        except Exception as e:
-            error_report = f"KRİTİK HATA:\n{e}\n\n{traceback.format_exc()}"
-            return render_template(
-                "takim.html", 
-                teams=ALL_TEAMS_LIST, 
-                report_string=error_report
+                df_takim_mac=snap.df_takim_mac 
             )
+        )
+        return render_template(
+            "takim.html", 
+            teams=snap.all_teams_list,      
+            selected_team=team_name,   
+            selected_threshold=threshold_str, 
+            report_string=report_string 
+        )
+    except Exception as e:
+        error_report = f"KRİTİK HATA:\n{e}\n\n{traceback.format_exc()}"
+        return render_template(
+            "takim.html", 
+            teams=snap.all_teams_list, 
+            report_string=error_report
+        )
 
 @app.route('/oyuncu-analizi', methods=['POST'])
 @login_required
 def handle_player_analysis():
-    with DATA_LOCK: 
-        try:
-            player_name = request.form.get('player_name')
-            middle_barem_str = request.form.get('middle_barem', '18.5')
-            middle_barem = float(middle_barem_str)
-            print(f"Oyuncu (Aralık) analizi talebi alındı: {player_name} @ {middle_barem}")
-
-            report_string, analysis_results = analysis_engine.analyze_player_logic(
-                player_name=player_name,
-                middle_barem=middle_barem,
-                df_oyuncu_mac=df_oyuncu_mac,
-                df_oyuncu_sezon=df_oyuncu_sezon,
-                ANALYSIS_RANGE=ANALYSIS_RANGE
-            )
-            # NOT: Bu sonuçlar session'a KAYDEDİLMEZ (istediğiniz gibi)
-            return render_template(
-                "oyuncu.html", 
-                players=ALL_PLAYERS_LIST,      
-                selected_player=player_name,   
-                selected_barem=middle_barem_str, 
-                report_string=report_string 
+    snap = get_snapshot()
+    try:
+        player_name = request.form.get('player_name')
+        middle_barem_str = request.form.get('middle_barem', '18.5')
+        middle_barem = float(middle_barem_str)
+        ladder_mode = request.form.get('ladder_mode') == 'on'
+
+        if ladder_mode:
+            print(f"Oyuncu (Barem Merdiveni) analizi talebi alındı: {player_name}")
+            report_string, analysis_results = ANALYSIS_CACHE.get_or_compute(
+                (snap.version, 'ladder', player_name, LADDER_START, LADDER_STOP, LADDER_STEP),
+                lambda: analysis_engine.analyze_player_ladder_logic(
+                    player_name=player_name,
+                    df_oyuncu_mac=snap.df_oyuncu_mac,
+                    df_oyuncu_sezon=snap.df_oyuncu_sezon,
+                    ladder_start=LADDER_START,
+                    ladder_stop=LADDER_STOP,
+                    ladder_step=LADDER_STEP,
+                    player_index=snap.player_index,
+                    streak_tables=snap.streak_tables
+                )
             )
-        except Exception as e:
-            error_report = f"KRİTİK HATA:\n{e}\n\n{traceback.format_exc()}"
-            return render_template(
-                "oyuncu.html", 
-                players=ALL_PLAYERS_LIST, 
-                report_string=error_report
+        else:
+            print(f"Oyuncu (Aralık) analizi talebi alındı: {player_name} @ {middle_barem}")
+            report_string, analysis_results = ANALYSIS_CACHE.get_or_compute(
+                (snap.version, 'player', player_name, middle_barem, ANALYSIS_RANGE),
+                lambda: analysis_engine.analyze_player_logic(
+                    player_name=player_name,
+                    middle_barem=middle_barem,
+                    df_oyuncu_mac=snap.df_oyuncu_mac,
+                    df_oyuncu_sezon=snap.df_oyuncu_sezon,
+                    ANALYSIS_RANGE=ANALYSIS_RANGE,
+                    player_index=snap.player_index,
+                    streak_tables=snap.streak_tables
+                )
             )
+        # NOT: Bu sonuçlar session'a KAYDEDİLMEZ (istediğiniz gibi)
+        return render_template(
+            "oyuncu.html", 
+            players=snap.all_players_list,      
+            selected_player=player_name,   
+            selected_barem=middle_barem_str, 
+            ladder_mode=ladder_mode,
+            report_string=report_string 
+        )
+    except Exception as e:
+        error_report = f"KRİTİK HATA:\n{e}\n\n{traceback.format_exc()}"
+        return render_template(
+            "oyuncu.html", 
+            players=snap.all_players_list, 
+            report_string=error_report
+        )
 
 # ======================================================
 # === HİBRİT ANALİZ TETİKLEYİCİLERİ ===
 # ======================================================
 
+def _hybrid_players_key(snap):
+    """
+    Aday listesi önbellek anahtarı: (snapshot sürümü, fikstür tarihi, sakatlık raporu özeti).
+    Fikstürde tarih yoksa liste bugünün tarihine göre kurulduğu için bugünün tarihi kullanılır.
+    """
+    fixture_date = datetime.now().strftime('%Y-%m-%d')
+    if 'GAME_DATE_EST' in snap.df_games_today.columns and not snap.df_games_today.empty:
+        fixture_date = str(snap.df_games_today['GAME_DATE_EST'].iloc[0])
+    injured = []
+    if 'Player' in snap.df_injury_report.columns:
+        injured = sorted(set(snap.df_injury_report['Player'].dropna().astype(str)))
+    injury_hash = hashlib.sha1("\n".join(injured).encode('utf-8')).hexdigest()
+    return (snap.version, fixture_date, injury_hash)
+
+def _get_hybrid_players(snap):
+    """
+    get_players_for_hybrid_analysis sonucunu önbellekten verir: /get-players'ın kurduğu liste
+    /run-analysis'te yeniden hesaplanmaz. Çağıranlar rapor satırlarına ekleme yaptığı için
+    'report_lines' her seferinde kopyalanır; DataFrame'ler ve takım bağlamları salt okunur kullanılır.
+    "Analiz başladı" zaman damgası önbellekteki değerde yoktur, her çağrıda en başa eklenir.
+    """
+    report_lines, *rest = HYBRID_PLAYERS_CACHE.get_or_compute(
+        _hybrid_players_key(snap),
+        lambda: analysis_engine.get_players_for_hybrid_analysis(
+            df_games_today=snap.df_games_today, 
+            df_oyuncu_mac=snap.df_oyuncu_mac,
+            df_oyuncu_sezon=snap.df_oyuncu_sezon,
+            nba_team_id_to_abbr=snap.nba_team_id_to_abbr,
+            df_injury_report=snap.df_injury_report 
+        )
+    )
+    return ([f"Analiz başladı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"] + list(report_lines), *rest)
+
 @app.route('/get-players')
 @login_required
 def handle_get_players():
-    global cached_barems, cached_player_list_key, nba_team_id_to_abbr, nba_abbr_to_id
+    global cached_barems, cached_player_list_key
     
+    snap = get_snapshot()
     today_str = datetime.now().strftime('%Y-%m-%d')
     report_lines = []
     top_players_final = None
     grouped_players = {}
     
-    with DATA_LOCK: 
-        print("Oyuncu listesi alma talebi alındı...")
-        
-        try:
-            (report_lines, 
-             top_players_final, 
-             today_str, 
-             current_season_players_df, 
-             csv_inactive_player_names) = analysis_engine.get_players_for_hybrid_analysis(
-                 df_games_today=df_games_today, 
-                 df_oyuncu_mac=df_oyuncu_mac,
-                 df_oyuncu_sezon=df_oyuncu_sezon,
-                 nba_team_id_to_abbr=nba_team_id_to_abbr,
-                 df_injury_report=df_injury_report 
-             )
-        
-        except Exception as e:
-            error_report = f"KRİTİK HATA (analysis_engine): {e}\n\n{traceback.format_exc()}"
-            print(error_report)
-            return render_template("index.html", 
-                                   sonuclar=error_report, 
-                                   top_2_picks=[], 
-                                   all_results_ready=False)
-
-        if top_players_final is None:
-            sonuclar = "\n".join(report_lines)
-            return render_template("index.html", 
-                                   sonuclar=sonuclar, 
-                                   top_2_picks=[], 
-                                   all_results_ready=False)
-
-        player_names_for_popup = sorted(top_players_final['PLAYER_NAME'].tolist())
-        current_player_list_key = "-".join(player_names_for_popup)
-        
+    print("Oyuncu listesi alma talebi alındı...")
+    
+    try:
+        (report_lines, 
+         top_players_final, 
+         today_str, 
+         current_season_players_df, 
+         csv_inactive_player_names,
+         _) = _get_hybrid_players(snap)
+    
+    except Exception as e:
+        error_report = f"KRİTİK HATA (analysis_engine): {e}\n\n{traceback.format_exc()}"
+        print(error_report)
+        return render_template("index.html", 
+                               sonuclar=error_report, 
+                               top_2_picks=[], 
+                               all_results_ready=False)
+
+    if top_players_final is None:
+        sonuclar = "\n".join(report_lines)
+        return render_template("index.html", 
+                               sonuclar=sonuclar, 
+                               top_2_picks=[], 
+                               all_results_ready=False)
+
+    player_names_for_popup = sorted(top_players_final['PLAYER_NAME'].tolist())
+    current_player_list_key = "-".join(player_names_for_popup)
+    
+    with STATE_LOCK:
         if current_player_list_key != cached_player_list_key:
             report_lines.append("Yeni oyuncu listesi algılandı. Barem hafázası sıfırlanıyor...")
             cached_barems = {} 
             cached_player_list_key = current_player_list_key 
         else:
             report_lines.append("Hafızadaki baremler (cache) kullanılacak.")
-        
-        if top_players_final is not None:
-            for game_id, group_df in top_players_final.groupby('GAME_ID', sort=False):
-                home_team = group_df.iloc[0].get('HOME_TEAM', 'Ev Sahibi')
-                away_team = group_df.iloc[0].get('AWAY_TEAM', 'Deplasman')
-                matchup_name = f"{away_team} @ {home_team}" 
-                
-                grouped_players[matchup_name] = group_df.to_dict('records')
-        
-        return render_template("index.html", 
-                               sonuclar="\n".join(report_lines),
-                               players_to_analyze_grouped=grouped_players,
-                               cached_barems=cached_barems, 
-                               today_str=today_str,
-                               all_results_ready=False)
+        barems_for_popup = dict(cached_barems)
+    
+    if top_players_final is not None:
+        for game_id, group_df in top_players_final.groupby('GAME_ID', sort=False):
+            home_team = group_df.iloc[0].get('HOME_TEAM', 'Ev Sahibi')
+            away_team = group_df.iloc[0].get('AWAY_TEAM', 'Deplasman')
+            matchup_name = f"{away_team} @ {home_team}" 
+            
+            grouped_players[matchup_name] = group_df.to_dict('records')
+    
+    return render_template("index.html", 
+                           sonuclar="\n".join(report_lines),
+                           players_to_analyze_grouped=grouped_players,
+                           cached_barems=barems_for_popup, 
+                           today_str=today_str,
+                           all_results_ready=False)
 
 @app.route('/run-analysis', methods=['POST'])
 @login_required
 def handle_run_analysis():
-    global cached_barems, analysis_log
-    
-    with DATA_LOCK: 
-        print("Tam analiz talebi alındı...")
-        baremler = [] 
-        form_data = request.form.to_dict()
-        today_str = form_data.pop('today_str', datetime.now().strftime('%Y-%m-%d'))
-        barem_dict = {}
-        for key, value in form_data.items():
-            if not value: 
-                continue
-            try:
-                player_name = key.replace("barem_", "") 
-                barem_dict[player_name] = float(value)
-                baremler.append((player_name, float(value)))
-            except:
-                pass 
+    snap = get_snapshot()
+    print("Tam analiz talebi alındı...")
+    baremler = [] 
+    form_data = request.form.to_dict()
+    today_str = form_data.pop('today_str', datetime.now().strftime('%Y-%m-%d'))
+    barem_dict = {}
+    for key, value in form_data.items():
+        if not value: 
+            continue
+        try:
+            player_name = key.replace("barem_", "") 
+            barem_dict[player_name] = float(value)
+            baremler.append((player_name, float(value)))
+        except:
+            pass 
+    with STATE_LOCK:
         cached_barems.update(barem_dict)
         save_cache()
 
-        (report_lines, 
-            top_players_final, 
-            _, 
-            current_season_players_df, 
-            csv_inactive_player_names) = analysis_engine.get_players_for_hybrid_analysis(
-                 df_games_today=df_games_today, 
-                 df_oyuncu_mac=df_oyuncu_mac, 
-                 df_oyuncu_sezon=df_oyuncu_sezon, 
-                 nba_team_id_to_abbr=nba_team_id_to_abbr,
-                 df_injury_report=df_injury_report 
-            )
-         
-        if top_players_final is None:
-            return render_template("index.html", 
-                                   sonuclar="\n".join(report_lines), 
-                                   top_2_picks=[], 
-                                   all_results_ready=False)
-        try:
-            report_string, top_2_picks, all_adaylar = analysis_engine.run_full_analysis_logic(
-                baremler=baremler,
-                top_players_final=top_players_final,
-                current_season_players_df=current_season_players_df,
-                csv_inactive_player_names=csv_inactive_player_names, 
-                df_oyuncu_mac=df_oyuncu_mac,
-                df_takim_mac=df_takim_mac, 
-                ANALYSIS_RANGE=ANALYSIS_RANGE,
-                MINIMUM_PATTERN_PROBABILITY=MINIMUM_PATTERN_PROBABILITY,
-                today_str=today_str 
-            )
-            
-            all_adaylar_clean = clean_data_for_json(all_adaylar)
-            top_2_picks_clean = clean_data_for_json(top_2_picks)
+    (report_lines, 
+        top_players_final, 
+        _, 
+        current_season_players_df, 
+        csv_inactive_player_names,
+        team_contexts) = _get_hybrid_players(snap)
+     
+    if top_players_final is None:
+        return render_template("index.html", 
+                               sonuclar="\n".join(report_lines), 
+                               top_2_picks=[], 
+                               all_results_ready=False)
+    try:
+        # Toplu motor (slate_engine): tüm slate tek vektörel hesapta
+        # (tüm adaylar sayfası yorumları gösterdiği için metinler herkes için üretilir)
+        report_string, top_2_picks, all_adaylar = slate_engine.run_slate_analysis(
+            baremler=baremler,
+            top_players_final=top_players_final,
+            current_season_players_df=current_season_players_df,
+            csv_inactive_player_names=csv_inactive_player_names, 
+            df_oyuncu_mac=snap.df_oyuncu_mac,
+            df_takim_mac=snap.df_takim_mac, 
+            ANALYSIS_RANGE=ANALYSIS_RANGE,
+            MINIMUM_PATTERN_PROBABILITY=MINIMUM_PATTERN_PROBABILITY,
+            today_str=today_str,
+            player_index=snap.player_index,
+            team_schedule_index=snap.team_schedule_index,
+            team_contexts=team_contexts,
+            render_all=True,
+            pool=_get_slate_pool(snap),
+            pool_shards=SLATE_WORKERS,
+            memoize=lambda key, compute: ANALYSIS_CACHE.get_or_compute((snap.version,) + key, compute),
+            streak_tables=snap.streak_tables
+        )
+        
+        all_adaylar_clean = clean_data_for_json(all_adaylar)
+        top_2_picks_clean = clean_data_for_json(top_2_picks)
 
-            # --- GÜNCELLEME: Session'a kaydetme (Zaten yapılıyordu) ---
-            session['last_full_analysis_results'] = all_adaylar_clean 
-            session['last_diverse_recommendations'] = top_2_picks_clean
-            # --- BİTTİ ---
-            
-            analysis_log[today_str] = all_adaylar_clean
-            save_log()
-            
-            return render_template("index.html", 
-                                   sonuclar=report_string,
-                                   top_2_picks=top_2_picks_clean, 
-                                   all_results_ready=True) 
+        # --- GÜNCELLEME: Session'a kaydetme (Zaten yapılıyordu) ---
+        session['last_full_analysis_results'] = all_adaylar_clean 
+        session['last_diverse_recommendations'] = top_2_picks_clean
+        # --- BİTTİ ---
+        
+        save_log(today_str, all_adaylar_clean)
+        
+        return render_template("index.html", 
+                               sonuclar=report_string,
+                               top_2_picks=top_2_picks_clean, 
+                               all_results_ready=True) 
 
-        except Exception as e:
-            error_report = f"KRİTİK HATA:\n{e}\n\n{traceback.format_exc()}"
-            return render_template("index.html", 
-                                   sonuclar=error_report, 
-                                   top_2_picks=[], 
-                                   all_results_ready=False)
+    except Exception as e:
+        error_report = f"KRİTİK HATA:\n{e}\n\n{traceback.format_exc()}"
+        return render_template("index.html", 
+                               sonuclar=error_report, 
+                               top_2_picks=[], 
+                               all_results_ready=False)
 
 
 # ======================================================
@@ -866,107 +1654,206 @@ def handle_run_analysis():
 @app.route('/run-backtest', methods=['POST'])
 @login_required
 def handle_backtest():
-    with DATA_LOCK:
-        date_str_key = request.form.get('log_date')
-        if not date_str_key:
-            return redirect(url_for('route_backtest'))
-        if df_oyuncu_mac is None:
-            print("HATA (Backtest): df_oyuncu_mac bellekte bulunamadı.")
-            return redirect(url_for('route_backtest'))
+    snap = get_snapshot()
+    date_str_key = request.form.get('log_date')
+    if not date_str_key:
+        return redirect(url_for('route_backtest'))
+    if snap.df_oyuncu_mac is None:
+        print("HATA (Backtest): df_oyuncu_mac bellekte bulunamadı.")
+        return redirect(url_for('route_backtest'))
+    
+    # (Snapshot tabloları değişmez olduğu için .copy() gerekmez; notlama snapshot'ın sonuç indeksiyle yapılır.)
+    saved_predictions, written_at = log_store.read_day_for_grading(LOG_DB_FILE, date_str_key)
+    sorted_dates = log_store.list_dates(LOG_DB_FILE)[::-1]
+    if not saved_predictions:
+        return redirect(url_for('route_backtest'))
         
-        df_mac_results = df_oyuncu_mac.copy()
-        saved_predictions = analysis_log.get(date_str_key, [])
-        if not saved_predictions:
-            return redirect(url_for('route_backtest'))
-            
-        (report_top4, 
-         report_other, 
-         report_summary, 
-         _) = analysis_engine.run_backtest_logic(
-             saved_predictions, df_mac_results, MINIMUM_PATTERN_PROBABILITY
-         )
-         
-        sorted_dates = sorted(analysis_log.keys(), reverse=True)
-        return render_template("backtest.html", 
-                               log_dates=sorted_dates, 
-                               selected_date=date_str_key,
-                               report_top4=report_top4,
-                               report_other=report_other,
-                               report_summary=report_summary)
+    (report_top4, 
+     report_other, 
+     report_summary, 
+     day_counts) = analysis_engine.run_backtest_logic(
+         saved_predictions, snap.df_oyuncu_mac, MINIMUM_PATTERN_PROBABILITY,
+         result_index=snap.result_index
+     )
+    # Hazır hesaplanmışken günün notunu da önbelleğe yaz (toplam backtest tekrar notlamasın)
+    log_store.save_grade(LOG_DB_FILE, date_str_key, day_counts, len(saved_predictions), written_at,
+                         snap.db_sha256, MINIMUM_PATTERN_PROBABILITY)
+     
+    return render_template("backtest.html", 
+                           log_dates=sorted_dates, 
+                           selected_date=date_str_key,
+                           report_top4=report_top4,
+                           report_other=report_other,
+                           report_summary=report_summary)
 
 @app.route('/run-total-backtest')
 @login_required
 def handle_total_backtest():
-    with DATA_LOCK:
-        if df_oyuncu_mac is None:
-            print("HATA (Total Backtest): df_oyuncu_mac bellekte bulunamadı.")
-            return redirect(url_for('route_backtest'))
-        df_mac_results = df_oyuncu_mac.copy()
-        if not analysis_log:
-            return redirect(url_for('route_backtest'))
+    snap = get_snapshot()
+    if snap.df_oyuncu_mac is None:
+        print("HATA (Total Backtest): df_oyuncu_mac bellekte bulunamadı.")
+        return redirect(url_for('route_backtest'))
+    log_dates = log_store.list_dates(LOG_DB_FILE)
+    if not log_dates:
+        return redirect(url_for('route_backtest'))
 
-        total_top_4_s = 0
-        total_top_4_p = 0
-        total_overall_s = 0
-        total_overall_p = 0
-        
-        for date_str, predictions in analysis_log.items():
-            if not predictions:
-                continue
-            (_, _, _, 
-             (day_t4_s, day_t4_p, day_all_s, day_all_p)
-             ) = analysis_engine.run_backtest_logic(
-                 predictions, df_mac_results, MINIMUM_PATTERN_PROBABILITY
-             )
-            total_top_4_s += day_t4_s
-            total_top_4_p += day_t4_p
-            total_overall_s += day_all_s
-            total_overall_p += day_all_p
-        
-        report_summary = []
-        if total_top_4_p == 0:
-            report_summary.append( (f"Top 4 Öneri Başarısı: %0.0 (0/0)", 'buyuk_kirmizi') )
-        else:
-            top_4_rate = (total_top_4_s / total_top_4_p) * 100
-            report_summary.append( (f"Top 4 Öneri Başarısı: %{top_4_rate:.1f} ({total_top_4_s}/{total_top_4_p})", 'buyuk_yesil') )
-            
-        if total_overall_p == 0:
-            report_summary.append( (f"Tüm Analizler Başarısı: %0.0 (0/0)", 'buyuk_kirmizi') )
-        else:
-            total_rate = (total_overall_s / total_overall_p) * 100
-            report_summary.append( (f"Tüm Analizler Başarısı: %{total_rate:.1f} ({total_overall_s}/{total_overall_p})", 'buyuk_yesil') )
+    # Yalnızca notu olmayan / yeni sonuç gelmiş günler notlanır; toplam, kayıtlı notların toplamıdır.
+    graded_count = update_day_grades(snap)
+    print(f"Toplam backtest: {len(log_dates)} gün, {graded_count} gün yeniden notlandı.")
+    report_summary = _success_summary(log_store.grade_totals(LOG_DB_FILE))
+    
+    return render_template("backtest.html", 
+                           log_dates=log_dates[::-1], 
+                           selected_date=f"TOTAL ({len(log_dates)} GÜN)",
+                           report_top4=[], 
+                           report_other=[],
+                           report_summary=report_summary)
+
+def _success_summary(counts):
+    """ (top4_s, top4_p, total_s, total_p) sayaçlarından özet satırları (toplam backtest ve replay için). """
+    (total_top_4_s, total_top_4_p, total_overall_s, total_overall_p) = counts
+    report_summary = []
+    if total_top_4_p == 0:
+        report_summary.append( (f"Top 4 Öneri Başarısı: %0.0 (0/0)", 'buyuk_kirmizi') )
+    else:
+        top_4_rate = (total_top_4_s / total_top_4_p) * 100
+        report_summary.append( (f"Top 4 Öneri Başarısı: %{top_4_rate:.1f} ({total_top_4_s}/{total_top_4_p})", 'buyuk_yesil') )
         
-        sorted_dates = sorted(analysis_log.keys(), reverse=True)
-        return render_template("backtest.html", 
-                               log_dates=sorted_dates, 
-                               selected_date=f"TOTAL ({len(analysis_log)} GÜN)",
-                               report_top4=[], 
-                               report_other=[],
-                               report_summary=report_summary)
+    if total_overall_p == 0:
+        report_summary.append( (f"Tüm Analizler Başarısı: %0.0 (0/0)", 'buyuk_kirmizi') )
+    else:
+        total_rate = (total_overall_s / total_overall_p) * 100
+        report_summary.append( (f"Tüm Analizler Başarısı: %{total_rate:.1f} ({total_overall_s}/{total_overall_p})", 'buyuk_yesil') )
+    return report_summary
+
+def _get_replay_index(snap):
+    """ Snapshot'ın replay indeksi; veri değişince (sürüm artınca) yeniden kurulur (bkz. REPLAY_INDEX_CACHE). """
+    return REPLAY_INDEX_CACHE.get_or_compute(
+        snap.version,
+        lambda: replay_engine.build_replay_index(snap.df_oyuncu_mac, snap.df_takim_mac)
+    )
+
+@app.route('/run-replay', methods=['POST'])
+@login_required
+def handle_replay():
+    """
+    Geçmiş sezon(lar)ı gün gün yeniden oynatır (replay_engine): her maç günü için o güne kadarki
+    verilerle öneriler üretilir ve gerçek sonuçlarla notlanır. Log deposuna yazılmaz.
+    """
+    snap = get_snapshot()
+    if snap.df_oyuncu_mac is None or snap.df_takim_mac is None:
+        print("HATA (Replay): Veri setleri bellekte bulunamadı.")
+        return redirect(url_for('route_backtest'))
+    start_str = request.form.get('replay_start')
+    end_str = request.form.get('replay_end')
+    try:
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        print(f"HATA (Replay): Geçersiz tarih aralığı: {start_str} - {end_str}")
+        return redirect(url_for('route_backtest'))
+
+    replay_index = _get_replay_index(snap)
+    t0 = time.time()
+    replay = replay_engine.replay_range(
+        replay_index, start_date, end_date, snap.team_schedule_index, snap.result_index,
+        ANALYSIS_RANGE, MINIMUM_PATTERN_PROBABILITY
+    )
+    print(f"Replay {start_date} - {end_date}: {len(replay['days'])} gün, {time.time() - t0:.2f} sn.")
+
+    report_top4 = []
+    report_other = []
+    for day in replay['days']:
+        top4_s, top4_p, total_s, total_p = day['counts']
+        report_top4.append((f"--- {day['date']} ---", 'baslik'))
+        # ("Top 4 öneri bulunamamış" satırı run_backtest_logic'ten düz metin olarak gelir)
+        report_top4.extend(line if isinstance(line, tuple) else (line.strip(), 'sonuc_bilinmiyor')
+                           for line in day['top4_lines'])
+        report_other.append((f"{day['date']}: {day['candidates']} aday | Top 4: {top4_s}/{top4_p} | Tümü: {total_s}/{total_p}",
+                             'sonuc_basarili' if total_p and total_s * 2 >= total_p else 'sonuc_basarisiz'))
+
+    return render_template("backtest.html",
+                           log_dates=log_store.list_dates(LOG_DB_FILE)[::-1],
+                           selected_date=f"REPLAY {start_date} - {end_date} ({len(replay['days'])} GÜN)",
+                           report_top4=report_top4,
+                           report_other=report_other,
+                           report_summary=_success_summary(replay['totals']))
+
+@app.route('/run-sweep', methods=['POST'])
+@login_required
+def handle_sweep():
+    """
+    Puanlama ağırlıkları taraması (weight_sweep): adaylar logdan ('log') ya da seçilen tarih aralığının
+    yeniden oynatılmasından ('replay') alınır; kombinasyonlar Top 4 isabet oranına göre sıralanır.
+    """
+    snap = get_snapshot()
+    if snap.df_oyuncu_mac is None:
+        print("HATA (Sweep): df_oyuncu_mac bellekte bulunamadı.")
+        return redirect(url_for('route_backtest'))
+    source = request.form.get('sweep_source', 'log')
+
+    if source == 'replay':
+        try:
+            start_date = datetime.strptime(request.form.get('replay_start'), '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.form.get('replay_end'), '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            print("HATA (Sweep): Geçersiz tarih aralığı.")
+            return redirect(url_for('route_backtest'))
+        replay_index = _get_replay_index(snap)
+        candidates_by_date = replay_engine.replay_range(
+            replay_index, start_date, end_date, snap.team_schedule_index, snap.result_index,
+            ANALYSIS_RANGE, MINIMUM_PATTERN_PROBABILITY, keep_candidates=True
+        )['candidates']
+        source_label = f"REPLAY {start_date} - {end_date}"
+    else:
+        candidates_by_date = {log_date: log_store.read_day(LOG_DB_FILE, log_date)
+                              for log_date in log_store.list_dates(LOG_DB_FILE)}
+        source_label = "LOG"
+
+    t0 = time.time()
+    table = weight_sweep.build_candidate_table(candidates_by_date, snap.result_index)
+    min_probs = [MINIMUM_PATTERN_PROBABILITY - 5.0, MINIMUM_PATTERN_PROBABILITY, MINIMUM_PATTERN_PROBABILITY + 5.0]
+    results = weight_sweep.run_sweep(table, min_probs=min_probs)
+    print(f"Ağırlık taraması ({source_label}): {len(table['day'])} aday, {len(results)} kombinasyon, {time.time() - t0:.2f} sn.")
+
+    # Geçerli ağırlıklar (karşılaştırma için)
+    current = weight_sweep.evaluate_weights(
+        table, [weight_sweep.current_weights()], analysis_engine.VOLUME_BAND, MINIMUM_PATTERN_PROBABILITY
+    )
+    current_s, current_p = int(current[0][0]), int(current[1][0])
+    report_summary = [(f"Geçerli Ağırlıklar: %{(current_s / current_p * 100) if current_p else 0.0:.1f} ({current_s}/{current_p})", 'buyuk_sari')]
+    if table['skipped_dates']:
+        report_summary.append((f"{len(table['skipped_dates'])} gün atlandı (eski log biçimi: faktör verisi yok).", 'kucuk_desen'))
+    if results:
+        report_summary.append((f"En İyi: {weight_sweep.format_result(results[0])}", 'buyuk_yesil'))
+    else:
+        report_summary.append((f"Yeterli tahmin (>= {weight_sweep.SWEEP_MIN_PREDICTIONS}) içeren kombinasyon bulunamadı.", 'buyuk_kirmizi'))
+
+    return render_template("backtest.html",
+                           log_dates=log_store.list_dates(LOG_DB_FILE)[::-1],
+                           selected_date=f"AĞIRLIK TARAMASI - {source_label} ({len(table['dates'])} GÜN)",
+                           report_top4=[(f"#{i}: {weight_sweep.format_result(result)}", 'yesil_rapor')
+                                        for i, result in enumerate(results[:50], 1)],
+                           report_other=[],
+                           report_summary=report_summary)
 
 # --- LOG SİLME FONKSİYONLARI ---
 @app.route('/clear-logs', methods=['POST'])
 @login_required
 def handle_clear_logs():
-    global analysis_log
-    
     print("Tüm analiz loglarını silme talebi alındı...")
     
-    with DATA_LOCK:
-        try:
-            analysis_log = {}
-            save_log() 
-            print("Başarılı: 'analysis_log.json' dosyası temizlendi.")
-        except Exception as e:
-            print(f"HATA: Loglar temizlenirken hata oluştu: {e}")
+    try:
+        log_store.clear_all(LOG_DB_FILE)
+        print("Başarılı: Analiz log deposu temizlendi.")
+    except Exception as e:
+        print(f"HATA: Loglar temizlenirken hata oluştu: {e}")
     
     return redirect(url_for('route_backtest'))
 
 @app.route('/delete-log-date', methods=['POST'])
 @login_required
 def handle_delete_log_date():
-    global analysis_log
-    
     date_to_delete = request.form.get('log_date')
     
     if not date_to_delete:
@@ -975,16 +1862,13 @@ def handle_delete_log_date():
 
     print(f"'{date_to_delete}' tarihli analiz logunu silme talebi alındı...")
     
-    with DATA_LOCK:
-        try:
-            if date_to_delete in analysis_log:
-                del analysis_log[date_to_delete]
-                save_log() 
-                print(f"Başarılı: '{date_to_delete}' tarihi loglardan silindi.")
-            else:
-                print(f"UYARI: '{date_to_delete}' tarihi logda bulunamadı (zaten silinmiş olabilir).")
-        except Exception as e:
-            print(f"HATA: Log '{date_to_delete}' tarihi silinirken hata oluştu: {e}")
+    try:
+        if log_store.delete_day(LOG_DB_FILE, date_to_delete):
+            print(f"Başarılı: '{date_to_delete}' tarihi loglardan silindi.")
+        else:
+            print(f"UYARI: '{date_to_delete}' tarihi logda bulunamadı (zaten silinmiş olabilir).")
+    except Exception as e:
+        print(f"HATA: Log '{date_to_delete}' tarihi silinirken hata oluştu: {e}")
     
     return redirect(url_for('route_backtest'))
 
@@ -993,17 +1877,21 @@ def handle_delete_log_date():
 # === UYGULAMAYI BAŞLAT ===
 # ======================================================
 
-try: 
-    load_data_from_s3() 
-except Exception as e:
-    print("="*50)
-    print(f"KRİTİK BAŞLANGIÇ HATASI: {e}")
-    print("Veritabanı S3'ten indirilemedi veya okunamadı.")
-    print("Uygulama, '/veri-guncelle' sayfası hariç düzgün çalışmayacak.")
-    print("="*50)
-
-load_cache()
-load_log()
+# Tam analiz süreç havuzunun çalışanları (forkserver / spawn) ana modülü '__mp_main__' adıyla
+# içe aktarır: 'python app.py' ile çalışırken veri yükleme onlarda tekrarlanmasın.
+if __name__ != "__mp_main__":
+    _load_http_validators()
+    try: 
+        load_data_from_s3() 
+    except Exception as e:
+        print("="*50)
+        print(f"KRİTİK BAŞLANGIÇ HATASI: {e}")
+        print("Veritabanı S3'ten indirilemedi veya okunamadı.")
+        print("Uygulama, '/veri-guncelle' sayfası hariç düzgün çalışmayacak.")
+        print("="*50)
+
+    load_cache()
+    load_log()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import import_app, player_game_log
+
+# ========================================================================
+# === BENCHMARK: /api/get_data tablo serileştirmesi (kolon bazlı vs hücre bazlı) ===
+# ========================================================================
+# 'oyuncu_mac' tablosunun tamamı, app'in bellekteki şemasıyla (_compact_frame: kategorik / int16)
+# iki yoldan JSON kayıt listesine çevrilir:
+#   eski : df.copy() + dt.date.astype(str) + to_dict('records') + hücre başına pd.isna (aşağıda, değiştirilmeden)
+#   yeni : app._table_to_records (frame_to_json_records, kolon başına tek tolist())
+# Çıktıların json.dumps metni birebir aynı olmalıdır; süreler 'repeat' denemenin en iyisidir.
+#
+#   python benchmarks/bench_json_records.py                      # sentetik, 13.5k ve 108k satır
+#   python benchmarks/bench_json_records.py --db /tmp/nba_analiz.db   # gerçek veritabanı
+
+def _reference_clean_data_for_json(data_list):
+    cleaned_list = []
+    if not isinstance(data_list, list):
+        return []
+    for item_dict in data_list:
+        if not isinstance(item_dict, dict):
+            cleaned_list.append(item_dict)
+            continue
+        cleaned_item = {}
+        for key, value in item_dict.items():
+            if pd.isna(value):
+                cleaned_item[key] = None
+            elif isinstance(value, np.integer):
+                cleaned_item[key] = int(value)
+            elif isinstance(value, np.floating):
+                cleaned_item[key] = float(value)
+            elif isinstance(value, np.bool_):
+                cleaned_item[key] = bool(value)
+            else:
+                cleaned_item[key] = value
+        cleaned_list.append(cleaned_item)
+    return cleaned_list
+
+def _reference_table_to_records(df):
+    temp_df = df.copy()
+    if 'GAME_DATE' in temp_df.columns:
+        temp_df['GAME_DATE'] = temp_df['GAME_DATE'].dt.date.astype(str).replace('NaT', None)
+    if 'GAME_DATE_EST' in temp_df.columns:
+        temp_df['GAME_DATE_EST'] = pd.to_datetime(temp_df['GAME_DATE_EST']).dt.date.astype(str).replace('NaT', None)
+    return _reference_clean_data_for_json(temp_df.to_dict('records'))
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def _load_db_table(app, db_path):
+    """ Gerçek veritabanından, uygulamanın okuma + tip dönüşümü yoluyla (kompakt şema run() içinde). """
+    from sqlalchemy import create_engine
+    engine = create_engine(f'sqlite:///{db_path}')
+    return app._coerce_oyuncu_mac(app._read_table(engine, 'oyuncu_mac_performanslari'))
+
+def run(app, label, df, repeat):
+    df = app._compact_frame(df, 'oyuncu_mac_performanslari')
+    old_time, old_records = _best_of(lambda: _reference_table_to_records(df), repeat)
+    new_time, new_records = _best_of(lambda: app._table_to_records(df), repeat)
+    identical = json.dumps(old_records, ensure_ascii=False) == json.dumps(new_records, ensure_ascii=False)
+    print(f"{label:>28}: {len(df):>7} satır | eski {old_time * 1000:8.1f} ms | yeni {new_time * 1000:8.1f} ms "
+          f"| x{old_time / new_time:4.1f} | çıktı aynı: {identical}")
+    return identical
+
+def main():
+    parser = argparse.ArgumentParser(description="oyuncu_mac JSON serileştirme: eski (hücre bazlı) vs yeni (kolon bazlı)")
+    parser.add_argument('--db', help="nba_analiz.db yolu (verilmezse sentetik tablolar)")
+    parser.add_argument('--rows', type=int, nargs='+', default=[13_500, 108_000], help="sentetik tablo satır sayıları")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app, _ = import_app()
+    print("-" * 100)
+    results = []
+    if args.db:
+        results.append(run(app, f"oyuncu_mac ({args.db})", _load_db_table(app, args.db), args.repeat))
+    else:
+        for n_rows in args.rows:
+            results.append(run(app, "oyuncu_mac (sentetik)", player_game_log(n_rows), args.repeat))
+    if not all(results):
+        raise SystemExit("HATA: eski ve yeni serileştirme çıktıları farklı!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import sqlite3
+import time
+
+import pandas as pd
+
+from synthetic import day_predictions, import_app, player_game_log  # (sys.path'e depo kökünü ekler)
+import analysis_engine
+import log_store
+
+# ========================================================================
+# === BENCHMARK: toplam backtest (update_day_grades) ===
+# ========================================================================
+# Sentetik bir maç logu ve 'days' günlük analiz logu (gün başına 'per_day' tahmin) üzerinde:
+#   eski   : günler tek tek, her gün sonuç tablosuyla bir merge (aşağıda, değiştirilmeden), gün başına bir yazma
+#   yeni   : app.update_day_grades; (PLAYER_ID, GAME_ID) indeksinde get_indexer, BACKTEST_WORKERS thread'i
+#   sıcak  : tüm günler notlanmışken tekrar update_day_grades (notlar önbellekten)
+# Her koşudan önce gün notları silinir; toplamlar (log_store.grade_totals) tüm koşularda aynı olmalıdır.
+#
+#   python benchmarks/bench_total_backtest.py --days 500 --per-day 60 --workers 1 4
+
+def _reference_build_result_index(df_oyuncu_mac):
+    result_index = pd.DataFrame({
+        'PLAYER_ID': df_oyuncu_mac['PLAYER_ID'].to_numpy(dtype='int64'),
+        'GAME_ID': df_oyuncu_mac['GAME_ID'].astype(object).to_numpy(),
+        'PTS': df_oyuncu_mac['PTS'].to_numpy(),
+    })
+    result_index = result_index.drop_duplicates(subset=analysis_engine.RESULT_INDEX_KEYS, keep='first').reset_index(drop=True)
+    result_index['FOUND'] = True
+    return result_index
+
+def _reference_grade_predictions(log_data, result_index):
+    if not log_data:
+        return []
+    predictions = pd.DataFrame({
+        'PLAYER_ID': pd.to_numeric(pd.Series([aday.get('player_id') for aday in log_data]), errors='coerce'),
+        'GAME_ID': pd.Series([aday.get('game_id') for aday in log_data], dtype=object),
+    })
+    graded = predictions.merge(result_index, on=analysis_engine.RESULT_INDEX_KEYS, how='left', sort=False)
+    found = graded['FOUND'].eq(True).tolist()
+    return list(zip(found, graded['PTS'].tolist()))
+
+def _reference_update_day_grades(app, snap, result_index):
+    """ Önceki update_day_grades: seri döngü, merge ile notlama, gün başına save_grade. """
+    grade_predictions = analysis_engine.grade_predictions
+    analysis_engine.grade_predictions = _reference_grade_predictions
+    try:
+        stale_dates = log_store.stale_grade_dates(app.LOG_DB_FILE, snap.db_sha256, app.MINIMUM_PATTERN_PROBABILITY)
+        for date_str in stale_dates:
+            predictions, written_at = log_store.read_day_for_grading(app.LOG_DB_FILE, date_str)
+            if not predictions:
+                continue
+            (_, _, _, counts) = analysis_engine.run_backtest_logic(
+                predictions, snap.df_oyuncu_mac, app.MINIMUM_PATTERN_PROBABILITY, result_index=result_index
+            )
+            log_store.save_grade(app.LOG_DB_FILE, date_str, counts, len(predictions), written_at,
+                                 snap.db_sha256, app.MINIMUM_PATTERN_PROBABILITY)
+    finally:
+        analysis_engine.grade_predictions = grade_predictions
+    return len(stale_dates)
+
+def _clear_grades(app):
+    with sqlite3.connect(app.LOG_DB_FILE) as conn:
+        conn.execute("DELETE FROM day_grades")
+
+def _timed(label, func, app):
+    start = time.perf_counter()
+    n_days = func()
+    elapsed = time.perf_counter() - start
+    totals = log_store.grade_totals(app.LOG_DB_FILE)
+    print(f"{label:>26}: {elapsed:7.3f} s | notlanan gün {n_days:>4} | toplamlar (top4_s, top4_p, s, p) = {totals}")
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Toplam backtest: eski seri merge vs update_day_grades (thread havuzu)")
+    parser.add_argument('--days', type=int, default=500)
+    parser.add_argument('--per-day', type=int, default=60)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4], help="denenecek BACKTEST_WORKERS değerleri")
+    args = parser.parse_args()
+
+    app, _ = import_app()
+    df = app._compact_frame(player_game_log(args.days * 450, n_teams=30, players_per_team=15), 'oyuncu_mac_performanslari')
+    log = day_predictions(df, args.days, args.per_day)
+    for log_date, records in log.items():
+        log_store.write_day(app.LOG_DB_FILE, log_date, records)
+    snap = app.DataSnapshot(df_oyuncu_mac=df, result_index=analysis_engine.build_result_index(df),
+                            db_sha256="benchmark", version=1)
+    print("-" * 100)
+    print(f"{len(df)} oyuncu maçı satırı, {len(log)} gün x {args.per_day} tahmin")
+
+    reference_index = _reference_build_result_index(df)
+    totals = [_timed("eski (seri, merge)", lambda: _reference_update_day_grades(app, snap, reference_index), app)]
+    for workers in args.workers:
+        _clear_grades(app)
+        app.BACKTEST_WORKERS = workers
+        totals.append(_timed(f"yeni ({workers} thread)", lambda: app.update_day_grades(snap), app))
+    totals.append(_timed("sıcak (notlar önbellekte)", lambda: app.update_day_grades(snap), app))
+    if len(set(totals)) != 1:
+        raise SystemExit("HATA: koşuların toplamları farklı!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# ========================================================================
+# === BENCHMARK ORTAK: sentetik tablolar + app'in güvenli içe aktarılması ===
+# ========================================================================
+# Benchmark'lar depo kökünden çalıştırılır:  python benchmarks/<script>.py [--help]
+# app.py içe aktarılırken S3'ten veri yüklemeye çalışır; burada DB_FILE_URL boşaltılır ve
+# kalıcı disk dizini (DATA_DIR) geçici bir klasöre yönlendirilir.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+SEASON_START = pd.Timestamp('2024-10-22')
+BOX_SCORE_COLUMNS = ['FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 'REB', 'AST',
+                     'STL', 'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS']
+
+def import_app(data_dir=None):
+    """ app modülünü veri yüklemeden içe aktarır. Dönüş: (app, veri dizini). """
+    data_dir = data_dir or tempfile.mkdtemp(prefix="nba_bench_")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["DB_FILE_URL"] = ""
+    os.environ.pop("SLATE_WORKERS", None)
+    import app
+    return app, data_dir
+
+def player_game_log(n_rows, n_teams=30, players_per_team=15, seed=7):
+    """
+    'oyuncu_mac_performanslari' tablosunun (temizlenmiş, GAME_DATE datetime) kolonlarıyla sentetik
+    bir maç logu: her gün ~n_teams/2 maç, her takımdan 'players_per_team' oyuncu; yaklaşık 'n_rows' satır.
+    """
+    rng = np.random.default_rng(seed)
+    rows_per_day = n_teams * players_per_team
+    n_days = max(1, -(-n_rows // rows_per_day))
+
+    team_of_slot = np.repeat(np.arange(n_teams), players_per_team)
+    player_ids = 1629000 + np.arange(n_teams * players_per_team)
+    mean_pts = rng.uniform(2, 30, player_ids.size)
+
+    day = np.repeat(np.arange(n_days), rows_per_day)[:n_rows]
+    slot = np.tile(np.arange(rows_per_day), n_days)[:n_rows]
+    team = team_of_slot[slot]
+    opponent = (team + 1 + day % (n_teams - 1)) % n_teams
+    game_number = day * n_teams + np.minimum(team, opponent)
+    abbr = np.array([f"T{i:02d}" for i in range(n_teams)], dtype=object)
+
+    pts = np.maximum(0, rng.normal(mean_pts[slot], 6)).astype(int)
+    fga = np.maximum(1, pts // 2 + rng.integers(0, 6, n_rows))
+    fgm = np.minimum(fga, (pts / 2.3).astype(int))
+    fg_pct = np.round(fgm / fga, 3)
+    fg_pct[rng.random(n_rows) < 0.01] = np.nan
+    df = pd.DataFrame({
+        'SEASON_ID': '22024',
+        'PLAYER_ID': player_ids[slot],
+        'PLAYER_NAME': np.array([f"Player {i:04d}" for i in range(player_ids.size)], dtype=object)[slot],
+        'TEAM_ID': 1610612737 + team,
+        'TEAM_ABBREVIATION': abbr[team],
+        'GAME_ID': np.char.add('00224', np.char.zfill(game_number.astype(str), 5)).astype(object),
+        'GAME_DATE': SEASON_START + pd.to_timedelta(day, unit='D'),
+        'MATCHUP': abbr[team] + ' vs. ' + abbr[opponent],
+        'WL': np.where(rng.random(n_rows) < 0.5, 'W', 'L').astype(object),
+        'MIN': rng.integers(5, 42, n_rows),
+        'FG_PCT': fg_pct,
+        'FT_PCT': np.round(rng.random(n_rows), 3),
+    })
+    for col in BOX_SCORE_COLUMNS:
+        df[col] = rng.integers(0, 12, n_rows)
+    df['PTS'], df['FGA'], df['FGM'] = pts, fga, fgm
+    return df
+
+def day_predictions(df_oyuncu_mac, n_days, per_day, seed=3):
+    """
+    Gün başına 'per_day' tahminlik sentetik analiz logu ({tarih: [aday]}), run_backtest_logic'in
+    okuduğu alanlarla. Adayların ~%5'inin maçı tabloda yoktur (sonucu bilinmeyen tahmin).
+    """
+    rng = np.random.default_rng(seed)
+    days = sorted(df_oyuncu_mac['GAME_DATE'].unique())[:n_days]
+    by_day = {day: group for day, group in df_oyuncu_mac.groupby('GAME_DATE', sort=False)}
+    log = {}
+    for day in days:
+        rows = by_day[day].iloc[rng.choice(len(by_day[day]), per_day, replace=False)]
+        records = []
+        for i, row in enumerate(rows.itertuples(index=False)):
+            missing = rng.random() < 0.05
+            records.append({
+                'name': row.PLAYER_NAME, 'player_id': int(row.PLAYER_ID),
+                'game_id': "0029999999" if missing else str(row.GAME_ID), 'team_abbr': row.TEAM_ABBREVIATION,
+                'threshold': float(np.floor(row.PTS + rng.normal(0, 5))) + 0.5,
+                'direction': 'ÜST' if rng.random() < 0.5 else 'ALT',
+                'pts_prob': float(rng.uniform(50, 100)), 'confidence': int(rng.integers(5, 99)),
+                'rank': i + 1,
+            })
+        log[pd.Timestamp(day).strftime('%Y-%m-%d')] = records
+    return log
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+
+# ========================================================================
+# === ANALİZ LOG DEPOSU (SQLite, gün bazlı) ===
+# ========================================================================
+# Eskiden tüm log tek bir JSON dosyasıydı ve her /run-analysis'te baştan yazılıyordu.
+# Artık her tahmin 'predictions' tablosunda bir satırdır (notlamada kullanılan alanlar ayrı kolon,
+# raporda gösterilen tüm sözlük 'record' kolonunda JSON). Bir günün yazılması yalnızca o günün
+# satırlarını değiştirir.
+#
+#   log_days     : loglanmış günler (tahmin listesi boş olsa bile)
+#   predictions  : (log_date, seq) -> tahmin
+#   day_grades   : gün başına backtest sayaçları (önbellek)
+#
+# Notlama önbelleği: bir günün tüm tahminlerinin sonucu bulunduysa ('complete') o gün bir daha
+# notlanmaz. Eksik sonuçlu günler yalnızca veritabanı (db_sha256) değiştiğinde, yani yeni sonuçlar
+# gelmiş olabileceğinde yeniden notlanır. Günün tahminleri yeniden yazılırsa notu silinir.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_days (
+    log_date   TEXT PRIMARY KEY,
+    written_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS predictions (
+    log_date   TEXT NOT NULL,
+    seq        INTEGER NOT NULL,
+    player_id  INTEGER,
+    game_id    TEXT,
+    threshold  REAL,
+    direction  TEXT,
+    pts_prob   REAL,
+    confidence REAL,
+    record     TEXT NOT NULL,
+    PRIMARY KEY (log_date, seq)
+);
+CREATE TABLE IF NOT EXISTS day_grades (
+    log_date          TEXT PRIMARY KEY,
+    top4_success      INTEGER NOT NULL,
+    top4_predictions  INTEGER NOT NULL,
+    total_success     INTEGER NOT NULL,
+    total_predictions INTEGER NOT NULL,
+    complete          INTEGER NOT NULL,
+    db_sha256         TEXT,
+    min_prob          REAL NOT NULL,
+    graded_at         REAL NOT NULL
+);
+"""
+
+@contextmanager
+def _connect(db_path):
+    """ Bağlantı başına tek işlem (transaction): blok hatasız biterse commit, hata olursa rollback. """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def init_store(db_path):
+    """ Tabloları oluşturur (yoksa). WAL modu: okuyucular yazma sırasında beklemez. """
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    with _connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+def migrate_json_log(db_path, json_path):
+    """
+    Eski 'analysis_log.json' dosyasını depoya aktarır ve dosyayı '.migrated' uzantısıyla saklar
+    (tekrar aktarılmasın diye). Dönüş: aktarılan gün sayısı.
+    """
+    if not os.path.exists(json_path):
+        return 0
+    with open(json_path, 'r') as f:
+        legacy_log = json.load(f)
+    with _connect(db_path) as conn:
+        for log_date, records in legacy_log.items():
+            _write_day(conn, log_date, records or [])
+    os.replace(json_path, json_path + ".migrated")
+    return len(legacy_log)
+
+def _write_day(conn, log_date, records):
+    conn.execute("DELETE FROM predictions WHERE log_date = ?", (log_date,))
+    conn.execute("DELETE FROM day_grades WHERE log_date = ?", (log_date,))
+    conn.execute("INSERT OR REPLACE INTO log_days (log_date, written_at) VALUES (?, ?)", (log_date, time.time()))
+    conn.executemany(
+        "INSERT INTO predictions (log_date, seq, player_id, game_id, threshold, direction, pts_prob, confidence, record) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (log_date, seq, aday.get('player_id'), aday.get('game_id'), aday.get('threshold'),
+             aday.get('direction'), aday.get('pts_prob'), aday.get('confidence'),
+             json.dumps(aday, ensure_ascii=False))
+            for seq, aday in enumerate(records)
+        ]
+    )
+
+def write_day(db_path, log_date, records):
+    """ Bir günün tahmin listesini (JSON'a uygun sözlükler) yazar; o günün eski satırları ve notu silinir. """
+    with _connect(db_path) as conn:
+        _write_day(conn, log_date, records)
+
+def read_day(db_path, log_date):
+    """ Bir günün tahminlerini yazıldıkları sırayla döndürür (gün yoksa boş liste). """
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT record FROM predictions WHERE log_date = ? ORDER BY seq", (log_date,)
+        ).fetchall()
+    return [json.loads(record) for (record,) in rows]
+
+def read_day_for_grading(db_path, log_date):
+    """ read_day + günün yazılma zamanı (aynı bağlantıda); save_grade'e bu zaman geçirilir. """
+    with _connect(db_path) as conn:
+        day = conn.execute("SELECT written_at FROM log_days WHERE log_date = ?", (log_date,)).fetchone()
+        rows = conn.execute(
+            "SELECT record FROM predictions WHERE log_date = ? ORDER BY seq", (log_date,)
+        ).fetchall()
+    return [json.loads(record) for (record,) in rows], (day[0] if day else None)
+
+def list_dates(db_path):
+    """ Loglanmış tüm günler (artan sırada). """
+    with _connect(db_path) as conn:
+        return [log_date for (log_date,) in conn.execute("SELECT log_date FROM log_days ORDER BY log_date")]
+
+def delete_day(db_path, log_date):
+    """ Bir günü (tahminleri ve notuyla) siler. Dönüş: gün logda var mıydı. """
+    with _connect(db_path) as conn:
+        conn.execute("DELETE FROM predictions WHERE log_date = ?", (log_date,))
+        conn.execute("DELETE FROM day_grades WHERE log_date = ?", (log_date,))
+        return conn.execute("DELETE FROM log_days WHERE log_date = ?", (log_date,)).rowcount > 0
+
+def clear_all(db_path):
+    """ Tüm logu ve notları siler. """
+    with _connect(db_path) as conn:
+        conn.execute("DELETE FROM predictions")
+        conn.execute("DELETE FROM day_grades")
+        conn.execute("DELETE FROM log_days")
+
+def stale_grade_dates(db_path, db_sha, min_prob):
+    """
+    (Yeniden) notlanması gereken günler: hiç notlanmamış, farklı 'min_prob' ile notlanmış
+    ya da eksik sonuçla ve başka bir veritabanıyla notlanmış günler. Tahmini olmayan günler dahil edilmez.
+    """
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT d.log_date FROM log_days d
+            LEFT JOIN day_grades g ON g.log_date = d.log_date
+            WHERE EXISTS (SELECT 1 FROM predictions p WHERE p.log_date = d.log_date)
+              AND (g.log_date IS NULL
+                   OR g.min_prob != ?
+                   OR (g.complete = 0 AND (g.db_sha256 IS NULL OR g.db_sha256 != ?)))
+            ORDER BY d.log_date
+            """,
+            (min_prob, db_sha)
+        ).fetchall()
+    return [log_date for (log_date,) in rows]
+
+def save_grade(db_path, log_date, counts, prediction_count, written_at, db_sha, min_prob):
+    """
+    Bir günün backtest sayaçlarını kaydeder. 'counts' = (top4_s, top4_p, total_s, total_p).
+    Tüm tahminlerin sonucu bulunduysa (total_p == prediction_count) gün 'complete' işaretlenir.
+    'written_at' read_day_for_grading'den gelir: gün bu arada yeniden yazıldı / silindiyse not kaydedilmez.
+    """
+    save_grades(db_path, [(log_date, counts, prediction_count, written_at)], db_sha, min_prob)
+
+def save_grades(db_path, day_grades, db_sha, min_prob):
+    """ save_grade'in toplu hali: [(log_date, counts, prediction_count, written_at)] tek işlemde yazılır. """
+    graded_at = time.time()
+    with _connect(db_path) as conn:
+        for log_date, counts, prediction_count, written_at in day_grades:
+            top4_s, top4_p, total_s, total_p = counts
+            day = conn.execute("SELECT written_at FROM log_days WHERE log_date = ?", (log_date,)).fetchone()
+            if day is None or day[0] != written_at:
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO day_grades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (log_date, int(top4_s), int(top4_p), int(total_s), int(total_p),
+                 int(total_p == prediction_count), db_sha, min_prob, graded_at)
+            )
+
+def grade_totals(db_path):
+    """ Tüm günlerin kayıtlı notlarının toplamı: (top4_s, top4_p, total_s, total_p). """
+    with _connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT COALESCE(SUM(top4_success), 0), COALESCE(SUM(top4_predictions), 0), "
+            "COALESCE(SUM(total_success), 0), COALESCE(SUM(total_predictions), 0) FROM day_grades"
+        ).fetchone()
+    return tuple(int(value) for value in row)
@@ -0,0 +1,250 @@
+import math
+import numpy as np
+import pandas as pd
+import analysis_engine
+import slate_engine
+
+# ========================================================================
+# === GEÇMİŞE DÖNÜK YENİDEN OYNATMA (Walk-forward Replay) ===
+# ========================================================================
+# Geçmiş bir tarih aralığındaki her maç günü için "o günün sabahındaki" durum yeniden kurulur
+# ve hibrit puanlama (slate_engine.run_slate_analysis, ana sayfayla aynı motor) çalıştırılıp öneriler notlanır:
+#
+#   - Maç geçmişi: oyuncunun o günden ÖNCEKİ maçları (tarih sıralı tablonun ön eki / prefix)
+#   - Sezon toplamları (GP, MIN, PTS, FGM, FGA): kümülatif toplam (prefix-sum) farkları
+#   - Fikstür: o günün 'maclar' satırları; kadro: oyuncunun o sezondaki son takımı
+#   - Sakatlık raporu: geçmiş raporlar olmadığı için o maçın kutu skorunda yer almayan
+#     kadro oyuncuları "oynamıyor" kabul edilir (yaklaşık)
+#   - Barem: gerçek bahis çizgisi yerine sezon ortalamasından sentetik barem (bkz. synthetic_barem)
+#
+# Günler kronolojik işlenir; her gün yalnızca bir önceki günden bu yana oynanan maç satırları
+# duruma eklenir. Böylece 'df_oyuncu_mac' gün başına yeniden filtrelenmez / sıralanmaz.
+# Seri istatistikleri toplu motorda, sıralı PTS / FG_PCT dizilerinin as-of ön eklerinden hesaplanır.
+
+REPLAY_COLUMNS = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_ABBREVIATION', 'GAME_ID', 'GAME_DATE',
+                  'SEASON_ID', 'PTS', 'FG_PCT', 'MIN', 'FGM', 'FGA']
+PREFIX_SUM_COLUMNS = ['MIN', 'PTS', 'FGM', 'FGA']
+ROOKIE_MIN_CAREER_GAMES = 50   # get_players_for_hybrid_analysis ile aynı 'Rookie Filtresi'
+TOP_N_PLAYERS_PER_TEAM = 5
+
+def synthetic_barem(s_avg_pts):
+    """ Orta barem: sezon ortalamasının tam kısmı + 0.5 (bahis çizgileri gibi buçuklu). """
+    return math.floor(s_avg_pts) + 0.5
+
+def build_replay_index(df_oyuncu_mac, df_takim_mac):
+    """
+    Yeniden oynatma için gereken yapıları BİR KEZ kurar.
+    Dönüş: {'df': (PLAYER_NAME, GAME_DATE) sıralı maç tablosu, 'bounds': {isim: (start, stop)},
+            'cum': {kolon: kümülatif toplam (başta 0)}, 'values': {PTS / FG_PCT: float dizisi}, 'apply_order' / 'apply_days': satırların tarih sırası
+            ve bu sıradaki günleri, 'game_players': {GAME_ID: maçta oynayan isimler},
+            'slates': {gün: [(GAME_ID, TEAM_ID, OPPONENT_TEAM_ID, SEASON_ID), ...]}}
+    """
+    cols = [col for col in REPLAY_COLUMNS if col in df_oyuncu_mac.columns]
+    games = (
+        df_oyuncu_mac.loc[df_oyuncu_mac['PLAYER_NAME'].notna(), cols]
+        .sort_values(by=['PLAYER_NAME', 'GAME_DATE'], kind='mergesort')
+        .reset_index(drop=True)
+    )
+    # Kategorik kolonlar düz değerlere: 'maclar' tablosunun kategorileriyle karşılaştırılacaklar
+    for col in ('PLAYER_NAME', 'TEAM_ABBREVIATION', 'GAME_ID', 'SEASON_ID'):
+        if col in games.columns:
+            games[col] = games[col].astype(object)
+
+    names = games['PLAYER_NAME'].to_numpy()
+    bounds = {}
+    if len(names) > 0:
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+        stops = np.r_[starts[1:], len(names)]
+        bounds = {names[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+    cum = {}
+    for col in PREFIX_SUM_COLUMNS:
+        values = pd.to_numeric(games[col], errors='coerce').to_numpy(dtype=float) if col in games.columns else np.zeros(len(games))
+        cum[col] = np.concatenate(([0.0], np.cumsum(np.nan_to_num(values))))
+
+    day = games['GAME_DATE'].to_numpy(dtype='datetime64[D]')
+    apply_order = np.argsort(day, kind='mergesort')
+    apply_days = day[apply_order]
+
+    game_players = {
+        game_id: set(group_names)
+        for game_id, group_names in games.groupby('GAME_ID', sort=False)['PLAYER_NAME']
+    }
+
+    schedule = pd.DataFrame({
+        'DAY': df_takim_mac['GAME_DATE'].to_numpy(dtype='datetime64[D]'),
+        'GAME_ID': df_takim_mac['GAME_ID'].astype(object).to_numpy(),
+        'TEAM_ID': df_takim_mac['TEAM_ID'].to_numpy(dtype='int64'),
+        'SEASON_ID': df_takim_mac['SEASON_ID'].astype(object).to_numpy(),
+    }).drop_duplicates(subset=['GAME_ID', 'TEAM_ID'])
+    opponents = schedule[['GAME_ID', 'TEAM_ID']].rename(columns={'TEAM_ID': 'OPPONENT_TEAM_ID'})
+    schedule = schedule.merge(opponents, on='GAME_ID', how='left')
+    schedule = schedule[schedule['TEAM_ID'] != schedule['OPPONENT_TEAM_ID']]
+    schedule = schedule.sort_values(by=['DAY', 'GAME_ID', 'TEAM_ID'], kind='mergesort')
+    slates = {}
+    for slate_day, game_id, team_id, opponent_team_id, season_id in zip(
+            schedule['DAY'].to_numpy(dtype='datetime64[D]'), schedule['GAME_ID'], schedule['TEAM_ID'],
+            schedule['OPPONENT_TEAM_ID'], schedule['SEASON_ID']):
+        slates.setdefault(slate_day, []).append((game_id, int(team_id), int(opponent_team_id), season_id))
+
+    values = {
+        col: pd.to_numeric(games[col], errors='coerce').to_numpy(dtype=float)
+        for col in ('PTS', 'FG_PCT') if col in games.columns
+    }
+    return {'df': games, 'bounds': bounds, 'cum': cum, 'values': values, 'apply_order': apply_order, 'apply_days': apply_days,
+            'game_players': game_players, 'slates': slates}
+
+class _ReplayState:
+    """ Kronolojik ilerleyen oyuncu durumu: o ana kadar uygulanan maç sayısı, sezon başlangıcı, son takım. """
+    def __init__(self, replay_index):
+        self.index = replay_index
+        self.cursor = 0                 # apply_order içinde sıradaki satır
+        self.applied_stop = {}          # isim -> uygulanmış son satırın bir sonrası (prefix sonu)
+        self.season_start = {}          # isim -> güncel sezonun ilk satırı
+        self.season = {}                # isim -> güncel sezon
+        self.team = {}                  # isim -> (TEAM_ID, TEAM_ABBREVIATION, PLAYER_ID)
+        self.roster = {}                # TEAM_ID -> {isim}
+
+    def advance_to(self, day):
+        """ 'day' gününden ÖNCE oynanmış tüm maç satırlarını duruma ekler. """
+        index = self.index
+        games = index['df']
+        order = index['apply_order']
+        stop = int(np.searchsorted(index['apply_days'], day, side='left'))
+        if stop <= self.cursor:
+            return
+        rows = games.iloc[order[self.cursor:stop]]
+        for pos, name, season, team_id, team_abbr, player_id in zip(
+                order[self.cursor:stop], rows['PLAYER_NAME'], rows['SEASON_ID'],
+                rows['TEAM_ID'], rows['TEAM_ABBREVIATION'], rows['PLAYER_ID']):
+            if self.season.get(name) != season:
+                self.season[name] = season
+                self.season_start[name] = int(pos)
+            self.applied_stop[name] = int(pos) + 1
+            old_team = self.team.get(name)
+            if old_team is not None and old_team[0] != team_id:
+                self.roster.get(old_team[0], set()).discard(name)
+            self.team[name] = (int(team_id), team_abbr, int(player_id))
+            self.roster.setdefault(int(team_id), set()).add(name)
+        self.cursor = stop
+
+    def season_totals(self, name):
+        """ Oyuncunun güncel sezondaki (o ana kadarki) GP ve toplamları; prefix-sum farkından O(1). """
+        start, stop = self.season_start[name], self.applied_stop[name]
+        cum = self.index['cum']
+        totals = {col: cum[col][stop] - cum[col][start] for col in PREFIX_SUM_COLUMNS}
+        totals['GP'] = stop - start
+        return totals
+
+def _slate_inputs(state, slate):
+    """
+    Bir maç günü için get_players_for_hybrid_analysis'in ürettiği girdilerin as-of karşılığı:
+    (top_players_final, current_season_players_df, inactive_names, baremler, as-of player_index)
+    """
+    index = state.index
+    player_rows = []
+    inactive_names = set()
+    for game_id, team_id, opponent_team_id, season_id in slate:
+        played_names = index['game_players'].get(game_id, set())
+        for name in state.roster.get(team_id, ()):
+            if state.season.get(name) != season_id:
+                continue  # Geçen sezondan kalmış kadro kaydı
+            if name not in played_names:
+                inactive_names.add(name)  # Sakatlık raporu yerine: maç kadrosunda yok
+                continue
+            totals = state.season_totals(name)
+            _, team_abbr, player_id = state.team[name]
+            start = index['bounds'][name][0]
+            player_rows.append({
+                'PLAYER_ID': player_id, 'PLAYER_NAME': name, 'TEAM_ID': team_id,
+                'TEAM_ABBREVIATION': team_abbr, 'OPPONENT_TEAM_ID': opponent_team_id, 'GAME_ID': game_id,
+                'GP': totals['GP'], 'MIN': totals['MIN'], 'PTS': totals['PTS'],
+                'FGM': totals['FGM'], 'FGA': totals['FGA'],
+                'total_matches': state.applied_stop[name] - start,
+            })
+
+    if not player_rows:
+        return None
+    current_season_players_df = pd.DataFrame(player_rows)
+    key_players_df = current_season_players_df[
+        (current_season_players_df['total_matches'] >= ROOKIE_MIN_CAREER_GAMES) &
+        (current_season_players_df['GP'] > 0)
+    ].copy()
+    if key_players_df.empty:
+        return None
+    key_players_df['MIN_PER_GAME'] = key_players_df['MIN'] / key_players_df['GP']
+    top_players_final = (
+        key_players_df.sort_values(by=['TEAM_ID', 'MIN_PER_GAME', 'PLAYER_NAME'],
+                                   ascending=[True, False, True], kind='mergesort')
+        .groupby('TEAM_ID', sort=False).head(TOP_N_PLAYERS_PER_TEAM)
+        .sort_values(by=['GAME_ID', 'TEAM_ID', 'MIN_PER_GAME'], ascending=[True, True, False], kind='mergesort')
+        .reset_index(drop=True)
+    )
+
+    baremler = [
+        (name, synthetic_barem(pts / gp))
+        for name, pts, gp in zip(top_players_final['PLAYER_NAME'], top_players_final['PTS'], top_players_final['GP'])
+    ]
+    asof_player_index = {
+        'df': index['df'],
+        'by_name': {name: (index['bounds'][name][0], state.applied_stop[name]) for name in top_players_final['PLAYER_NAME']},
+        'by_id': {},
+        'values': index['values'],
+    }
+    return top_players_final, current_season_players_df, inactive_names, baremler, asof_player_index
+
+def replay_range(replay_index, start_date, end_date, team_schedule_index, result_index,
+                 ANALYSIS_RANGE, MINIMUM_PATTERN_PROBABILITY, keep_candidates=False):
+    """
+    [start_date, end_date] aralığındaki her maç gününü yeniden oynatır ve önerileri notlar.
+    Dönüş: {'days': [{'date', 'candidates', 'counts', 'top4_lines'}], 'totals': (top4_s, top4_p, all_s, all_p),
+            'candidates': {tarih: all_adaylar} (yalnızca keep_candidates=True ise)}
+    """
+    start_day = np.datetime64(start_date, 'D')
+    end_day = np.datetime64(end_date, 'D')
+    replay_days = sorted(day for day in replay_index['slates'] if start_day <= day <= end_day)
+
+    state = _ReplayState(replay_index)
+    days = []
+    candidates_by_date = {}
+    totals = np.zeros(4, dtype=np.int64)
+    for day in replay_days:
+        state.advance_to(day)
+        date_str = str(day)
+        inputs = _slate_inputs(state, replay_index['slates'][day])
+        if inputs is None:
+            continue
+        top_players_final, current_season_players_df, inactive_names, baremler, asof_player_index = inputs
+
+        team_contexts = analysis_engine.build_team_contexts(
+            current_season_players_df, inactive_names, top_players_final['TEAM_ID'].unique()
+        )
+        _, _, all_adaylar = slate_engine.run_slate_analysis(
+            baremler=baremler,
+            top_players_final=top_players_final,
+            current_season_players_df=current_season_players_df,
+            csv_inactive_player_names=inactive_names,
+            df_oyuncu_mac=replay_index['df'],
+            df_takim_mac=None,
+            ANALYSIS_RANGE=ANALYSIS_RANGE,
+            MINIMUM_PATTERN_PROBABILITY=MINIMUM_PATTERN_PROBABILITY,
+            today_str=date_str,
+            player_index=asof_player_index,
+            team_schedule_index=team_schedule_index,
+            team_contexts=team_contexts,
+            render_all=False
+        )
+        if not all_adaylar:
+            continue
+        report_top4, _, _, counts = analysis_engine.run_backtest_logic(
+            all_adaylar, None, MINIMUM_PATTERN_PROBABILITY, result_index=result_index
+        )
+        totals += np.asarray(counts, dtype=np.int64)
+        days.append({'date': date_str, 'candidates': len(all_adaylar), 'counts': counts, 'top4_lines': report_top4})
+        if keep_candidates:
+            candidates_by_date[date_str] = all_adaylar
+
+    result = {'days': days, 'totals': tuple(int(value) for value in totals)}
+    if keep_candidates:
+        result['candidates'] = candidates_by_date
+    return result
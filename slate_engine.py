@@ -0,0 +1,513 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+import analysis_engine
+
+# ========================================================================
+# === TOPLU (SLATE) ANALİZ MOTORU ===
+# ========================================================================
+# Ana sayfa analizi: oyuncu x barem döngüsüyle aynı sonuçları üretir, ancak döngü yerine
+# günün tüm adaylarını TEK bir vektörel hesapla puanlar (referans döngü: tests/test_slate_engine.py):
+#
+#   1. Oyuncuların tarih sıralı PTS / FG_PCT dizileri oyuncu indeksinden art arda (ragged) toplanır
+#   2. Tüm (oyuncu, barem) satırları ve oyuncu başına FG% satırı için seri istatistikleri
+#      '_streak_stats_ragged' ile tek geçişte hesaplanır (PTS: seri tablosu olan oyuncularda tablodan
+#      okunur). Bu oyuncu başına 'seri bölümü' yalnızca maç geçmişine bağlıdır, önbelleğe alınabilir
+#   3. Hacim / verimlilik / B2B / delta katkıları ve güven skoru dizi işlemleriyle toplanır
+#      (toplama sırası referans döngüyle aynıdır, böylece float sonuçlar birebir aynıdır)
+#   4. Yorum metinleri yalnızca gerektiğinde üretilir: render_all=False ise sadece
+#      'EN GÜVENİLİR 2 ÖNERİ' için (replay / ağırlık taraması metne ihtiyaç duymaz)
+#
+# Oyuncu başına kalan Python işi yalnızca bağlam sorgularıdır (B2B, dinlenme, kadro deltası).
+
+CANDIDATE_TEXT_FIELDS = ('pts_comment', 'comment_hacim', 'comment_verimlilik', 'raw_b2b_comment', 'raw_delta_comment')
+PLAYER_FIELDS = ('PLAYER_ID', 'TEAM_ID', 'OPPONENT_TEAM_ID', 'GAME_ID', 'GP', 'PTS', 'FGA', 'FGM',
+                 'TEAM_ABBREVIATION', 'MIN_PER_GAME')
+
+def _column_values(player_index, column):
+    """ Oyuncu indeksindeki sayısal kolon (float dizisi); indekste hazır değilse burada çevrilir. """
+    cached = player_index.get('values', {}).get(column)
+    if cached is not None:
+        return cached
+    return pd.to_numeric(player_index['df'][column], errors='coerce').to_numpy(dtype=float)
+
+def _ragged_rows(values, starts, lengths):
+    """
+    Her satır için values[start:start+length] dilimlerini art arda birleştirir.
+    Dönüş: (birleşik dizi, her elemanın satır numarası)
+    """
+    total = int(lengths.sum())
+    row_of = np.repeat(np.arange(lengths.size), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts, lengths) + (np.arange(total) - np.repeat(offsets, lengths))
+    return values[positions], row_of
+
+def _clean_ragged(values, starts, lengths):
+    """ Oyuncu dizilerini toplar ve NaN / sonsuz değerleri atar. Dönüş: (temiz dizi, temiz uzunluklar). """
+    flat, row_of = _ragged_rows(values, starts, lengths)
+    finite = np.isfinite(flat)
+    return flat[finite], np.bincount(row_of[finite], minlength=lengths.size).astype(np.int64)
+
+def _ragged_streak_stats(clean_values, clean_starts, clean_lengths, row_player, row_thresholds):
+    """
+    Satır başına (oyuncu, eşik) seri istatistikleri. 3 maçtan az temiz verisi olan satırlar
+    hesaba katılmaz ('valid' = False; analyze_streaks'in 'Yetersiz Temiz Veri' durumu).
+    """
+    lengths = clean_lengths[row_player]
+    valid = lengths >= 3
+    n_rows = row_player.size
+    stats = {
+        'valid': valid,
+        'current_is_above': np.zeros(n_rows, dtype=bool),
+        'current_length': np.zeros(n_rows, dtype=np.int64),
+        'prob_break_pct': np.zeros(n_rows),
+        'total_matches': np.zeros(n_rows, dtype=np.int64),
+        'total_above': np.zeros(n_rows, dtype=np.int64),
+        'avg_above': np.zeros(n_rows),
+        'avg_below': np.zeros(n_rows),
+        'n_reached': np.zeros(n_rows, dtype=np.int64),
+        'n_continued': np.zeros(n_rows, dtype=np.int64),
+        'prev_is_above': np.zeros(n_rows, dtype=bool),
+        'prev_length': np.zeros(n_rows, dtype=np.int64),
+    }
+    if not valid.any():
+        return stats
+    rows = np.flatnonzero(valid)
+    flat, row_of = _ragged_rows(clean_values, clean_starts[row_player[rows]], lengths[rows])
+    computed = analysis_engine._streak_stats_ragged(flat >= row_thresholds[rows][row_of], lengths[rows])
+    for key in stats:
+        if key != 'valid':
+            stats[key][rows] = computed[key]
+    return stats
+
+def _streak_text(stats, i):
+    """ Satırın 14'lü seri sonucu (yorum metinleriyle); analyze_streaks ile aynı metinler. """
+    if not stats['valid'][i]:
+        return analysis_engine.STREAK_RESULT_NOT_ENOUGH_CLEAN
+    prev_run = (bool(stats['prev_is_above'][i]), int(stats['prev_length'][i])) if stats['prev_length'][i] > 0 else None
+    return analysis_engine._streak_result_text(
+        "", int(stats['total_matches'][i]), int(stats['total_above'][i]),
+        float(stats['avg_above'][i]), float(stats['avg_below'][i]),
+        bool(stats['current_is_above'][i]), int(stats['current_length'][i]),
+        int(stats['n_reached'][i]), int(stats['n_continued'][i]), prev_run
+    )
+
+def _candidate_texts(pts_result, direction, hacim_result, s_avg_pts, threshold_pts,
+                     eff_signal, verimlilik_yonu, b2b_signal, delta_etkisi, delta_oyuncu_ismi):
+    """ Aday yorum metinleri (CANDIDATE_TEXT_FIELDS sırasıyla). """
+    pts_prob_h, pts_prob_b = pts_result[8], pts_result[9]
+    pts_comment = (pts_prob_h + pts_prob_b).replace("\n", " ").replace("    >> ", "")
+
+    comment_hacim = "NÖTR (Hacim bareme yakın)"
+    if direction == "ÜST":
+        if hacim_result == 1:
+            comment_hacim = f"POZİTİF (Ort: {s_avg_pts:.1f} / Barem: {threshold_pts:.1f})"
+        elif hacim_result == -1:
+            comment_hacim = f"NEGATİF! (Ort: {s_avg_pts:.1f} / Barem: {threshold_pts:.1f}) HACİM YETERSİZ!"
+    else:
+        if hacim_result == -1:
+            comment_hacim = f"NEGATİF! (Ort: {s_avg_pts:.1f} / Barem: {threshold_pts:.1f}) HACİM ÇOK YÜKSEK!"
+        elif hacim_result == 1:
+            comment_hacim = f"POZİTİF (Ort: {s_avg_pts:.1f} / Barem: {threshold_pts:.1f}) HACİM ZATEN DÜŞÜK!"
+
+    comment_verimlilik = "NÖTR (Verimlilik serisi yok/etkisiz)"
+    if eff_signal == 1:
+        comment_verimlilik = f"POZİTİF (FG% serisi de {verimlilik_yonu} yönünde)"
+    elif eff_signal == -1:
+        comment_verimlilik = f"NEGATİF (FG% serisi zıt yönde ({verimlilik_yonu}))"
+
+    comment_b2b = "NÖTR (B2B durumu eşit)"
+    if b2b_signal == -1:
+        comment_b2b = f"NEGATİF (Oyuncu Yorgun, Rakip Dinlenmiş)"
+    elif b2b_signal == 1:
+        comment_b2b = f"POZİTİF (Oyuncu Dinlenmiş, Rakip Yorgun)"
+
+    comment_delta = "NÖTR (Kadroda Delta Yok)"
+    if delta_etkisi == 1:
+        prefix = "POZİTİF" if direction == "ÜST" else "NEGATİF"
+        comment_delta = f"{prefix} (Hacim Artışı! {delta_oyuncu_ismi} oynamıyor)"
+    elif delta_etkisi == -1:
+        prefix = "NEGATİF" if direction == "ÜST" else "POZİTİF"
+        comment_delta = f"{prefix} (Hacim Düşüşü! {delta_oyuncu_ismi} dönüyor)"
+
+    return pts_comment, comment_hacim, comment_verimlilik, comment_b2b, comment_delta
+
+def _collect_players(baremler, top_players_final, player_index, report_lines):
+    """
+    baremler sırasıyla analiz edilecek oyuncular (veri yok / maç < 3 / GP = 0 atlama kurallarıyla).
+    Dönüş: [(isim, orta barem, top_players_final satırının alanları, (start, stop))]
+    """
+    first_row = {}
+    for pos, name in enumerate(top_players_final['PLAYER_NAME']):
+        first_row.setdefault(name, pos)
+    columns = {col: top_players_final[col].to_numpy() for col in PLAYER_FIELDS if col in top_players_final}
+
+    players = []
+    for player_name, middle_barem in baremler:
+        pos = first_row.get(player_name)
+        if pos is None:
+            report_lines.append(f"\n! {player_name} için veri bulunamadı (Indext Hatası). Atlanıyor...")
+            continue
+        bounds = player_index['by_name'].get(player_name, (0, 0))
+        if bounds[1] - bounds[0] < 3:
+            report_lines.append(f"\n! {player_name} için yetersiz maç verisi (maç < 3). Atlanıyor...")
+            continue
+        if columns['GP'][pos] == 0:
+            report_lines.append(f"\n! {player_name} için GP=0, analiz atlanıyor (ZeroDivisionError önlendi).")
+            continue
+        fields = {col: values[pos] for col, values in columns.items()}
+        fields.setdefault('TEAM_ABBREVIATION', '???')
+        fields.setdefault('MIN_PER_GAME', 0.0)
+        players.append((player_name, middle_barem, fields, bounds))
+    return players
+
+def _player_thresholds(middle_barem, ANALYSIS_RANGE):
+    return [t for t in (middle_barem - ANALYSIS_RANGE, middle_barem, middle_barem + ANALYSIS_RANGE) if t > 0]
+
+def _exact_table(streak_tables, player_name, n_rows):
+    """ Oyuncunun okunabilir seri tablosu: aynı satırlardan kurulmuş, kesin ve en az 3 temiz maçlı; yoksa None. """
+    table = streak_tables.get(player_name) if streak_tables else None
+    if table is None or not table['exact'] or table['n_rows'] != n_rows or table['total_matches'] < 3:
+        return None
+    return table
+
+def _split_rows(stats, row_counts):
+    """ Satır dizilerini (art arda duran oyuncu satırları) oyuncu başına sözlüklere böler. """
+    bounds = np.cumsum(row_counts)[:-1]
+    split = {key: np.split(values, bounds) for key, values in stats.items()}
+    return [{key: parts[i] for key, parts in split.items()} for i in range(len(row_counts))]
+
+def _compute_sections(players, player_index, ANALYSIS_RANGE, streak_tables):
+    """
+    Oyuncuların seri bölümleri (yalnızca maç geçmişine bağlı kısım), tek vektörel geçişte:
+    baremlerin PTS seri istatistikleri (oyuncunun seri tablosundan ya da ham dizilerden) ve FG% serisi.
+    Dönüş: her oyuncu için {'thresholds': [barem, ...], 'pts': {anahtar: barem dizisi}, 'fg': {anahtar: 1 elemanlı dizi}}
+    """
+    if not players:
+        return []
+    n_players = len(players)
+    starts = np.array([p[3][0] for p in players], dtype=np.int64)
+    raw_lengths = np.array([p[3][1] - p[3][0] for p in players], dtype=np.int64)
+    thresholds = [_player_thresholds(middle_barem, ANALYSIS_RANGE) for _, middle_barem, _, _ in players]
+    s_avg_fg_pct = [fields['FGM'] / fields['FGA'] if fields['FGA'] > 0 else 0.0 for _, _, fields, _ in players]
+
+    # --- PTS: seri tablosu olanlar tablodan, kalanların (oyuncu x barem) satırları ham dizilerden; ikisi de tek geçişte ---
+    pts_sections = [None] * n_players
+    tables = {p: _exact_table(streak_tables, players[p][0], int(raw_lengths[p])) for p in range(n_players) if thresholds[p]}
+    table_players = [p for p, table in tables.items() if table is not None]
+    raw_players = [p for p, table in tables.items() if table is None]
+    if table_players:
+        table_stats = analysis_engine.streak_tables_stats([tables[p] for p in table_players],
+                                                          [thresholds[p] for p in table_players])
+        table_stats['valid'] = np.ones(table_stats['current_length'].size, dtype=bool)
+        for p, section in zip(table_players, _split_rows(table_stats, [len(thresholds[p]) for p in table_players])):
+            pts_sections[p] = section
+    if raw_players:
+        raw_players = np.array(raw_players, dtype=np.int64)
+        pts_clean, pts_clean_lengths = _clean_ragged(_column_values(player_index, 'PTS'),
+                                                     starts[raw_players], raw_lengths[raw_players])
+        row_counts = [len(thresholds[p]) for p in raw_players]
+        row_player = np.repeat(np.arange(raw_players.size), row_counts)
+        row_threshold = np.array([t for p in raw_players for t in thresholds[p]], dtype=float)
+        pts_stats = _ragged_streak_stats(pts_clean, np.cumsum(pts_clean_lengths) - pts_clean_lengths,
+                                         pts_clean_lengths, row_player, row_threshold)
+        for p, section in zip(raw_players, _split_rows(pts_stats, row_counts)):
+            pts_sections[p] = section
+
+    # --- FG%: oyuncu başına tek satır (eşik: sezon FG% ortalaması) ---
+    if 'FG_PCT' in player_index['df'].columns:
+        fg_clean, fg_clean_lengths = _clean_ragged(_column_values(player_index, 'FG_PCT'), starts, raw_lengths)
+        fg_stats = _ragged_streak_stats(fg_clean, np.cumsum(fg_clean_lengths) - fg_clean_lengths, fg_clean_lengths,
+                                        np.arange(n_players), np.array(s_avg_fg_pct, dtype=float))
+    else:
+        fg_stats = {'valid': np.zeros(n_players, dtype=bool), 'current_is_above': np.zeros(n_players, dtype=bool),
+                    'prob_break_pct': np.zeros(n_players)}
+
+    return [
+        {'thresholds': thresholds[p], 'pts': pts_sections[p],
+         'fg': {key: fg_stats[key][p:p + 1] for key in ('valid', 'current_is_above', 'prob_break_pct')}}
+        for p in range(n_players)
+    ]
+
+def _player_sections(players, player_index, ANALYSIS_RANGE, streak_tables=None, memoize=None):
+    """
+    '_compute_sections'; 'memoize' verildiyse (isteğe bağlı memoize(anahtar, hesapla) çağrılabilir nesnesi)
+    bölümler ('slate_player', oyuncu, barem, aralık) anahtarıyla önbellekten gelir, veri sürümünü anahtara
+    çağıran taraf ekler. İlk ıskalamada o oyuncu ve sonrakilerin tümü tek geçişte hesaplanır
+    (önbellekte bulunanlarınki kullanılmaz): ıskalama ne kadar olursa olsun en fazla bir vektörel geçiş.
+    """
+    if memoize is None:
+        return _compute_sections(players, player_index, ANALYSIS_RANGE, streak_tables)
+    computed = {}
+
+    def compute(p):
+        if p not in computed:
+            computed.update(zip(range(p, len(players)),
+                                _compute_sections(players[p:], player_index, ANALYSIS_RANGE, streak_tables)))
+        return computed[p]
+
+    return [
+        memoize(('slate_player', player_name, middle_barem, ANALYSIS_RANGE), lambda p=p: compute(p))
+        for p, (player_name, middle_barem, _, _) in enumerate(players)
+    ]
+
+def _score_players(players, sections, team_schedule_index, team_contexts, csv_inactive_player_names,
+                   today_str, render_all):
+    """
+    Oyuncu listesinin tüm (oyuncu, barem) adaylarını, seri bölümlerinden (bkz. _player_sections)
+    tek vektörel hesapla puanlar.
+    Satırlar birbirinden bağımsızdır: liste parçalara bölünüp ayrı ayrı puanlansa da sonuç aynıdır.
+    Dönüş: aday sözlükleri (oyuncu sırası, oyuncu içinde barem-aralık, barem, barem+aralık sırasıyla)
+    """
+    row_counts = [len(section['thresholds']) for section in sections]
+    if sum(row_counts) == 0:
+        return []
+    today_date_obj = datetime.strptime(today_str, '%Y-%m-%d').date()
+    yesterday_date_obj = today_date_obj - timedelta(days=1)
+
+    raw_lengths = [p[3][1] - p[3][0] for p in players]
+    s_avg_pts = [fields['PTS'] / fields['GP'] for _, _, fields, _ in players]
+    s_avg_fg_pct = [fields['FGM'] / fields['FGA'] if fields['FGA'] > 0 else 0.0 for _, _, fields, _ in players]
+
+    # --- Seri istatistikleri: oyuncu bölümleri satır dizilerine birleştirilir ---
+    row_player = np.repeat(np.arange(len(players)), row_counts)
+    row_threshold = [t for section in sections for t in section['thresholds']]
+    row_threshold_arr = np.array(row_threshold, dtype=float)
+    with_rows = [section for section in sections if section['thresholds']]
+    pts_stats = {key: np.concatenate([section['pts'][key] for section in with_rows]) for key in with_rows[0]['pts']}
+    fg_stats = {key: np.concatenate([section['fg'][key] for section in sections]) for key in sections[0]['fg']}
+
+    # --- Bağlam (oyuncu başına): B2B, dinlenme, kadro deltası ---
+    context = []
+    for player_name, _, fields, _ in players:
+        team_id, opponent_team_id = fields['TEAM_ID'], fields['OPPONENT_TEAM_ID']
+        played = analysis_engine.team_played_on(team_schedule_index, team_id, yesterday_date_obj)
+        opp_played = analysis_engine.team_played_on(team_schedule_index, opponent_team_id, yesterday_date_obj)
+        rest = analysis_engine.team_rest_features(team_schedule_index, team_id, today_date_obj)
+        opp_rest = analysis_engine.team_rest_features(team_schedule_index, opponent_team_id, today_date_obj)
+        delta_etkisi, delta_oyuncu_ismi = analysis_engine.get_player_delta(
+            team_contexts.get(team_id), player_name, fields['GP'], csv_inactive_player_names
+        )
+        b2b_signal = -1 if (played and not opp_played) else (1 if (not played and opp_played) else 0)
+        context.append((b2b_signal, rest, opp_rest, delta_etkisi, delta_oyuncu_ismi))
+
+    # --- Puanlama (satır = oyuncu x barem), referans döngüyle aynı toplama sırası ---
+    is_over = pts_stats['valid'] & ~pts_stats['current_is_above']
+    pts_prob = pts_stats['prob_break_pct']
+    fg_prob = fg_stats['prob_break_pct'][row_player]
+    fg_over = (fg_stats['valid'] & ~fg_stats['current_is_above'])[row_player]
+    eff_signal = np.where(fg_prob > 1, np.where(is_over == fg_over, 1, -1), 0)
+    avg_pts = np.array(s_avg_pts, dtype=float)[row_player]
+    hacim_fark = avg_pts - row_threshold_arr
+    hacim_band = (hacim_fark > analysis_engine.VOLUME_BAND).astype(int) - (hacim_fark < -analysis_engine.VOLUME_BAND).astype(int)
+    hacim_result = np.where(is_over, hacim_band, -hacim_band)
+    b2b_signal = np.array([c[0] for c in context])[row_player]
+    delta = np.array([c[3] for c in context])[row_player]
+
+    confidence = np.full(row_player.size, analysis_engine.BASE_CONFIDENCE)
+    confidence += np.where(eff_signal == 1, analysis_engine.EFFICIENCY_WEIGHT, 0.0)
+    confidence -= np.where(eff_signal == -1, analysis_engine.EFFICIENCY_WEIGHT, 0.0)
+    confidence += np.where(hacim_result == 1, analysis_engine.VOLUME_WEIGHT_POSITIVE, 0.0)
+    confidence += np.where(hacim_result == -1, analysis_engine.VOLUME_WEIGHT_NEGATIVE, 0.0)
+    confidence -= np.where(b2b_signal == -1, analysis_engine.B2B_WEIGHT, 0.0)
+    confidence += np.where(b2b_signal == 1, analysis_engine.B2B_WEIGHT, 0.0)
+    confidence -= np.where(is_over & (delta == 1) & (hacim_result == -1), analysis_engine.VOLUME_WEIGHT_NEGATIVE, 0.0)
+    confidence -= np.where(is_over & (delta == -1) & (hacim_result == 1), analysis_engine.VOLUME_WEIGHT_POSITIVE, 0.0)
+    delta_sign = np.where(is_over, delta, -delta)
+    confidence += np.where(delta_sign == 1, analysis_engine.USAGE_DELTA_WEIGHT, 0.0)
+    confidence -= np.where(delta_sign == -1, analysis_engine.USAGE_DELTA_WEIGHT, 0.0)
+    confidence = np.clip(np.trunc(confidence), 5, 99).astype(int)
+    sinerji = (pts_prob / 100.0) * (confidence / 100.0)
+
+    # --- Aday sözlükleri (metinler isteğe bağlı) ---
+    analysis_results = []
+    for r in range(row_player.size):
+        p = int(row_player[r])
+        player_name, _, fields, _ = players[p]
+        b2b, (rest_days, games_in_window), (opp_rest_days, opp_games_in_window), delta_etkisi, delta_oyuncu_ismi = context[p]
+        direction = "ÜST" if is_over[r] else "ALT"
+        aday = {
+            'sinerji_skoru': float(sinerji[r]),
+            'game_id': fields['GAME_ID'],
+            'player_id': fields['PLAYER_ID'],
+            'name': player_name,
+            'threshold': row_threshold[r],
+            'direction': direction,
+            'tag': 'buyuk_yesil' if direction == "ÜST" else 'buyuk_kirmizi',
+            'confidence': int(confidence[r]),
+            'pts_prob': float(pts_prob[r]),
+            'pts_streak_len': int(pts_stats['current_length'][r]),
+            'raw_s_avg_pts': s_avg_pts[p],
+            'raw_s_avg_fg_pct': s_avg_fg_pct[p],
+            'rest_days': rest_days,
+            'games_in_window': games_in_window,
+            'opp_rest_days': opp_rest_days,
+            'opp_games_in_window': opp_games_in_window,
+            'delta_tag': 'delta_plus' if delta_etkisi == 1 else ('delta_minus' if delta_etkisi == -1 else 'kucuk_desen'),
+            'eff_signal': int(eff_signal[r]),
+            'b2b_signal': int(b2b),
+            'delta_effect': int(delta_etkisi),
+            'team_abbr': fields['TEAM_ABBREVIATION'],
+            'total_match_count': int(raw_lengths[p]),
+            'avg_min': fields['MIN_PER_GAME'],
+        }
+        if render_all:
+            texts = _candidate_texts(
+                _streak_text(pts_stats, r), direction, int(hacim_result[r]), s_avg_pts[p], row_threshold[r],
+                int(eff_signal[r]), "ÜST" if fg_over[r] else "ALT", int(b2b_signal[r]), int(delta[r]), delta_oyuncu_ismi
+            )
+            aday.update(zip(CANDIDATE_TEXT_FIELDS, texts))
+        analysis_results.append(aday)
+    return analysis_results
+
+# ========================================================================
+# === SÜREÇ HAVUZU (büyük slate'ler için paralel puanlama) ===
+# ========================================================================
+# Seri bölümleri (önbellek / seri tabloları / tek vektörel geçiş) ana süreçte hazırlanır. Oyuncular ve
+# bölümleri ardışık parçalara (shard) bölünür, her parça bir çalışan süreçte '_score_players' ile
+# puanlanır ve sonuçlar baremler sırasıyla birleştirilir; sıralama (ve eşit grubun tohumlu
+# karıştırılması) ana süreçte yapıldığı için sonuç seri çalıştırmayla birebir aynıdır.
+# Çalışanlar havuz kurulurken BİR KEZ yalnızca (küçük) fikstür indeksini alır; parça başına oyuncu
+# satırları, bölümleri ve o takımların kadro bağlamı gönderilir (oyuncu indeksi çalışanlara hiç gitmez,
+# bu yüzden paylaşımlı belleğe ya da fork'un copy-on-write kopyasına gerek yoktur).
+
+PARALLEL_MIN_PLAYERS = 60   # Bundan küçük slate'lerde süreçler arası iletişim kazançtan pahalı
+
+_WORKER_CONTEXT = None      # Çalışan süreçte: team_schedule_index
+
+def _init_worker(team_schedule_index):
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = team_schedule_index
+
+def _score_shard(players, sections, team_contexts, csv_inactive_player_names, today_str, render_all):
+    return _score_players(players, sections, _WORKER_CONTEXT, team_contexts, csv_inactive_player_names,
+                          today_str, render_all)
+
+def _pool_context():
+    """
+    'forkserver' (yoksa 'spawn'): çalışanlar çağıran süreçten fork edilmez, bu yüzden çağıranın
+    thread'leri ve o anda tutulan kilitleri (logging, sqlite, BLAS ...) çalışanlara geçmez.
+    Forkserver yalnızca bu modülü (numpy / pandas) önceden yükler; çalışanlar oradan hızlı başlar.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['slate_engine'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def create_slate_pool(team_schedule_index, workers):
+    """
+    Verilen fikstür indeksine bağlı süreç havuzu. Havuz yalnızca bu indeksle yapılan analizlerde
+    kullanılmalıdır (yeni veri yüklenince yenisi kurulmalıdır).
+    Çalışanlar burada başlatılır (ilk analiz isteğinde değil); fikstür indeksi onlara bir kez pickle edilir.
+    Başlatma yöntemi fork olmadığından havuz, istek thread'leri çalışırken de güvenle kurulabilir.
+    Çalışanlar ana modülü '__mp_main__' adıyla içe aktarır: ana modül açılış işlerini (veri yükleme vb.)
+    bu durumda yapmamalıdır (bkz. app.py).
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_pool_context(),
+        initializer=_init_worker,
+        initargs=(team_schedule_index,),
+    )
+    for future in [pool.submit(int) for _ in range(workers)]:
+        future.result()
+    return pool
+
+def _score_players_parallel(pool, shards, players, sections, team_contexts, csv_inactive_player_names,
+                            today_str, render_all, report_lines):
+    """
+    Oyuncuları 'shards' ardışık parçaya bölüp havuzda puanlar; sonuçlar parça sırasıyla birleştirilir.
+    Havuz iş kabul etmiyorsa (çökmüş / kapatılmış) None döner; çalışanlardan gelen hatalar yükseltilir.
+    """
+    bounds = np.linspace(0, len(players), shards + 1).astype(int)
+    futures = []
+    try:
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            shard = players[lo:hi]
+            shard_contexts = {fields['TEAM_ID']: team_contexts.get(fields['TEAM_ID']) for _, _, fields, _ in shard}
+            futures.append(pool.submit(_score_shard, shard, sections[lo:hi], shard_contexts, csv_inactive_player_names,
+                                       today_str, render_all))
+    except (BrokenProcessPool, RuntimeError) as e:
+        # RuntimeError: shutdown sonrası submit (snapshot değişiminde eski havuz kapatılır)
+        for future in futures:
+            future.cancel()
+        report_lines.append(f"UYARI: Süreç havuzu kullanılamadı ({e}), oyuncular tek süreçte puanlanıyor.")
+        return None
+    analysis_results = []
+    for future in futures:
+        analysis_results.extend(future.result())
+    return analysis_results
+
+def run_slate_analysis(
+    baremler,
+    top_players_final,
+    current_season_players_df,
+    csv_inactive_player_names,
+    df_oyuncu_mac,
+    df_takim_mac,
+    ANALYSIS_RANGE,
+    MINIMUM_PATTERN_PROBABILITY,
+    today_str,
+    player_index=None,
+    team_schedule_index=None,
+    team_contexts=None,
+    render_all=True,
+    pool=None,
+    pool_shards=1,
+    memoize=None,
+    streak_tables=None
+    ):
+    """
+    Günün slate'ini toplu (vektörel) puanlar ve sıralar.
+    Dönüş: (rapor metni, top_2_diverse_picks, all_adaylar).
+    'render_all=False': yorum metinleri (CANDIDATE_TEXT_FIELDS) yalnızca ilk 2 öneri için üretilir,
+    diğer aday sözlüklerinde bu alanlar bulunmaz.
+    'pool' (create_slate_pool, aynı team_schedule_index ile): slate en az
+    PARALLEL_MIN_PLAYERS oyuncuysa puanlama 'pool_shards' parçaya bölünüp paralel yapılır.
+    'memoize' / 'streak_tables': oyuncu başına seri bölümleri için, bkz. _player_sections
+    ('streak_tables' 'player_index' ile aynı veriden kurulmuş olmalıdır).
+    """
+    report_lines = []
+
+    if player_index is None:
+        player_index = analysis_engine.build_player_index(df_oyuncu_mac)
+    if team_schedule_index is None:
+        team_schedule_index = analysis_engine.build_team_schedule_index(df_takim_mac)
+    if team_contexts is None:
+        team_contexts = analysis_engine.build_team_contexts(
+            current_season_players_df, csv_inactive_player_names, top_players_final['TEAM_ID'].unique()
+        )
+
+    players = _collect_players(baremler, top_players_final, player_index, report_lines)
+    sections = _player_sections(players, player_index, ANALYSIS_RANGE, streak_tables, memoize)
+    analysis_results = None
+    if pool is not None and pool_shards > 1 and len(players) >= PARALLEL_MIN_PLAYERS:
+        analysis_results = _score_players_parallel(pool, pool_shards, players, sections, team_contexts,
+                                                   csv_inactive_player_names, today_str, render_all, report_lines)
+    if analysis_results is None:
+        analysis_results = _score_players(players, sections, team_schedule_index, team_contexts,
+                                          csv_inactive_player_names, today_str, render_all)
+
+    report_lines.append(f"Analiz tamamlandı. Toplam {len(analysis_results)} adet barem/aday bulundu.")
+
+    if not analysis_results:
+        report_lines.append("Analiz edilecek sonuç bulunamadı.")
+        return "\n".join(report_lines), [], []
+
+    all_adaylar, top_2_diverse_picks = analysis_engine._rank_candidates(
+        report_lines, analysis_results, MINIMUM_PATTERN_PROBABILITY, shuffle_seed=today_str
+    )
+    if not render_all:
+        # Metinler yalnızca ilk 2 öneri için: o oyuncular (satırlar bağımsız olduğundan) metinle yeniden puanlanır
+        for aday in top_2_diverse_picks:
+            p = next(p for p, player in enumerate(players) if player[0] == aday['name'])
+            rendered = _score_players(players[p:p + 1], sections[p:p + 1], team_schedule_index, team_contexts,
+                                      csv_inactive_player_names, today_str, True)
+            match = next(row for row in rendered if row['threshold'] == aday['threshold'])
+            aday.update((field, match[field]) for field in CANDIDATE_TEXT_FIELDS)
+    analysis_engine._append_top_picks_report(report_lines, top_2_diverse_picks)
+    return "\n".join(report_lines), top_2_diverse_picks, all_adaylar
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+try:
+    import fcntl  # Yalnızca POSIX (Render / Linux); Windows'ta süreçler arası kilit devre dışı
+except ImportError:
+    fcntl = None
+
+# ========================================================================
+# === KOLONSAL DİSK ÖNBELLEĞİ (memory-mapped NumPy) ===
+# ========================================================================
+# Temizlenmiş (tipleri dönüştürülmüş) tablolar, veritabanı dosyasının
+# SHA-256 özeti ile anahtarlanan bir klasöre kolon kolon '.npy' olarak yazılır:
+#
+#   <cache_dir>/<db_sha256>/manifest.json
+#   <cache_dir>/<db_sha256>/<tablo>/<sıra>.npy      (kolon değerleri)
+#   <cache_dir>/<db_sha256>/<tablo>/index.npy       (DataFrame index'i)
+#
+# Sayısal / tarih kolonları düz NumPy dizisi olarak saklanır (mmap ile açılabilir);
+# kategorik kolonlarda kodlar düz dizi (mmap), kategoriler ayrı '<sıra>.categories.npy' dosyasıdır;
+# kalan metin (object) kolonları pickle'lı '.npy' olarak saklanır.
+# Aynı veritabanı tekrar yüklendiğinde SQLite okuması ve tip dönüşümü tamamen atlanır.
+
+MANIFEST_FILE = "manifest.json"
+POINTER_FILE = "CURRENT.json"   # Tüm worker'ların takip ettiği "geçerli veritabanı" işaretçisi
+LOCK_FILE = ".load.lock"
+CACHE_FORMAT_VERSION = 2
+
+def file_sha256(path, chunk_size=1 << 20):
+    """ Dosyanın SHA-256 özetini parça parça okuyarak hesaplar. """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _categories_path(path):
+    return path[:-len(".npy")] + ".categories.npy"
+
+def _save_column(path, series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        np.save(path, series.cat.codes.to_numpy(), allow_pickle=False)
+        np.save(_categories_path(path), series.cat.categories.to_numpy(), allow_pickle=True)
+        return 'category'
+    values = series.to_numpy()
+    if values.dtype == object:
+        np.save(path, values, allow_pickle=True)
+        return 'object'
+    np.save(path, values, allow_pickle=False)
+    return str(values.dtype)
+
+def _load_column(path, kind, mmap_mode):
+    if kind == 'category':
+        codes = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        categories = np.load(_categories_path(path), allow_pickle=True)
+        return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(categories))
+    if kind == 'object':
+        return np.load(path, allow_pickle=True)
+    return np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+
+def save_tables(cache_dir, db_sha, tables, meta=None):
+    """
+    'tables' ({ad: DataFrame}) sözlüğünü 'db_sha' anahtarıyla diske yazar.
+    Önce geçici klasöre yazılır, sonra tek bir rename ile yerine konur (yarım kalmış önbellek okunmaz).
+    Diğer (eski) veritabanı özetlerine ait klasörler silinir.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    final_dir = os.path.join(cache_dir, db_sha)
+    tmp_dir = os.path.join(cache_dir, f".{db_sha}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    manifest = {"format": CACHE_FORMAT_VERSION, "db_sha256": db_sha, "meta": meta or {}, "tables": {}}
+    for table_name, df in tables.items():
+        table_dir = os.path.join(tmp_dir, table_name)
+        os.makedirs(table_dir)
+        columns = []
+        for i, col in enumerate(df.columns):
+            kind = _save_column(os.path.join(table_dir, f"{i}.npy"), df[col])
+            columns.append({"name": col, "kind": kind})
+        np.save(os.path.join(table_dir, "index.npy"), df.index.to_numpy(), allow_pickle=False)
+        manifest["tables"][table_name] = {"columns": columns, "rows": len(df)}
+
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+
+    for entry in os.listdir(cache_dir):
+        entry_path = os.path.join(cache_dir, entry)
+        if entry != db_sha and os.path.isdir(entry_path) and not entry.endswith(".tmp"):
+            shutil.rmtree(entry_path, ignore_errors=True)
+    return final_dir
+
+def load_tables(cache_dir, db_sha, mmap_mode=None):
+    """
+    'db_sha' için yazılmış önbelleği okur. Dönüş: ({ad: DataFrame}, meta) veya önbellek yoksa None.
+    mmap_mode='r' verilirse sayısal kolonlar kopyalanmadan diskten eşlenir (salt okunur).
+    """
+    table_root = os.path.join(cache_dir, db_sha)
+    manifest_path = os.path.join(table_root, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get("format") != CACHE_FORMAT_VERSION:
+        return None
+
+    tables = {}
+    for table_name, info in manifest["tables"].items():
+        table_dir = os.path.join(table_root, table_name)
+        data = {
+            col["name"]: _load_column(os.path.join(table_dir, f"{i}.npy"), col["kind"], mmap_mode)
+            for i, col in enumerate(info["columns"])
+        }
+        index = np.load(os.path.join(table_dir, "index.npy"), allow_pickle=False)
+        tables[table_name] = pd.DataFrame(data, index=index, copy=False)
+    return tables, manifest.get("meta", {})
+
+
+# ========================================================================
+# === SÜREÇLER ARASI PAYLAŞIM (gunicorn worker'ları) ===
+# ========================================================================
+
+@contextmanager
+def process_lock(cache_dir):
+    """
+    Süreçler arası özel kilit (flock). Aynı anda tek bir worker indirme / önbellek yazma yapar;
+    diğerleri bekler ve ardından hazır önbelleğe bağlanır.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, LOCK_FILE), 'a') as lock_f:
+        fcntl.flock(lock_f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_f, fcntl.LOCK_UN)
+
+def write_pointer(cache_dir, db_sha, db_path):
+    """
+    Geçerli veritabanı özetini (ve yerel dosyanın boyut / mtime bilgisini) işaretçi dosyasına yazar.
+    Boyut / mtime değişmediyse file_sha256 yeniden hesaplanmaz (bkz. db_file_sha256).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    st = os.stat(db_path)
+    pointer = {"db_sha256": db_sha, "db_size": st.st_size, "db_mtime_ns": st.st_mtime_ns, "written_at": time.time()}
+    tmp_path = os.path.join(cache_dir, f".{POINTER_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(pointer, f)
+    os.replace(tmp_path, os.path.join(cache_dir, POINTER_FILE))
+
+def read_pointer(cache_dir):
+    """ İşaretçi dosyasını okur; yoksa None. """
+    try:
+        with open(os.path.join(cache_dir, POINTER_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def db_file_sha256(cache_dir, db_path):
+    """ İşaretçi yerel dosyayla (boyut + mtime) eşleşiyorsa oradaki özeti, yoksa hesaplanan özeti döndürür. """
+    pointer = read_pointer(cache_dir)
+    st = os.stat(db_path)
+    if pointer and pointer.get("db_size") == st.st_size and pointer.get("db_mtime_ns") == st.st_mtime_ns:
+        return pointer["db_sha256"]
+    return file_sha256(db_path)
@@ -0,0 +1,107 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Testler depo kökündeki modülleri (analysis_engine, slate_engine, ...) doğrudan içe aktarır
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_TEAMS = 8
+PLAYERS_PER_TEAM = 6
+SEASON_START = date(2024, 10, 22)
+SEASON_DAYS = 150
+
+@pytest.fixture(scope="session")
+def synthetic_tables():
+    """
+    Küçük, tekrarlanabilir bir sezon: 'oyuncu_mac_performanslari', 'oyuncu_sezon_istatistikleri'
+    ve 'maclar' tablolarının uygulamanın temizlediği biçimdeki karşılıkları (GAME_DATE datetime).
+    Dönüş: {'df_oyuncu_mac', 'df_oyuncu_sezon', 'df_takim_mac', 'last_day'}
+    """
+    rng = np.random.default_rng(11)
+    teams = [(1610612737 + i, f"T{i:02d}") for i in range(N_TEAMS)]
+    players = [
+        (1629000 + t * PLAYERS_PER_TEAM + k, f"Player {abbr}-{k}", team_id, abbr, rng.uniform(4, 30))
+        for t, (team_id, abbr) in enumerate(teams) for k in range(PLAYERS_PER_TEAM)
+    ]
+
+    player_rows, team_rows = [], []
+    game_number = 22400000
+    for day in range(SEASON_DAYS):
+        game_date = pd.Timestamp(SEASON_START + timedelta(days=day))
+        order = rng.permutation(N_TEAMS)
+        for home, away in zip(order[0::2], order[1::2]):
+            if rng.random() < 0.45:
+                continue
+            game_number += 1
+            game_id = f"00{game_number}"
+            for team, opponent in ((teams[home], teams[away]), (teams[away], teams[home])):
+                team_pts = 0
+                for player_id, name, team_id, abbr, mean_pts in players:
+                    if team_id != team[0] or rng.random() < 0.08:
+                        continue
+                    pts = max(0, int(rng.normal(mean_pts, 6)))
+                    fga = max(1, int(pts / 2 + rng.integers(0, 6)))
+                    fgm = min(fga, int(pts / 2.3))
+                    team_pts += pts
+                    player_rows.append(dict(
+                        SEASON_ID='22024', PLAYER_ID=player_id, PLAYER_NAME=name, TEAM_ID=team_id,
+                        TEAM_ABBREVIATION=abbr, GAME_ID=game_id, GAME_DATE=game_date,
+                        MATCHUP=f"{abbr} vs. {opponent[1]}", MIN=float(rng.integers(10, 40)),
+                        FGM=fgm, FGA=fga, FG_PCT=round(fgm / fga, 3), PTS=float(pts),
+                    ))
+                team_rows.append(dict(
+                    SEASON_ID='22024', TEAM_ID=team[0], TEAM_ABBREVIATION=team[1], TEAM_NAME=f"Team {team[1]}",
+                    GAME_ID=game_id, GAME_DATE=game_date, WL='W' if rng.random() < 0.5 else 'L', PTS=team_pts,
+                ))
+
+    df_oyuncu_mac = pd.DataFrame(player_rows)
+    df_oyuncu_mac.loc[df_oyuncu_mac.sample(frac=0.01, random_state=1).index, 'FG_PCT'] = np.nan
+    df_oyuncu_sezon = (
+        df_oyuncu_mac.groupby(['PLAYER_ID', 'PLAYER_NAME', 'SEASON_ID', 'TEAM_ID', 'TEAM_ABBREVIATION'], as_index=False)
+        .agg(GP=('GAME_ID', 'size'), MIN=('MIN', 'sum'), PTS=('PTS', 'sum'), FGA=('FGA', 'sum'), FGM=('FGM', 'sum'))
+    )
+    df_takim_mac = pd.DataFrame(team_rows)
+    return {
+        'df_oyuncu_mac': df_oyuncu_mac,
+        'df_oyuncu_sezon': df_oyuncu_sezon,
+        'df_takim_mac': df_takim_mac,
+        'last_day': df_takim_mac['GAME_DATE'].max().date(),
+    }
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """
+    app.py, veri dizini geçici bir klasörde ve S3 adresleri olmadan içe aktarılır:
+    açılışta veri yüklenmez (testler snapshot'ı kendileri kurar).
+    """
+    patch = pytest.MonkeyPatch()
+    patch.setenv("DATA_DIR", str(tmp_path_factory.mktemp("data")))
+    patch.setenv("DB_FILE_URL", "")  # boş değer, .env dosyasındaki adresi de geçersiz kılar
+    patch.delenv("SLATE_WORKERS", raising=False)
+    import app
+    yield app
+    patch.undo()
+
+def make_snapshot(app, tables, version):
+    """ Sentetik tablolardan (bkz. synthetic_tables) yüklenmiş bir DataSnapshot. """
+    player_index = app.analysis_engine.build_player_index(tables['df_oyuncu_mac'])
+    return app.DataSnapshot(
+        df_oyuncu_mac=tables['df_oyuncu_mac'], df_oyuncu_sezon=tables['df_oyuncu_sezon'],
+        df_takim_mac=tables['df_takim_mac'], df_games_today=pd.DataFrame(), df_injury_report=pd.DataFrame(),
+        all_players_list=sorted(player_index['by_name']), all_teams_list=sorted(tables['df_takim_mac']['TEAM_NAME'].unique()),
+        nba_team_id_to_abbr={}, nba_abbr_to_id={}, player_index=player_index,
+        streak_tables=app.analysis_engine.build_streak_tables(player_index),
+        team_schedule_index=app.analysis_engine.build_team_schedule_index(tables['df_takim_mac']),
+        result_index=app.analysis_engine.build_result_index(tables['df_oyuncu_mac']),
+        watermarks={}, version=version,
+    )
+
+def logged_in_client(app):
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+    return client
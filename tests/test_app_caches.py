@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import analysis_engine
+from conftest import make_snapshot
+
+# ========================================================================
+# === app.py önbellekleri: önbellekteki değerler isteğe özgü bilgi taşımaz ===
+# ========================================================================
+
+class _Clock(datetime):
+    current = datetime(2025, 1, 15, 19, 0, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+def test_hybrid_players_cache_excludes_start_timestamp(app_module, synthetic_tables, monkeypatch):
+    snap = make_snapshot(app_module, synthetic_tables, version=9201)
+    calls = []
+    compute = analysis_engine.get_players_for_hybrid_analysis
+    monkeypatch.setattr(analysis_engine, 'get_players_for_hybrid_analysis',
+                        lambda **kwargs: calls.append(kwargs) or compute(**kwargs))
+    monkeypatch.setattr(app_module, 'datetime', _Clock)
+    app_module.HYBRID_PLAYERS_CACHE.clear()
+
+    first_lines, *first_rest = app_module._get_hybrid_players(snap)
+    monkeypatch.setattr(_Clock, 'current', datetime(2025, 1, 15, 19, 42, 7))
+    second_lines, *second_rest = app_module._get_hybrid_players(snap)
+
+    assert len(calls) == 1
+    assert first_lines[0] == "Analiz başladı: 2025-01-15 19:00:00"
+    assert second_lines[0] == "Analiz başladı: 2025-01-15 19:42:07"
+    assert first_lines[1:] == second_lines[1:] and first_rest[1] == second_rest[1]
+    cached_lines = next(iter(app_module.HYBRID_PLAYERS_CACHE._data.values()))[0]
+    assert not any(line.startswith("Analiz başladı") for line in cached_lines)
+
+def test_replay_index_has_its_own_cache(app_module, synthetic_tables, monkeypatch):
+    builds = []
+    monkeypatch.setattr(app_module.replay_engine, 'build_replay_index', lambda *tables: builds.append(tables) or object())
+    app_module.REPLAY_INDEX_CACHE.clear()
+    analysis_size = app_module.ANALYSIS_CACHE.stats()['size']
+    snapshots = [make_snapshot(app_module, synthetic_tables, version=9300 + i) for i in range(3)]
+
+    first = app_module._get_replay_index(snapshots[0])
+    assert app_module._get_replay_index(snapshots[0]) is first and len(builds) == 1
+    for snap in snapshots[1:]:
+        app_module._get_replay_index(snap)
+    # En fazla REPLAY_INDEX_CACHE_MAX_ENTRIES sürüm tutulur; analiz önbelleğine hiçbir şey yazılmaz
+    assert app_module.REPLAY_INDEX_CACHE.stats()['size'] == app_module.REPLAY_INDEX_CACHE_MAX_ENTRIES
+    assert app_module.ANALYSIS_CACHE.stats()['size'] == analysis_size
+    assert app_module._get_replay_index(snapshots[0]) is not first and len(builds) == 4
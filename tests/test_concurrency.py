@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import analysis_engine
+from conftest import logged_in_client, make_snapshot
+
+# ========================================================================
+# === Eşzamanlı oyuncu analizleri (paylaşılan, salt okunur indeksler) ===
+# ========================================================================
+# İstekler aynı snapshot'ın oyuncu indeksini ve seri tablolarını kilitsiz okur.
+# Çok sayıda thread aynı anda analiz yaptığında sonuçlar seri çalıştırmayla birebir aynı olmalı
+# ve paylaşılan yapılar değişmemelidir.
+
+THREADS = 8
+ROUNDS = 6
+
+def _analyses(name, tables, player_index, streak_tables):
+    return (
+        analysis_engine.analyze_player_logic(
+            name, 14.5, tables['df_oyuncu_mac'], tables['df_oyuncu_sezon'], 3.0,
+            player_index=player_index, streak_tables=streak_tables
+        ),
+        analysis_engine.analyze_player_ladder_logic(
+            name, tables['df_oyuncu_mac'], tables['df_oyuncu_sezon'],
+            player_index=player_index, streak_tables=streak_tables
+        ),
+    )
+
+def test_concurrent_player_analyses_match_serial(synthetic_tables):
+    player_index = analysis_engine.build_player_index(synthetic_tables['df_oyuncu_mac'])
+    streak_tables = analysis_engine.build_streak_tables(player_index)
+    names = sorted(player_index['by_name'])
+    serial = {name: _analyses(name, synthetic_tables, player_index, streak_tables) for name in names}
+    index_rows = len(player_index['df'])
+    table_sizes = {name: table['n_rows'] for name, table in streak_tables.items()}
+
+    jobs = [name for _ in range(ROUNDS) for name in names]
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        concurrent = list(executor.map(
+            lambda name: (name, _analyses(name, synthetic_tables, player_index, streak_tables)), jobs
+        ))
+
+    assert len(concurrent) == len(jobs)
+    for name, result in concurrent:
+        assert result == serial[name], name
+    assert len(player_index['df']) == index_rows
+    assert {name: table['n_rows'] for name, table in streak_tables.items()} == table_sizes
+
+# ========================================================================
+# === İstek düzeyi: okuyucular kilitte sıraya girmez ===
+# ========================================================================
+# Veri tabloları değişmez snapshot'lardan kilitsiz okunur; STATE_LOCK yalnızca barem hafızasını korur.
+# THREADS istek analiz içinde bir engelde (Barrier) buluşur: okuyucular bir kilitte sıraya girseydi
+# engel hiç dolmaz ve zaman aşımıyla kırılırdı. Bu sırada bir yazıcı STATE_LOCK'u tutmaktadır.
+
+def test_player_requests_do_not_serialize(app_module, synthetic_tables, monkeypatch):
+    snap = make_snapshot(app_module, synthetic_tables, version=9001)
+    monkeypatch.setattr(app_module, '_current_snapshot', snap)
+    barrier = threading.Barrier(THREADS, timeout=10)
+    analyze = analysis_engine.analyze_player_logic
+
+    def analyze_after_meeting(*args, **kwargs):
+        barrier.wait()
+        return analyze(*args, **kwargs)
+
+    monkeypatch.setattr(analysis_engine, 'analyze_player_logic', analyze_after_meeting)
+    names = snap.all_players_list[:THREADS]
+    clients = [logged_in_client(app_module) for _ in names]
+
+    def request(i):
+        # Her istek farklı bir barem: önbellekten değil, analizden geçer
+        return clients[i].post('/oyuncu-analizi', data={'player_name': names[i], 'middle_barem': str(10.5 + i)})
+
+    with app_module.STATE_LOCK:
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            responses = list(executor.map(request, range(THREADS)))
+
+    assert not barrier.broken
+    for name, response in zip(names, responses):
+        page = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert "KRİTİK HATA" not in page and name in page
@@ -0,0 +1,65 @@
+import pytest
+
+from conftest import logged_in_client, make_snapshot
+
+# ========================================================================
+# === /api/get_data sunucu taraflı işleme (DataTables) ===
+# ========================================================================
+# Arama, tablodaki her kolonun ekranda görünen metninde yapılır (JSON değerinin JavaScript'teki hali);
+# referans: tüm tablonun JSON kayıtları üzerinde düz Python alt metin araması.
+
+@pytest.fixture(params=['raw', 'compact'])
+def client(request, app_module, synthetic_tables, monkeypatch):
+    """ Tablo hem ham haliyle hem de yüklemedeki kompakt şemayla (kategorik / int16) sunulur. """
+    tables = dict(synthetic_tables)
+    if request.param == 'compact':
+        tables['df_oyuncu_mac'] = app_module._compact_frame(tables['df_oyuncu_mac'], 'oyuncu_mac_performanslari')
+    version = 9101 if request.param == 'raw' else 9102
+    monkeypatch.setattr(app_module, '_current_snapshot', make_snapshot(app_module, tables, version=version))
+    return logged_in_client(app_module)
+
+def _displayed(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value).lower()
+
+def _reference_filtered(app_module, df, search_value):
+    rows = [[_displayed(value) for value in record.values()] for record in app_module._table_to_records(df)]
+    return sum(all(any(word in text for text in row) for word in search_value.lower().split()) for row in rows)
+
+def _page(client, **params):
+    query = {'draw': '3', 'start': '0', 'length': '10', **params}
+    return client.get('/api/get_data/oyuncu_mac', query_string=query)
+
+@pytest.mark.parametrize("search_value", ["T03", "player t01", "2024-11", "0.5", "27", "0.333 t02", "vs. 12"])
+def test_search_matches_displayed_text(app_module, client, search_value):
+    response = _page(client, **{'search[value]': search_value})
+    assert response.status_code == 200
+    body = response.get_json()
+    df = app_module.get_snapshot().df_oyuncu_mac
+    assert body['draw'] == 3 and body['recordsTotal'] == len(df)
+    assert body['recordsFiltered'] == _reference_filtered(app_module, df, search_value)
+    assert body['recordsFiltered'] > 0 and len(body['data']) == min(10, body['recordsFiltered'])
+
+def test_numeric_search_uses_displayed_format(app_module, client):
+    # PTS ekranda '12' görünür ('12.0' değil); boş FG_PCT 'nan' olarak aranmaz
+    assert _page(client, **{'search[value]': '12.0'}).get_json()['recordsFiltered'] == 0
+    assert _page(client, **{'search[value]': 'nan'}).get_json()['recordsFiltered'] == 0
+
+@pytest.mark.parametrize("params", [{'start': 'abc'}, {'length': '1.5'}, {'draw': 'x'}, {'order[0][column]': 'PTS'}])
+def test_bad_paging_parameters_return_400(client, params):
+    response = _page(client, **params)
+    assert response.status_code == 400
+    assert response.get_json()['data'] == []
+
+def test_missing_paging_parameters_use_defaults(app_module, client):
+    response = client.get('/api/get_data/oyuncu_mac', query_string={'draw': '1', 'start': '', 'order[0][column]': '99'})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert len(body['data']) == app_module.DATATABLE_DEFAULT_LENGTH
+    everything = _page(client, length='-1', start='-5')
+    assert len(everything.get_json()['data']) == len(app_module.get_snapshot().df_oyuncu_mac)
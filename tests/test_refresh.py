@@ -0,0 +1,200 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+# ========================================================================
+# === Veri yenileme: koşullu HTTP (ETag / Last-Modified) + artımlı okuma ===
+# ========================================================================
+# S3 yerine bir thread'de çalışan http.server; veritabanı sentetik sezonun ilk günlerinden kurulan
+# küçük bir SQLite dosyası. Sunucu yalnızca etkin doğrulayıcıyı (ETag ya da Last-Modified) gönderir
+# ve koşullu isteklere 304 döner; gelen her istek (yol, koşullu başlıklar, durum) kaydedilir.
+
+class _S3Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = os.path.join(self.server.root, self.path.lstrip('/'))
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        last_modified = formatdate(int(os.stat(path).st_mtime), usegmt=True)
+        conditional = {key: self.headers.get(key) for key in ('If-None-Match', 'If-Modified-Since') if self.headers.get(key)}
+
+        not_modified = False
+        if self.server.validator == 'etag' and 'If-None-Match' in conditional:
+            not_modified = conditional['If-None-Match'] == etag
+        elif self.server.validator == 'last_modified' and 'If-Modified-Since' in conditional:
+            not_modified = parsedate_to_datetime(last_modified) <= parsedate_to_datetime(conditional['If-Modified-Since'])
+        self.server.requests.append((self.path, conditional, 304 if not_modified else 200))
+
+        self.send_response(304 if not_modified else 200)
+        if self.server.validator == 'etag':
+            self.send_header('ETag', etag)
+        else:
+            self.send_header('Last-Modified', last_modified)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def s3_server(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _S3Handler)
+    server.root = str(tmp_path / "s3")
+    server.validator = 'etag'
+    server.requests = []
+    os.makedirs(server.root)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _write_db(path, tables, days):
+    """ Sentetik sezonun ilk 'days' gününden (GAME_DATE metin, S3'teki gibi) küçük bir SQLite dosyası. """
+    first_day = tables['df_takim_mac']['GAME_DATE'].min()
+    if os.path.exists(path):
+        os.remove(path)
+    with sqlite3.connect(path) as conn:
+        for name, df in (('oyuncu_mac_performanslari', tables['df_oyuncu_mac']), ('maclar', tables['df_takim_mac'])):
+            df = df[df['GAME_DATE'] < first_day + pd.Timedelta(days=days)].copy()
+            df['GAME_DATE'] = df['GAME_DATE'].dt.strftime('%Y-%m-%d')
+            df.to_sql(name, conn, index=False)
+        tables['df_oyuncu_sezon'].to_sql('oyuncu_sezon_istatistikleri', conn, index=False)
+
+@pytest.fixture
+def refresh_app(app_module, s3_server, synthetic_tables, tmp_path, monkeypatch):
+    """ app, S3 adresleri yerel sunucuya ve tüm dosya yolları geçici klasöre yönlendirilmiş olarak. """
+    root = s3_server.root
+    _write_db(os.path.join(root, "nba_analiz.db"), synthetic_tables, days=20)
+    pd.DataFrame([{'HOME_TEAM': 'T00', 'AWAY_TEAM': 'T01'}]).to_json(os.path.join(root, "games_today.json"))
+    pd.DataFrame([{'Player': 'Player T00-0', 'Status': 'Out'}]).to_csv(os.path.join(root, "nba-injury-report.csv"), index=False)
+
+    local = tmp_path / "local"
+    local.mkdir()
+    monkeypatch.setattr(app_module, 'DB_FILE_URL', f"{s3_server.url}/nba_analiz.db")
+    monkeypatch.setattr(app_module, 'GAMES_TODAY_URL', f"{s3_server.url}/games_today.json")
+    monkeypatch.setattr(app_module, 'INJURY_FILE_URL', f"{s3_server.url}/nba-injury-report.csv")
+    monkeypatch.setattr(app_module, 'RENDER_DB_PATH', str(local / "nba_analiz.db"))
+    monkeypatch.setattr(app_module, 'RENDER_GAMES_TODAY_PATH', str(local / "games_today.json"))
+    monkeypatch.setattr(app_module, 'RENDER_INJURY_PATH', str(local / "nba-injury-report.csv"))
+    monkeypatch.setattr(app_module, 'HTTP_VALIDATORS_FILE', str(local / "http_validators.json"))
+    monkeypatch.setattr(app_module, 'TABLE_CACHE_DIR', str(local / "table_cache"))
+    monkeypatch.setattr(app_module, 'SLATE_WORKERS', 0)
+    monkeypatch.setitem(app_module.DATA_CACHE, 'http_validators', {})
+    monkeypatch.setattr(app_module, '_current_snapshot', app_module.DataSnapshot(
+        df_games_today=pd.DataFrame(), df_injury_report=pd.DataFrame(),
+        all_players_list=[], all_teams_list=[], nba_team_id_to_abbr={}, nba_abbr_to_id={},
+        watermarks={}, version=0,
+    ))
+    return app_module
+
+def _statuses(server, name):
+    return [status for path, _, status in server.requests if path == f"/{name}"]
+
+def _normalized(df, key_cols):
+    """ Satır sırası ve kategorik kodlamadan bağımsız karşılaştırma için. """
+    df = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    return df.sort_values(key_cols).reset_index(drop=True)
+
+# --- download_if_changed ---
+
+@pytest.mark.parametrize("validator", ['etag', 'last_modified'])
+def test_download_if_changed_honours_validators(refresh_app, s3_server, validator):
+    s3_server.validator = validator
+    url = refresh_app.GAMES_TODAY_URL
+    local_path = refresh_app.RENDER_GAMES_TODAY_PATH
+    served_path = os.path.join(s3_server.root, "games_today.json")
+
+    assert refresh_app.download_if_changed(url, local_path) is True
+    assert refresh_app.download_if_changed(url, local_path) is False    # 304: dosyaya dokunulmaz
+    sent = s3_server.requests[-1][1]
+    assert sent == ({'If-None-Match': refresh_app.DATA_CACHE['http_validators'][url]['etag']} if validator == 'etag'
+                    else {'If-Modified-Since': refresh_app.DATA_CACHE['http_validators'][url]['last_modified']})
+
+    # Sunucudaki dosya değişti: yeni ETag / daha yeni Last-Modified -> yeniden indirilir
+    pd.DataFrame([{'HOME_TEAM': 'T02', 'AWAY_TEAM': 'T03'}]).to_json(served_path)
+    stat = os.stat(served_path)
+    os.utime(served_path, (stat.st_atime, stat.st_mtime + 60))
+    assert refresh_app.download_if_changed(url, local_path) is True
+    with open(local_path) as f_local, open(served_path) as f_served:
+        assert f_local.read() == f_served.read()
+
+    # force=True koşullu başlık göndermez; doğrulayıcılar diske yazılmıştır (sıcak başlangıç)
+    assert refresh_app.download_if_changed(url, local_path, force=True) is True
+    assert s3_server.requests[-1][1] == {}
+    refresh_app.DATA_CACHE['http_validators'] = {}
+    refresh_app._load_http_validators()
+    assert refresh_app.download_if_changed(url, local_path) is False
+    assert not os.path.exists(local_path + ".part")
+
+# --- _merge_new_rows ---
+
+def test_merge_new_rows_replaces_duplicate_keys(app_module):
+    existing = pd.DataFrame({'PLAYER_ID': [1, 1, 2], 'GAME_ID': ['a', 'b', 'a'], 'PTS': [10, 11, 12]})
+    new = pd.DataFrame({'PLAYER_ID': [1, 2], 'GAME_ID': ['b', 'c'], 'PTS': [99, 13]})
+    merged = app_module._merge_new_rows(existing, new, ['PLAYER_ID', 'GAME_ID'])
+    assert merged.to_dict('records') == [
+        {'PLAYER_ID': 1, 'GAME_ID': 'a', 'PTS': 10}, {'PLAYER_ID': 2, 'GAME_ID': 'a', 'PTS': 12},
+        {'PLAYER_ID': 1, 'GAME_ID': 'b', 'PTS': 99}, {'PLAYER_ID': 2, 'GAME_ID': 'c', 'PTS': 13},
+    ]
+    assert app_module._merge_new_rows(existing, new.iloc[0:0], ['PLAYER_ID', 'GAME_ID']) is existing
+
+# --- _build_snapshot / load_data_from_s3 ---
+
+def test_incremental_refresh_matches_full_reload(refresh_app, s3_server, synthetic_tables, capsys):
+    assert refresh_app.load_data_from_s3(incremental=False)
+    first = refresh_app.get_snapshot()
+    assert first.is_loaded and first.version == 1 and len(first.df_games_today) == 1
+
+    # Hiçbir dosya değişmedi: üçü de 304, tablolar ve seri tabloları aynı nesneler
+    assert refresh_app.load_data_from_s3(incremental=True)
+    unchanged = refresh_app.get_snapshot()
+    for name in ("nba_analiz.db", "games_today.json", "nba-injury-report.csv"):
+        assert _statuses(s3_server, name)[-1] == 304
+    assert unchanged.df_oyuncu_mac is first.df_oyuncu_mac and unchanged.streak_tables is first.streak_tables
+
+    # Yeni günler geldi; watermark günündeki satırlar tekrar okunur (aynı anahtar) ve bir satır düzeltildi
+    db_path = os.path.join(s3_server.root, "nba_analiz.db")
+    _write_db(db_path, synthetic_tables, days=26)
+    watermark_day = first.watermarks['oyuncu_mac_performanslari']['GAME_DATE']
+    with sqlite3.connect(db_path) as conn:
+        player_id, game_id = conn.execute(
+            "SELECT PLAYER_ID, GAME_ID FROM oyuncu_mac_performanslari WHERE GAME_DATE = ? LIMIT 1", (watermark_day,)
+        ).fetchone()
+        conn.execute("UPDATE oyuncu_mac_performanslari SET PTS = 77 WHERE PLAYER_ID = ? AND GAME_ID = ?", (player_id, game_id))
+
+    capsys.readouterr()
+    assert refresh_app.load_data_from_s3(incremental=True)
+    assert f"Artımlı okuma: oyuncu_mac_performanslari (GAME_DATE >= {watermark_day})" in capsys.readouterr().out
+    incremental = refresh_app.get_snapshot()
+    assert _statuses(s3_server, "nba_analiz.db")[-1] == 200
+    assert incremental.watermarks['oyuncu_mac_performanslari']['GAME_DATE'] > watermark_day
+
+    full = refresh_app._build_snapshot(refresh_app.DataSnapshot(
+        df_games_today=pd.DataFrame(), df_injury_report=pd.DataFrame(), watermarks={}, version=0,
+    ), incremental=False)
+    for attr, table_name in (('df_oyuncu_mac', 'oyuncu_mac_performanslari'), ('df_takim_mac', 'maclar')):
+        key_cols = refresh_app.INCREMENTAL_TABLES[table_name]
+        new_df = getattr(incremental, attr)
+        assert not new_df.duplicated(key_cols).any()
+        pd.testing.assert_frame_equal(_normalized(new_df, key_cols), _normalized(getattr(full, attr), key_cols))
+    corrected = incremental.df_oyuncu_mac
+    corrected = corrected[(corrected['PLAYER_ID'] == player_id) & (corrected['GAME_ID'] == game_id)]
+    assert corrected['PTS'].tolist() == [77]
+
+    # Seri tabloları artımlı güncellendi (düzeltilen oyuncununki baştan kuruldu): baştan kurulanla aynı
+    assert incremental.streak_tables.keys() == full.streak_tables.keys()
+    for name, table in full.streak_tables.items():
+        assert incremental.streak_tables[name]['values'].tolist() == table['values'].tolist()
+        assert incremental.streak_tables[name]['n_rows'] == table['n_rows']
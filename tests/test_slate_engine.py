@@ -0,0 +1,376 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import slate_engine
+from analysis_engine import (
+    B2B_WEIGHT, BASE_CONFIDENCE, EFFICIENCY_WEIGHT, USAGE_DELTA_WEIGHT, VOLUME_BAND,
+    VOLUME_WEIGHT_NEGATIVE, VOLUME_WEIGHT_POSITIVE, _append_top_picks_report, _player_mac_data,
+    _rank_candidates, analyze_streaks, analyze_streaks_multi, build_player_index, build_streak_tables,
+    build_team_contexts, build_team_schedule_index, get_player_delta, team_played_on, team_rest_features,
+)
+
+# ========================================================================
+# === run_slate_analysis == oyuncu x barem döngüsü (eski run_full_analysis_logic) ===
+# ========================================================================
+# Referans: toplu motordan önceki ana sayfa analizi (oyuncu başına döngü), seri hesapları
+# doğrudan analyze_streaks / analyze_streaks_multi ile yapılacak şekilde sadeleştirilmiş.
+
+def _reference_run_full(
+    baremler, 
+    top_players_final, 
+    current_season_players_df, 
+    csv_inactive_player_names, 
+    df_oyuncu_mac,
+    df_takim_mac, 
+    ANALYSIS_RANGE,
+    MINIMUM_PATTERN_PROBABILITY,
+    today_str,
+    player_index=None,
+    team_schedule_index=None,
+    team_contexts=None
+    ):
+    
+    report_lines = []
+    analysis_results = []
+    
+    today_date_obj = datetime.strptime(today_str, '%Y-%m-%d').date()
+    yesterday_date_obj = today_date_obj - timedelta(days=1)
+
+    if team_schedule_index is None:
+        team_schedule_index = build_team_schedule_index(df_takim_mac)
+    if team_contexts is None:
+        team_contexts = build_team_contexts(
+            current_season_players_df, csv_inactive_player_names, top_players_final['TEAM_ID'].unique()
+        )
+            
+    for (player_name, middle_barem) in baremler:
+        
+        barems_to_analyze = [
+            middle_barem - ANALYSIS_RANGE,
+            middle_barem,
+            middle_barem + ANALYSIS_RANGE
+        ]
+        
+        try:
+            player_mac_data = _player_mac_data(player_name, df_oyuncu_mac, player_index)
+            # <--- GÜNCELLEME: Rapor için toplam maç sayısını al
+            total_match_count = len(player_mac_data)
+            # --- BİTTİ ---
+            
+            player_sezon_row = top_players_final[top_players_final['PLAYER_NAME'] == player_name].iloc[0]
+        except IndexError:
+             report_lines.append(f"\n! {player_name} için veri bulunamadı (Indext Hatası). Atlanıyor...")
+             continue
+
+        if len(player_mac_data) < 3:
+            report_lines.append(f"\n! {player_name} için yetersiz maç verisi (maç < 3). Atlanıyor...")
+            continue 
+        
+        player_id = player_sezon_row['PLAYER_ID']
+        team_id = player_sezon_row['TEAM_ID']
+        opponent_team_id = player_sezon_row['OPPONENT_TEAM_ID']
+        game_id = player_sezon_row['GAME_ID'] 
+        gp = player_sezon_row['GP']
+
+        if gp == 0:
+            report_lines.append(f"\n! {player_name} için GP=0, analiz atlanıyor (ZeroDivisionError önlendi).")
+            continue
+        
+        s_avg_pts = player_sezon_row['PTS'] / gp
+        s_fga = player_sezon_row['FGA']
+        s_fgm = player_sezon_row['FGM']
+        s_avg_fg_pct = s_fgm / s_fga if s_fga > 0 else 0.0
+        
+        # <--- GÜNCELLEME: Rapor için Takım ve Süre bilgilerini al
+        team_abbr = player_sezon_row.get('TEAM_ABBREVIATION', '???')
+        avg_min_this_season = player_sezon_row.get('MIN_PER_GAME', 0.0) # Bu, get_players'da hesaplanmıştı
+        # --- BİTTİ ---
+
+        # B2B verisini BİR KEZ hesapla (fikstür indeksinden O(1) kontrol)
+        player_played_yesterday = team_played_on(team_schedule_index, team_id, yesterday_date_obj)
+        opponent_played_yesterday = team_played_on(team_schedule_index, opponent_team_id, yesterday_date_obj)
+        rest_days, games_in_window = team_rest_features(team_schedule_index, team_id, today_date_obj)
+        opp_rest_days, opp_games_in_window = team_rest_features(team_schedule_index, opponent_team_id, today_date_obj)
+        
+        # Delta verisini takım bağlamından al (takım başına bir kez hazırlandı)
+        delta_etkisi, delta_oyuncu_ismi = get_player_delta(
+            team_contexts.get(team_id), player_name, gp, csv_inactive_player_names
+        )
+
+        valid_barems = [threshold_pts for threshold_pts in barems_to_analyze if threshold_pts > 0]
+        (_, _, _, _, _, _, _, _, _, _, 
+         fg_current_type_str, fg_prob_break_pct, _, _
+         ) = analyze_streaks(player_mac_data, 'FG_PCT', s_avg_fg_pct)
+        pts_results = analyze_streaks_multi(player_mac_data['PTS'], valid_barems)
+        verimlilik_yonu = "ÜST" if fg_current_type_str == "eşik altı ('ATAMADI')" else "ALT"
+
+        # Şimdi 3 barem için iç döngü
+        for threshold_pts, pts_result in zip(valid_barems, pts_results):
+            (pts_pattern, _, _, _, _, _, 
+             pts_comment_h, pts_comment_b, pts_prob_h, pts_prob_b, 
+             pts_current_type_str, pts_prob_break_pct, _, pts_current_length
+             ) = pts_result
+            
+            aday_yonu = "ÜST" if pts_current_type_str == "eşik altı ('ATAMADI')" else "ALT"
+            aday_tag = 'buyuk_yesil' if aday_yonu == "ÜST" else 'buyuk_kirmizi'
+
+            final_confidence = BASE_CONFIDENCE
+            comment_hacim = "NÖTR (Hacim bareme yakın)"
+            comment_verimlilik = "NÖTR (Verimlilik serisi yok/etkisiz)"
+            comment_b2b = "NÖTR (B2B durumu eşit)"
+            comment_delta = "NÖTR (Kadroda Delta Yok)"
+            hacim_result = 0 
+            eff_signal = 0
+            b2b_signal = 0
+
+            if fg_prob_break_pct > 1: 
+                if aday_yonu == verimlilik_yonu:
+                    final_confidence += EFFICIENCY_WEIGHT
+                    eff_signal = 1
+                    comment_verimlilik = f"POZİTİF (FG% serisi de {verimlilik_yonu} yönünde)"
+                elif aday_yonu != verimlilik_yonu:
+                    final_confidence -= EFFICIENCY_WEIGHT
+                    eff_signal = -1
+                    comment_verimlilik = f"NEGATİF (FG% serisi zıt yönde ({verimlilik_yonu}))"
+            
+            hacim_skoru = s_avg_pts 
+            hacim_fark = hacim_skoru - threshold_pts
+            hacim_pozitif_esik = VOLUME_BAND
+            hacim_negatif_esik = -VOLUME_BAND
+
+            if aday_yonu == "ÜST":
+                if hacim_fark > hacim_pozitif_esik: 
+                    hacim_result = 1
+                    comment_hacim = f"POZİTİF (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f})"
+                elif hacim_fark < hacim_negatif_esik: 
+                    hacim_result = -1
+                    comment_hacim = f"NEGATİF! (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f}) HACİM YETERSİZ!"
+            elif aday_yonu == "ALT":
+                if hacim_fark > hacim_pozitif_esik: 
+                    hacim_result = -1 
+                    comment_hacim = f"NEGATİF! (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f}) HACİM ÇOK YÜKSEK!"
+                elif hacim_fark < hacim_negatif_esik: 
+                    hacim_result = 1 
+                    comment_hacim = f"POZİTİF (Ort: {hacim_skoru:.1f} / Barem: {threshold_pts:.1f}) HACİM ZATEN DÜŞÜK!"
+            
+            if hacim_result == 1:
+                final_confidence += VOLUME_WEIGHT_POSITIVE
+            elif hacim_result == -1:
+                final_confidence += VOLUME_WEIGHT_NEGATIVE 
+
+            if player_played_yesterday and not opponent_played_yesterday:
+                final_confidence -= B2B_WEIGHT
+                b2b_signal = -1
+                comment_b2b = f"NEGATİF (Oyuncu Yorgun, Rakip Dinlenmiş)"
+            elif not player_played_yesterday and opponent_played_yesterday:
+                final_confidence += B2B_WEIGHT
+                b2b_signal = 1
+                comment_b2b = f"POZİTİF (Oyuncu Dinlenmiş, Rakip Yorgun)"
+
+            if aday_yonu == "ÜST":
+                if delta_etkisi == 1: 
+                    if hacim_result == -1: final_confidence -= VOLUME_WEIGHT_NEGATIVE 
+                    final_confidence += USAGE_DELTA_WEIGHT
+                    comment_delta = f"POZİTİF (Hacim Artışı! {delta_oyuncu_ismi} oynamıyor)"
+                elif delta_etkisi == -1: 
+                    if hacim_result == 1: final_confidence -= VOLUME_WEIGHT_POSITIVE 
+                    final_confidence -= USAGE_DELTA_WEIGHT
+                    comment_delta = f"NEGATİF (Hacim Düşüşü! {delta_oyuncu_ismi} dönüyor)"
+            elif aday_yonu == "ALT":
+                if delta_etkisi == 1: 
+                    final_confidence -= USAGE_DELTA_WEIGHT
+                    comment_delta = f"NEGATİF (Hacim Artışı! {delta_oyuncu_ismi} oynamıyor)"
+                elif delta_etkisi == -1: 
+                    final_confidence += USAGE_DELTA_WEIGHT
+                    comment_delta = f"POZİTİF (Hacim Düşüşü! {delta_oyuncu_ismi} dönüyor)"
+            
+            final_confidence = max(5, min(99, int(final_confidence)))
+            full_pts_comment = (pts_prob_h + pts_prob_b).replace("\n", " ").replace("    >> ", "")
+            sinerji_skoru = (pts_prob_break_pct / 100.0) * (final_confidence / 100.0)
+
+            # <--- GÜNCELLEME: Rapor için ekstra verileri sözlüğe ekle
+            analysis_results.append({
+                'sinerji_skoru': sinerji_skoru,
+                'game_id': game_id, 
+                'player_id': player_id, 
+                'name': player_name,
+                'threshold': threshold_pts,
+                'direction': aday_yonu,
+                'tag': aday_tag,
+                'confidence': final_confidence,
+                'pts_prob': pts_prob_break_pct,
+                'pts_streak_len': pts_current_length,
+                'pts_comment': full_pts_comment, 
+                'comment_hacim': comment_hacim,
+                'comment_verimlilik': comment_verimlilik,
+                'raw_s_avg_pts': s_avg_pts,
+                'raw_s_avg_fg_pct': s_avg_fg_pct,
+                'raw_b2b_comment': comment_b2b,
+                'rest_days': rest_days,
+                'games_in_window': games_in_window,
+                'opp_rest_days': opp_rest_days,
+                'opp_games_in_window': opp_games_in_window,
+                'raw_delta_comment': comment_delta,
+                'delta_tag': 'delta_plus' if delta_etkisi == 1 else ('delta_minus' if delta_etkisi == -1 else 'kucuk_desen'),
+                'eff_signal': eff_signal,        # Ağırlık taraması (weight_sweep) için ham faktörler
+                'b2b_signal': b2b_signal,
+                'delta_effect': int(delta_etkisi),
+                'team_abbr': team_abbr,                 # <--- EKLENDİ
+                'total_match_count': total_match_count, # <--- EKLENDİ
+                'avg_min': avg_min_this_season          # <--- EKLENDİ
+            })
+            # --- BİTTİ ---
+            
+    report_lines.append(f"Analiz tamamlandı. Toplam {len(analysis_results)} adet barem/aday bulundu.")
+    
+    if not analysis_results:
+         report_lines.append("Analiz edilecek sonuç bulunamadı.")
+         return "\n".join(report_lines), [], []
+
+    all_adaylar, top_2_diverse_picks = _rank_candidates(
+        report_lines, analysis_results, MINIMUM_PATTERN_PROBABILITY, shuffle_seed=today_str
+    )
+    _append_top_picks_report(report_lines, top_2_diverse_picks)
+    return "\n".join(report_lines), top_2_diverse_picks, all_adaylar
+
+BAREM_CHOICES = [0.5, 2.5, 5.5, 10.5, 15.5, 22.5, 30.5, 45.5]
+
+@pytest.fixture(scope="module")
+def slate(synthetic_tables):
+    """ Son günün ertesine tüm takımların eşleştiği bir slate ve analiz girdileri. """
+    sezon = synthetic_tables['df_oyuncu_sezon']
+    today = synthetic_tables['last_day'] + timedelta(days=1)
+    team_ids = sorted(sezon['TEAM_ID'].unique())
+    opponents, game_ids = {}, {}
+    for i, (home, away) in enumerate(zip(team_ids[0::2], team_ids[1::2])):
+        opponents[home], opponents[away] = away, home
+        game_ids[home] = game_ids[away] = f"slate-{i}"
+    top_players_final = sezon.assign(
+        OPPONENT_TEAM_ID=sezon['TEAM_ID'].map(opponents),
+        GAME_ID=sezon['TEAM_ID'].map(game_ids),
+        MIN_PER_GAME=sezon['MIN'] / sezon['GP'],
+    ).sort_values(by=['GAME_ID', 'TEAM_ID', 'MIN_PER_GAME'], ascending=[True, True, False])
+    inactive = set(sezon.sort_values(by='FGA', ascending=False)['PLAYER_NAME'].iloc[::7])
+    return dict(
+        top_players_final=top_players_final,
+        current_season_players_df=sezon,
+        csv_inactive_player_names=inactive,
+        df_oyuncu_mac=synthetic_tables['df_oyuncu_mac'],
+        df_takim_mac=synthetic_tables['df_takim_mac'],
+        ANALYSIS_RANGE=3.0,
+        MINIMUM_PATTERN_PROBABILITY=75.0,
+        today_str=today.strftime('%Y-%m-%d'),
+        player_index=build_player_index(synthetic_tables['df_oyuncu_mac']),
+        team_schedule_index=build_team_schedule_index(synthetic_tables['df_takim_mac']),
+        team_contexts=build_team_contexts(sezon, inactive, team_ids),
+    )
+
+def _baremler(slate, seed):
+    rng = random.Random(seed)
+    baremler = [(name, rng.choice(BAREM_CHOICES)) for name in slate['top_players_final']['PLAYER_NAME']]
+    baremler.append(('Nobody Here', 10.5))
+    rng.shuffle(baremler)
+    return baremler
+
+def _without_texts(adaylar):
+    return [{k: v for k, v in aday.items() if k not in slate_engine.CANDIDATE_TEXT_FIELDS} for aday in adaylar]
+
+@pytest.mark.parametrize("seed", range(8))
+def test_slate_matches_reference(slate, seed):
+    baremler = _baremler(slate, seed)
+    assert slate_engine.run_slate_analysis(baremler, **slate) == _reference_run_full(baremler, **slate)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_lean_render_matches_reference(slate, seed):
+    baremler = _baremler(slate, seed)
+    report, top_picks, adaylar = _reference_run_full(baremler, **slate)
+    lean_report, lean_top_picks, lean_adaylar = slate_engine.run_slate_analysis(baremler, **slate, render_all=False)
+    assert (lean_report, lean_top_picks) == (report, top_picks)
+    assert _without_texts(lean_adaylar) == _without_texts(adaylar)
+
+def test_tied_top_group_is_seeded(slate):
+    # Her oyuncu iki kez: en üstteki aday birebir aynı skorla (en az) iki kez yer alır
+    baremler = _baremler(slate, 0) * 2
+    first = slate_engine.run_slate_analysis(baremler, **slate)
+    assert "BİREBİR AYNI" in first[0]
+    assert slate_engine.run_slate_analysis(baremler, **slate) == first == _reference_run_full(baremler, **slate)
+
+class _DictMemo:
+    """ memoize(anahtar, hesapla) karşılığı; hesaplanan anahtarlar sayılır. """
+    def __init__(self):
+        self.data = {}
+        self.computed = []
+
+    def __call__(self, key, compute):
+        if key not in self.data:
+            self.computed.append(key)
+            self.data[key] = compute()
+        return self.data[key]
+
+@pytest.mark.parametrize("seed", range(4))
+def test_streak_tables_and_memoize_match_reference(slate, seed):
+    baremler = _baremler(slate, seed)
+    reference = _reference_run_full(baremler, **slate)
+    streak_tables = build_streak_tables(slate['player_index'])
+    memo = _DictMemo()
+    # Önceki bir slate'in bölümleri önbellekte: kısmen dolu önbellek
+    slate_engine.run_slate_analysis(_baremler(slate, seed + 100), **slate, memoize=memo, streak_tables=streak_tables)
+    warm_keys = set(memo.data)
+    assert slate_engine.run_slate_analysis(baremler, **slate, memoize=memo, streak_tables=streak_tables) == reference
+    assert not warm_keys.intersection(memo.computed[len(warm_keys):])
+    computed = len(memo.computed)
+    assert slate_engine.run_slate_analysis(baremler, **slate, memoize=memo, streak_tables=streak_tables) == reference
+    assert len(memo.computed) == computed
+    assert slate_engine.run_slate_analysis(baremler, **slate, streak_tables=streak_tables) == reference
+
+def test_sections_read_streak_tables(slate, monkeypatch):
+    # Tablosu olan oyuncuların PTS satırları ham dizilerden hesaplanmaz
+    streak_tables = build_streak_tables(slate['player_index'])
+    ragged_rows = []
+    ragged = slate_engine._ragged_streak_stats
+    monkeypatch.setattr(slate_engine, '_ragged_streak_stats',
+                        lambda *args: ragged_rows.append(args[3].size) or ragged(*args))
+    slate_engine.run_slate_analysis(_baremler(slate, 1), **slate, streak_tables=streak_tables)
+    n_players = slate['top_players_final']['PLAYER_NAME'].nunique()
+    assert ragged_rows == [n_players]  # yalnızca FG% satırları
+
+# ========================================================================
+# === Süreç havuzu: paralel == seri; kapalı havuzda seri, çalışan hatası yükselir ===
+# ========================================================================
+@pytest.fixture
+def small_parallel_threshold(monkeypatch):
+    monkeypatch.setattr(slate_engine, 'PARALLEL_MIN_PLAYERS', 0)
+
+def test_pool_matches_serial(slate, small_parallel_threshold):
+    baremler = _baremler(slate, 3)
+    pool = slate_engine.create_slate_pool(slate['team_schedule_index'], 2)
+    try:
+        for shards in (2, 3):
+            for render_all in (True, False):
+                assert slate_engine.run_slate_analysis(baremler, **slate, render_all=render_all, pool=pool, pool_shards=shards) \
+                    == slate_engine.run_slate_analysis(baremler, **slate, render_all=render_all)
+    finally:
+        pool.shutdown()
+
+def test_shut_down_pool_falls_back_to_serial(slate, small_parallel_threshold):
+    baremler = _baremler(slate, 4)
+    pool = slate_engine.create_slate_pool(slate['team_schedule_index'], 2)
+    pool.shutdown()
+    report, top_picks, adaylar = slate_engine.run_slate_analysis(baremler, **slate, pool=pool, pool_shards=2)
+    assert "UYARI: Süreç havuzu kullanılamadı" in report
+    assert (top_picks, adaylar) == slate_engine.run_slate_analysis(baremler, **slate)[1:]
+
+def test_worker_errors_propagate(slate, small_parallel_threshold):
+    # Çalışanlar fikstür indeksi olmadan kuruldu: puanlama çalışanda hata verir, seri hesaba düşülmez
+    pool = slate_engine.create_slate_pool(None, 2)
+    try:
+        with pytest.raises(TypeError):
+            slate_engine.run_slate_analysis(_baremler(slate, 5), **slate, pool=pool, pool_shards=2)
+    finally:
+        pool.shutdown()
+
+def test_pool_workers_are_not_forked():
+    # Havuz istek thread'leri çalışırken kurulur: çalışanlar çağıran süreçten fork edilmemeli
+    assert slate_engine._pool_context().get_start_method() in ('forkserver', 'spawn')
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis_engine
+from analysis_engine import (
+    analyze_streaks_multi, append_streak_value, build_player_index, build_streak_table, build_streak_tables,
+    streak_results_from_table, streak_table_stats, streak_tables_stats,
+)
+
+# ========================================================================
+# === PTS seri tabloları: tek tek ekleme == baştan kurma == ham dizi ===
+# ========================================================================
+# Tablo yalnızca k + 0.5 kovalarını tutar; diğer baremler kovaya eşlenir (tamsayı barem k -> k - 0.5,
+# en yüksek skorun üstü -> en üst kova). Her adımda aynı sayılar üç yoldan da çıkmalıdır.
+
+def _thresholds(values):
+    top = int(values.max()) if values.size else 0
+    half = np.arange(top + 4) + 0.5                  # Tüm kovalar + en üst kovanın üstü (kırpma)
+    integer = np.arange(1, top + 4, dtype=float)     # Kova sınırları: eşitlik = 'ATTI'
+    return np.concatenate([half, integer, [0.2, 7.3, top + 0.9, top + 50.0]])
+
+def _assert_same_stats(expected, actual):
+    assert expected.keys() == actual.keys()
+    for key in expected:
+        np.testing.assert_allclose(np.asarray(actual[key], dtype=float), np.asarray(expected[key], dtype=float),
+                                   err_msg=key)
+
+def _assert_same_results(expected, actual):
+    # Tablo ham ATTI/ATAMADI metnini (ilk alan) üretmez; geri kalan 13 alan birebir aynı olmalı
+    assert len(expected) == len(actual)
+    for exp_row, act_row in zip(expected, actual):
+        assert exp_row[1:] == act_row[1:]
+
+def _career_series(rng, length):
+    """ Ortalaması sezon boyunca artan tamsayı PTS: sık sık yeni kariyer rekoru (kova genişletme). """
+    trend = np.linspace(2, 25, length)
+    return np.maximum(0, np.round(rng.normal(trend, 5))).astype(float)
+
+@pytest.mark.parametrize("seed", range(6))
+def test_append_one_at_a_time_matches_rebuild_and_raw(seed):
+    rng = np.random.default_rng(seed)
+    values = _career_series(rng, 80) if seed % 2 == 0 else rng.integers(0, 6, 80).astype(float)
+    table = build_streak_table(np.array([]), n_rows=0)
+    for i, value in enumerate(values, start=1):
+        append_streak_value(table, value)
+        prefix = values[:i]
+        thresholds = _thresholds(prefix)
+        rebuilt = build_streak_table(prefix)
+
+        assert table['n_rows'] == rebuilt['n_rows'] == i and table['exact']
+        np.testing.assert_array_equal(table['values'], prefix)
+        _assert_same_stats(streak_table_stats(rebuilt, thresholds), streak_table_stats(table, thresholds))
+        raw = analyze_streaks_multi(pd.Series(prefix), thresholds)
+        _assert_same_results(raw, streak_results_from_table(rebuilt, thresholds))
+        _assert_same_results(raw, streak_results_from_table(table, thresholds))
+
+def test_new_career_high_extends_buckets():
+    table = build_streak_table(np.array([3.0, 5.0, 4.0, 5.0]))
+    assert table['cur_len'].size == 7                # 0.5 ... 6.5
+    append_streak_value(table, 12.0)
+    assert table['cur_len'].size == 14               # 0.5 ... 13.5
+    values = np.array([3.0, 5.0, 4.0, 5.0, 12.0])
+    thresholds = _thresholds(values)
+    _assert_same_stats(streak_table_stats(build_streak_table(values), thresholds), streak_table_stats(table, thresholds))
+    # Eklenen kovaların hepsi: dört maçlık ATAMADI serisi bitti, tek maçlık ATTI serisi sürüyor
+    stats = streak_table_stats(table, [6.5, 9.5, 12.0, 12.5])
+    assert stats['current_is_above'].tolist() == [True, True, True, False]
+    assert stats['prev_length'].tolist() == [4, 4, 4, 0]
+
+def test_integer_and_clipped_thresholds_read_the_right_bucket():
+    values = np.array([10.0, 12.0, 11.0, 12.0, 9.0, 12.0])
+    table = build_streak_table(values)
+    # Tamsayı barem 12 == kova 11.5; 12.2 / 12.9 == kova 12.5; rekorun çok üstü == en üst kova (hep ATAMADI)
+    stats = streak_table_stats(table, [11.5, 12.0, 12.2, 12.5, 12.9, 40.0])
+    assert stats['total_above'].tolist() == [3, 3, 0, 0, 0, 0]
+    assert stats['current_length'].tolist() == [1, 1, 6, 6, 6, 6]
+
+def test_non_integer_or_non_positive_thresholds_fall_back():
+    inexact = build_streak_table(np.array([10.0, 12.5, 11.0]))
+    assert not inexact['exact']
+    assert streak_table_stats(inexact, [10.5]) is None
+    assert streak_results_from_table(inexact, [10.5]) is None
+    # Barem <= 0: her maç 'ATTI' olmalı, ama 0.5 kovasında 0 sayı 'ATAMADI' olurdu
+    table = build_streak_table(np.array([0.0, 3.0, 0.0, 5.0]))
+    assert streak_table_stats(table, [0.0, 5.5]) is None
+
+def test_short_series_match_raw_results():
+    for values in ([], [7.0], [7.0, 9.0]):
+        table = build_streak_table(np.array(values), n_rows=len(values))
+        thresholds = [6.5, 8.0]
+        assert streak_results_from_table(table, thresholds) == analyze_streaks_multi(pd.Series(values, dtype=float), thresholds)
+
+# ========================================================================
+# === build_streak_tables: önceki snapshot'tan artımlı == baştan kurma ===
+# ========================================================================
+
+def test_incremental_tables_match_full_rebuild(synthetic_tables):
+    df = synthetic_tables['df_oyuncu_mac']
+    cutoff = df['GAME_DATE'].sort_values().iloc[len(df) * 2 // 3]
+    old_index = build_player_index(df[df['GAME_DATE'] < cutoff])
+    new_index = build_player_index(df)
+    old_tables = build_streak_tables(old_index)
+
+    incremental = build_streak_tables(new_index, previous=old_tables)
+    rebuilt = build_streak_tables(new_index)
+    assert incremental.keys() == rebuilt.keys()
+    names = sorted(rebuilt)
+    thresholds = [_thresholds(rebuilt[name]['values']) for name in names]
+    _assert_same_stats(streak_tables_stats([rebuilt[name] for name in names], thresholds),
+                       streak_tables_stats([incremental[name] for name in names], thresholds))
+    for name in names:
+        assert incremental[name]['n_rows'] == rebuilt[name]['n_rows']
+        # Eski snapshot'ın tabloları yerinde değiştirilmez
+        assert old_tables[name]['n_rows'] == old_index['by_name'][name][1] - old_index['by_name'][name][0]
+
+    # Değişmeyen oyuncunun tablosu paylaşılır; geçmişi değişenin tablosu baştan kurulur
+    assert build_streak_tables(new_index, previous=incremental)[names[0]] is incremental[names[0]]
+    changed = dict(old_tables)
+    changed[names[1]] = build_streak_table(old_tables[names[1]]['values'] + 1.0)
+    rebuilt_one = build_streak_tables(new_index, previous=changed)[names[1]]
+    _assert_same_stats(streak_table_stats(rebuilt[names[1]], thresholds[1]), streak_table_stats(rebuilt_one, thresholds[1]))
+
+def test_player_analysis_uses_tables_consistently(synthetic_tables):
+    index = build_player_index(synthetic_tables['df_oyuncu_mac'])
+    tables = build_streak_tables(index)
+    name = sorted(index['by_name'])[3]
+    games = analysis_engine.get_player_games(index, name)
+    thresholds = [8.5, 12.0, 15.5, 19.0]
+    _assert_same_results(analyze_streaks_multi(games['PTS'], thresholds),
+                         analysis_engine._pts_streak_results(name, games, thresholds, tables))
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis_engine
+
+# ========================================================================
+# === analyze_streaks: NumPy run-length çekirdeği == eski pandas groupby ===
+# ========================================================================
+# Referans: run-length çekirdeğinden önceki (groupby tabanlı) analyze_streaks, değiştirilmeden.
+
+def _reference_analyze_streaks(data, threshold_col, threshold_val):
+    if data.empty or threshold_col not in data.columns:
+        return "Veri yok", 0, 0, 0.0, 0, 0.0, "Veri Yok", "", "", "", "Veri Yok", 0.0, 0.0, 0
+
+    data_cleaned = data.copy()
+    data_cleaned = data_cleaned[pd.to_numeric(data_cleaned[threshold_col], errors='coerce').notna()]
+    data_cleaned = data_cleaned[np.isfinite(data_cleaned[threshold_col])]
+
+    if data_cleaned.empty or len(data_cleaned) < 3:
+        return "Veri yok", 0, 0, 0.0, 0, 0.0, "Yetersiz Temiz Veri", "", "", "", "Veri Yok", 0.0, 0.0, 0
+
+    data_cleaned['above'] = data_cleaned[threshold_col] >= threshold_val
+    raw_pattern_list = ["ATTI" if x else "ATAMADI" for x in data_cleaned['above']]
+    raw_pattern = "-".join(raw_pattern_list)
+
+    total_matches = len(data_cleaned)
+    total_above = data_cleaned['above'].sum()
+    total_below = total_matches - total_above
+
+    data_cleaned['group'] = (data_cleaned['above'] != data_cleaned['above'].shift()).cumsum()
+    streaks = data_cleaned.groupby('group').agg(
+        is_above=('above', 'first'),
+        count=('above', 'size')
+    )
+
+    if streaks.empty:
+        return raw_pattern, total_matches, total_above, 0.0, total_below, 0.0, "Yetersiz seri", "", "", "", "Veri Yok", 0.0, 0.0, 0
+
+    current_streak = streaks.iloc[-1]
+    historical_streaks = streaks.iloc[:-1]
+
+    above_streaks = historical_streaks[historical_streaks['is_above'] == True]['count']
+    below_streaks = historical_streaks[historical_streaks['is_above'] == False]['count']
+
+    avg_above_streak = above_streaks.mean() if not above_streaks.empty else 0.0
+    avg_below_streak = below_streaks.mean() if not below_streaks.empty else 0.0
+
+    comment_header = "MEVCUT YORUM VE OLASILIK:\n"
+    comment_body = ""
+    prob_header = ""
+    prob_body = ""
+    prob_break_pct_float = 0.0
+    current_type_str = "Veri Yok"
+    avg_streak = 0.0
+
+    current_length = int(current_streak['count'])
+    current_type = current_streak['is_above']
+
+    if current_type == True:
+        current_type_str = "eşik üstü ('ATTI')"
+        next_type_str = "eşik altına düşme ('ATAMADI')"
+        all_streaks_of_type = above_streaks
+        avg_streak = avg_above_streak
+    else:
+        current_type_str = "eşik altı ('ATAMADI')"
+        next_type_str = "eşiği geçme ('ATTI')"
+        all_streaks_of_type = below_streaks
+        avg_streak = avg_below_streak
+
+    comment_body += f"  Mevcut Durum: {current_length} maçlık bir {current_type_str} serisi devam ediyor.\n"
+
+    if avg_streak > 0:
+        comment_body += f"  Tarihsel Ortalama: Tamamlanmış serilerin ortalama uzunluğu {avg_streak:.2f} maçtır.\n"
+        if current_length > avg_streak:
+            comment_body += f"  Yorum: Mevcut seri, tarihsel ortalamasından daha uzun sürüyor.\n"
+        else:
+            comment_body += f"  Yorum: Mevcut seri, henüz tarihsel ortalama uzunluğuna ulaşmamış.\n"
+    else:
+        comment_body += "  Yorum: Karşılaştırma için yeterli tarihsel seri verisi yok.\n"
+
+    N_reached = (all_streaks_of_type >= current_length).sum()
+    N_continued = (all_streaks_of_type > current_length).sum()
+
+    prob_header = "  OLASILIK TAHMİNİ:\n"
+
+    if N_reached == 0:
+        reversion_signal_found = False
+        if not historical_streaks.empty:
+            previous_streak = historical_streaks.iloc[-1]
+            prev_type = previous_streak['is_above']
+            prev_length = int(previous_streak['count'])
+
+            if current_type == False and prev_type == True:
+                if avg_above_streak > 0 and prev_length >= (avg_above_streak * 2):
+                    prob_break_pct_float = 75.0
+                    reversion_signal_found = True
+                    prob_body = (f"    >> ORTALAMAYA DÖNÜŞ SİNYALİ! (Güçlü ÜST Sinyali)\n"
+                                 f"    >> Oyuncu, ortalamanın ({avg_above_streak:.1f} maç) çok üzerinde ({prev_length} maç) bir 'ATTI' serisinden sonra sadece 1 maç 'ATAMADI'.\n"
+                                 f"    >> Yüksek olasılıkla (%{prob_break_pct_float:.1f}) normale dönüp 'ATTI' serisine geri başlayacaktır.")
+
+            elif current_type == True and prev_type == False:
+                if avg_below_streak > 0 and prev_length >= (avg_below_streak * 2):
+                    prob_break_pct_float = 75.0
+                    reversion_signal_found = True
+                    prob_body = (f"    >> ORTALAMAYA DÖNÜŞ SİNYALİ! (Güçlü ALT Sinyali)\n"
+                                 f"    >> Oyuncu, ortalamanın ({avg_below_streak:.1f} maç) çok üzerinde ({prev_length} maç) bir 'ATAMADI' serisinden sonra sadece 1 maç 'ATTI'.\n"
+                                 f"    >> Yüksek olasılıkla (%{prob_break_pct_float:.1f}) normale dönüp 'ATAMADI' serisine geri başlayacaktır.")
+
+        if not reversion_signal_found:
+            prob_break_pct_float = 1.0
+            prob_body += f"    >> Tarihsel veride bu uzunlukta ({current_length} maç) tamamlanmış bir seriye hiç rastlanmadı.\n"
+            prob_body += f"    >> Mevcut seri tarihsel bir rekor olabilir, bu nedenle geçmişe dayalı olasılık hesaplanamaz.\n"
+            prob_body += f"    >> Sıralamada geri düşmesi için olasılık %{prob_break_pct_float:.1f} olarak ayarlandı."
+
+    else:
+        prob_break = (N_reached - N_continued) / N_reached
+        prob_break_pct_float = prob_break * 100
+
+        prob_body += f"    >> Tarihsel analiz: Bu tip seriler {N_reached} kez {current_length} maç uzunluğuna ulaştı ve\n"
+        prob_body += f"       bunların %{prob_break_pct_float:.1f} kadarı bir sonraki maçta KIRILDI.\n"
+        prob_body += f"    >> Bir sonraki maçta serinin kırılarak '{next_type_str}' olasılığı: %{prob_break_pct_float:.1f}\n"
+
+    return (raw_pattern, total_matches, total_above, avg_above_streak,
+            total_below, avg_below_streak,
+            comment_header, comment_body, prob_header, prob_body,
+            current_type_str, prob_break_pct_float, avg_streak, int(current_length))
+
+
+def _assert_same_result(expected, actual):
+    assert len(expected) == len(actual) == 14
+    for exp_value, act_value in zip(expected, actual):
+        if isinstance(exp_value, float) and np.isnan(exp_value):
+            assert np.isnan(act_value)
+        else:
+            assert exp_value == act_value
+
+def _random_series(rng, kind, length):
+    if kind == 0:   # Tamsayı PTS
+        return rng.integers(0, 30, length).astype(float)
+    if kind == 1:   # İki değerli: uzun seriler
+        return rng.choice([0.0, 1.0], length, p=[0.3, 0.7])
+    if kind == 2:   # FG% benzeri, NaN'li
+        values = rng.random(length)
+        values[rng.random(length) < 0.1] = np.nan
+        return values
+    values = rng.integers(0, 4, length).astype(float)   # Sonsuz değerli, eşite çok yakın
+    values[rng.random(length) < 0.05] = np.inf
+    return values
+
+@pytest.mark.parametrize("seed", range(4))
+def test_analyze_streaks_matches_groupby_reference(seed):
+    rng = np.random.default_rng(seed)
+    for trial in range(200):
+        length = int(rng.integers(0, 60))
+        values = _random_series(rng, trial % 4, length)
+        data = pd.DataFrame({'PTS': values})
+        finite = values[np.isfinite(values)]
+        # Eşik seçenekleri: buçuklu baremler ve dizide birebir bulunan değerler (eşitlik = 'ATTI')
+        candidates = [0.5, 1.0, 2.0, 15.5, 0.45]
+        if finite.size:
+            candidates += [float(np.median(finite)), float(rng.choice(finite))]
+        threshold = float(rng.choice(candidates))
+        _assert_same_result(
+            _reference_analyze_streaks(data, 'PTS', threshold),
+            analysis_engine.analyze_streaks(data, 'PTS', threshold)
+        )
+
+def test_analyze_streaks_empty_and_missing_column():
+    empty = pd.DataFrame({'PTS': []})
+    _assert_same_result(_reference_analyze_streaks(empty, 'PTS', 10.5), analysis_engine.analyze_streaks(empty, 'PTS', 10.5))
+    data = pd.DataFrame({'PTS': [10.0, 12.0, 9.0]})
+    _assert_same_result(_reference_analyze_streaks(data, 'FG_PCT', 0.5), analysis_engine.analyze_streaks(data, 'FG_PCT', 0.5))
+
+def test_analyze_streaks_threshold_equal_values_count_as_above():
+    data = pd.DataFrame({'PTS': [10.0, 10.0, 9.0, 10.0, 11.0, 10.0, 9.0, 9.0]})
+    expected = _reference_analyze_streaks(data, 'PTS', 10.0)
+    _assert_same_result(expected, analysis_engine.analyze_streaks(data, 'PTS', 10.0))
+    assert expected[0] == "ATTI-ATTI-ATAMADI-ATTI-ATTI-ATTI-ATAMADI-ATAMADI"
+
+def test_analyze_streaks_nan_only_and_too_short():
+    for values in ([np.nan] * 5, [1.0, np.nan, 2.0], [np.inf, 3.0, np.nan, 4.0]):
+        data = pd.DataFrame({'PTS': values})
+        _assert_same_result(_reference_analyze_streaks(data, 'PTS', 2.5), analysis_engine.analyze_streaks(data, 'PTS', 2.5))
+
+def test_analyze_streaks_multi_matches_single_threshold_calls():
+    rng = np.random.default_rng(42)
+    values = rng.integers(0, 30, 200).astype(float)
+    values[rng.random(200) < 0.05] = np.nan
+    thresholds = [4.5, 12.5, 15.0, 22.5]
+    multi = analysis_engine.analyze_streaks_multi(pd.Series(values), thresholds)
+    for threshold, result in zip(thresholds, multi):
+        _assert_same_result(_reference_analyze_streaks(pd.DataFrame({'PTS': values}), 'PTS', threshold), result)
@@ -0,0 +1,227 @@
+import itertools
+import numpy as np
+import analysis_engine
+
+# ========================================================================
+# === PUANLAMA AĞIRLIKLARI TARAMASI (Grid Search) ===
+# ========================================================================
+# Hibrit analizin güven skoru, faktör sinyallerinin ağırlıklı toplamıdır:
+#
+#   güven   = kırp(tamsayı(BASE + F @ w), 5, 99)
+#   sinerji = (desen olasılığı / 100) * (güven / 100)
+#
+# F (aday x 5) ağırlıklardan bağımsızdır; yalnızca hacim bandına bağlıdır (bkz. feature_matrix).
+# Böylece binlerce ağırlık vektörü tek bir matris çarpımıyla puanlanır. Her gün için "Top 4"
+# (farklı maçlardan en iyi 4 aday, bkz. run_backtest_logic) seçimi de vektörel yapılır ve
+# sonuçlar Top 4 isabet oranına göre sıralanır.
+#
+# Adaylar logdan (log_store) ya da yeniden oynatmadan (replay_engine) gelebilir. Aday sözlüklerinde
+# 'eff_signal' / 'b2b_signal' / 'delta_effect' yoksa (eski loglar) sinyaller yorum metinlerinden okunur.
+
+WEIGHT_NAMES = ('VOLUME_WEIGHT_POSITIVE', 'VOLUME_WEIGHT_NEGATIVE', 'EFFICIENCY_WEIGHT',
+                'B2B_WEIGHT', 'USAGE_DELTA_WEIGHT')
+
+DEFAULT_WEIGHT_GRID = {
+    'VOLUME_WEIGHT_POSITIVE': [10.0, 20.0, 30.0, 40.0, 50.0],
+    'VOLUME_WEIGHT_NEGATIVE': [-15.0, -25.0, -35.0, -45.0, -55.0],
+    'EFFICIENCY_WEIGHT': [0.0, 7.5, 15.0, 22.5, 30.0],
+    'B2B_WEIGHT': [0.0, 7.5, 15.0, 22.5, 30.0],
+    'USAGE_DELTA_WEIGHT': [0.0, 12.5, 25.0, 37.5, 50.0],
+}
+DEFAULT_VOLUME_BANDS = [1.0, 1.5, 2.0, 2.5, 3.0]
+SWEEP_MIN_PREDICTIONS = 20   # Bundan az Top 4 tahmini olan kombinasyonlar sıralamaya girmez
+SWEEP_CHUNK_SIZE = 256       # Aynı anda puanlanan ağırlık vektörü sayısı (bellek sınırı)
+
+# Durum kodları (sıralama anahtarının son 2 biti)
+_STATE_SUCCESS, _STATE_FAIL, _STATE_UNKNOWN, _STATE_EMPTY = 0, 1, 2, 3
+_CONF_MIN, _CONF_MAX = 5, 99
+
+def current_weights():
+    """ analysis_engine'deki geçerli ağırlıklar (WEIGHT_NAMES sırasıyla). """
+    return tuple(float(getattr(analysis_engine, name)) for name in WEIGHT_NAMES)
+
+def _signal_from_comment(comment):
+    """ Eski log kayıtları için: 'POZİTİF ...' -> 1, 'NEGATİF ...' -> -1, diğerleri -> 0. """
+    comment = comment or ""
+    if comment.startswith("POZİTİF"):
+        return 1
+    if comment.startswith("NEGATİF"):
+        return -1
+    return 0
+
+def _delta_from_tag(delta_tag):
+    return {'delta_plus': 1, 'delta_minus': -1}.get(delta_tag, 0)
+
+def build_candidate_table(candidates_by_date, result_index):
+    """
+    {tarih: sıralı aday listesi} -> kolonsal aday tablosu (NumPy dizileri). Tüm adaylar TEK bir
+    'grade_predictions' aramasıyla notlanır. Satırlar (gün, listedeki sıra) düzenindedir.
+    Sezon ortalaması ('raw_s_avg_pts') kaydedilmemiş adayı olan günler (çok eski loglar) hacim
+    faktörü hesaplanamadığı için bütünüyle atlanır ('skipped_dates').
+    """
+    dates, skipped_dates = [], []
+    for date in sorted(candidates_by_date):
+        adaylar = candidates_by_date[date]
+        if not adaylar:
+            continue
+        if all('raw_s_avg_pts' in aday for aday in adaylar):
+            dates.append(date)
+        else:
+            skipped_dates.append(date)
+    records, day_idx, positions, game_keys = [], [], [], []
+    for d, date in enumerate(dates):
+        for pos, aday in enumerate(candidates_by_date[date]):
+            records.append(aday)
+            day_idx.append(d)
+            positions.append(pos)
+            game_keys.append((d, aday.get('game_id')))
+
+    game_codes = {}
+    game = np.array([game_codes.setdefault(key, len(game_codes)) for key in game_keys], dtype=np.int64)
+    threshold = np.array([float(aday['threshold']) for aday in records], dtype=float)
+    is_over = np.array([aday['direction'] == "ÜST" for aday in records], dtype=bool)
+    grades = analysis_engine.grade_predictions(records, result_index)
+    found = np.array([g[0] for g in grades], dtype=bool)
+    actual_pts = np.array([g[1] for g in grades], dtype=float)
+    with np.errstate(invalid='ignore'):
+        success = np.where(is_over, actual_pts >= threshold, actual_pts < threshold)
+    state = np.where(~found, _STATE_UNKNOWN, np.where(success, _STATE_SUCCESS, _STATE_FAIL))
+
+    return {
+        'dates': dates,
+        'skipped_dates': skipped_dates,
+        'day': np.array(day_idx, dtype=np.int64),
+        'pos': np.array(positions, dtype=np.int64),
+        'game': game,
+        'pts_prob': np.array([float(aday['pts_prob']) for aday in records], dtype=float),
+        'vol_diff': np.array([float(aday['raw_s_avg_pts']) for aday in records], dtype=float) - threshold,
+        'is_over': is_over,
+        'eff': np.array([aday['eff_signal'] if 'eff_signal' in aday else _signal_from_comment(aday.get('comment_verimlilik'))
+                         for aday in records], dtype=float),
+        'b2b': np.array([aday['b2b_signal'] if 'b2b_signal' in aday else _signal_from_comment(aday.get('raw_b2b_comment'))
+                         for aday in records], dtype=float),
+        'delta': np.array([aday['delta_effect'] if 'delta_effect' in aday else _delta_from_tag(aday.get('delta_tag'))
+                           for aday in records], dtype=float),
+        'confidence': np.array([int(aday['confidence']) for aday in records], dtype=np.int64),
+        'state': state.astype(np.int64),
+    }
+
+def feature_matrix(table, volume_band, rows=None):
+    """
+    Aday x WEIGHT_NAMES faktör matrisi (slate_engine._score_players'taki kurallarla):
+      - Hacim: |Ort - Barem| > band -> ±1 (ALT adayda işaret ters). ÜST adayda delta hacim cezasını/bonusunu iptal eder.
+      - Verimlilik ve B2B: ±1 sinyal. Delta: ÜST adayda +delta, ALT adayda -delta.
+    """
+    rows = slice(None) if rows is None else rows
+    vol_diff, is_over, delta = table['vol_diff'][rows], table['is_over'][rows], table['delta'][rows]
+    hacim_band = (vol_diff > volume_band).astype(int) - (vol_diff < -volume_band).astype(int)
+    hacim_result = np.where(is_over, hacim_band, -hacim_band)
+    features = np.empty((len(vol_diff), len(WEIGHT_NAMES)), dtype=float)
+    features[:, 0] = (hacim_result == 1) & ~(is_over & (delta == -1))
+    features[:, 1] = (hacim_result == -1) & ~(is_over & (delta == 1))
+    features[:, 2] = table['eff'][rows]
+    features[:, 3] = table['b2b'][rows]
+    features[:, 4] = np.where(is_over, delta, -delta)
+    return features
+
+def _pair_rank_table(pts_prob_values):
+    """
+    (desen olasılığı, güven) çiftlerinin sıralama rütbesi: (sinerji, desen, güven) azalan düzende 0'dan başlar.
+    Sinerji motorla aynı float ifadeyle hesaplanır; böylece eşitlikler birebir korunur.
+    """
+    conf_values = np.arange(_CONF_MIN, _CONF_MAX + 1)
+    prob_grid, conf_grid = np.meshgrid(pts_prob_values, conf_values, indexing='ij')
+    sinerji = (prob_grid / 100.0) * (conf_grid / 100.0)
+    order = np.lexsort((-conf_grid.ravel(), -prob_grid.ravel(), -sinerji.ravel()))
+    ranks = np.empty(order.size, dtype=np.int64)
+    ranks[order] = np.arange(order.size)
+    return ranks.reshape(prob_grid.shape)
+
+def evaluate_weights(table, weight_grid, volume_band, min_prob, chunk_size=SWEEP_CHUNK_SIZE):
+    """
+    Her ağırlık vektörü (weight_grid satırı) için tüm günlerin Top 4 sayaçları.
+    Dönüş: (top4_success, top4_predictions) -> her biri len(weight_grid) uzunluğunda int dizisi.
+
+    Gün başına Top 4 = desen olasılığı >= min_prob adaylardan, en iyi adayı en üstte olan 4 maçın
+    en iyi adayları (run_backtest_logic'in sıralı listede farklı maç seçmesiyle aynı sonuç).
+    Eşit skorlu adaylar listedeki sıralarıyla ayrılır.
+    """
+    weight_grid = np.atleast_2d(np.asarray(weight_grid, dtype=float))
+    n_weights = weight_grid.shape[0]
+    top4_success = np.zeros(n_weights, dtype=np.int64)
+    top4_predictions = np.zeros(n_weights, dtype=np.int64)
+
+    eligible = np.flatnonzero(table['pts_prob'] >= min_prob)
+    if eligible.size == 0:
+        return top4_success, top4_predictions
+    # Satırları (gün, maç, sıra) düzenine getir: her maç bitişik bir dilim olur
+    rows = eligible[np.lexsort((table['pos'][eligible], table['game'][eligible], table['day'][eligible]))]
+    game = table['game'][rows]
+    game_starts = np.flatnonzero(np.r_[True, game[1:] != game[:-1]])
+    game_day = table['day'][rows][game_starts]
+    day_starts = np.flatnonzero(np.r_[True, game_day[1:] != game_day[:-1]])
+    slot_in_day = np.arange(game_starts.size) - np.repeat(day_starts, np.diff(np.r_[day_starts, game_starts.size]))
+    n_slots = int(slot_in_day.max()) + 1
+    day_of_game = np.repeat(np.arange(day_starts.size), np.diff(np.r_[day_starts, game_starts.size]))
+
+    prob_values, prob_rank = np.unique(table['pts_prob'][rows], return_inverse=True)
+    pair_rank = _pair_rank_table(prob_values)
+    pos = table['pos'][rows]
+    pos_span = int(pos.max()) + 1
+    state = table['state'][rows]
+    features = feature_matrix(table, volume_band, rows)
+    top_k = min(4, n_slots)
+
+    for chunk_start in range(0, n_weights, chunk_size):
+        weights = weight_grid[chunk_start:chunk_start + chunk_size]
+        confidence = np.clip(np.trunc(analysis_engine.BASE_CONFIDENCE + features @ weights.T), _CONF_MIN, _CONF_MAX)
+        confidence = confidence.astype(np.int64)
+        # Anahtar: (çift rütbesi, listedeki sıra, durum) -> küçük olan önde; durum en alt 2 bitte taşınır
+        keys = (pair_rank[prob_rank[:, np.newaxis], confidence - _CONF_MIN] * pos_span + pos[:, np.newaxis]) * 4 + state[:, np.newaxis]
+        game_best = np.minimum.reduceat(keys, game_starts, axis=0)
+
+        per_day = np.full((day_starts.size, n_slots, weights.shape[0]), np.iinfo(np.int64).max, dtype=np.int64)
+        per_day[day_of_game, slot_in_day] = game_best
+        top_states = np.partition(per_day, top_k - 1, axis=1)[:, :top_k] % 4
+        top4_success[chunk_start:chunk_start + weights.shape[0]] = (top_states == _STATE_SUCCESS).sum(axis=(0, 1))
+        top4_predictions[chunk_start:chunk_start + weights.shape[0]] = (top_states <= _STATE_FAIL).sum(axis=(0, 1))
+    return top4_success, top4_predictions
+
+def run_sweep(table, weight_grid=None, volume_bands=None, min_probs=None,
+              min_predictions=SWEEP_MIN_PREDICTIONS):
+    """
+    Izgara taraması: weight_grid ({ağırlık adı: değerler}) kartezyen çarpımı x hacim bantları x min_prob.
+    Dönüş: Top 4 isabet oranına (eşitlikte tahmin sayısına) göre azalan sıralı sonuç sözlükleri.
+    'min_predictions'tan az Top 4 tahmini olan kombinasyonlar elenir.
+    """
+    weight_grid = weight_grid or DEFAULT_WEIGHT_GRID
+    volume_bands = volume_bands or DEFAULT_VOLUME_BANDS
+    min_probs = min_probs or [75.0]
+    combos = np.array(list(itertools.product(*(weight_grid.get(name, [getattr(analysis_engine, name)])
+                                               for name in WEIGHT_NAMES))), dtype=float)
+
+    results = []
+    for volume_band in volume_bands:
+        for min_prob in min_probs:
+            top4_s, top4_p = evaluate_weights(table, combos, volume_band, min_prob)
+            for weights, s, p in zip(combos, top4_s, top4_p):
+                if p < min_predictions:
+                    continue
+                results.append({
+                    'weights': dict(zip(WEIGHT_NAMES, weights.tolist())),
+                    'volume_band': volume_band,
+                    'min_prob': min_prob,
+                    'top4_success': int(s),
+                    'top4_predictions': int(p),
+                    'hit_rate': s / p * 100.0,
+                })
+    results.sort(key=lambda r: (r['hit_rate'], r['top4_predictions']), reverse=True)
+    return results
+
+def format_result(result):
+    """ Tek satırlık özet (rapor için). """
+    w = result['weights']
+    return (f"%{result['hit_rate']:.1f} ({result['top4_success']}/{result['top4_predictions']}) | "
+            f"Hacim +{w['VOLUME_WEIGHT_POSITIVE']:g}/{w['VOLUME_WEIGHT_NEGATIVE']:g} (±{result['volume_band']:g}) | "
+            f"Verim {w['EFFICIENCY_WEIGHT']:g} | B2B {w['B2B_WEIGHT']:g} | Delta {w['USAGE_DELTA_WEIGHT']:g} | "
+            f"Desen >= %{result['min_prob']:g}")